@@ -2,34 +2,71 @@
 """
 Estimate value delivered by flexible heater scheduling.
 
-The analysis compares measured heater energy against a counterfactual thermostat
-profile learned from a baseline day, e.g. 2026-01-19.
+The analysis compares measured heater energy against counterfactual thermostat
+profiles learned from one or more baseline days, e.g. 2026-01-19. Every
+baseline is crossed with every slot weighting and energy basis into a scenario
+matrix, priced per day in one pass and written in long format. Readings and rates of
+completed days are kept in a local columnar cache (telemetry_cache.py), and
+each completed day's results are memoised beside it, so reruns only fetch
+and compute days that are new, still open, or invalidated by a different
+channel set, scenario matrix, RESULT_SCHEMA_VERSION or version of this
+script, the cache format or the half-hour energy RPC.
 """
 
 from __future__ import annotations
 
 import argparse
+import bisect
 import csv
+import functools
+import hashlib
+import http.client
+import itertools
 import json
+import operator
 import os
 import sys
+import threading
+import urllib.error
 import urllib.parse
-import urllib.request
+from array import array
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import date, datetime, time, timedelta, timezone
+from functools import lru_cache
 from pathlib import Path
+from time import sleep
 from zoneinfo import ZoneInfo
 
+from telemetry_cache import SETTLE, ColumnarCache, utc_day_start
+
 
 UK_TZ = ZoneInfo("Europe/London")
 POWER_ON_THRESHOLD_W = 100.0
 PEAK_WINDOW_START_HOUR = 16
 PEAK_WINDOW_END_HOUR = 19
 MAX_PLAUSIBLE_CHANNEL_POWER_W = 20000.0
+OCTOPUS_API_URL = "https://api.octopus.energy/v1/products"
+HTTP_TIMEOUT_SECONDS = 45
+HTTP_ATTEMPTS = 4
+HTTP_RETRY_BACKOFF_SECONDS = 1.0
+READING_PAGE_SIZE = 1000
+SUPABASE_MAX_ROWS = 1000
+HALF_HOUR_SECONDS = 1800.0
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+MICROSECOND = timedelta(microseconds=1)
+# Bump whenever a memoised day result would change for a reason the source
+# hashes in code_version cannot see, e.g. a server-side change to the RPC.
+RESULT_SCHEMA_VERSION = 1
+MIGRATIONS_DIR = Path(__file__).resolve().parent.parent / "supabase" / "migrations"
 
 
 @dataclass
 class Reading:
+    __slots__ = ("channel", "created_at", "power_w", "energy_total_wh")
+
     channel: int
     created_at: datetime
     power_w: float
@@ -38,18 +75,183 @@ class Reading:
 
 @dataclass
 class Rate:
+    __slots__ = ("valid_from", "valid_to", "price_ppkwh")
+
     valid_from: datetime
     valid_to: datetime
     price_ppkwh: float
 
 
+def epoch_us(value: datetime) -> int:
+    return (value - EPOCH) // MICROSECOND
+
+
+def _copied(typecode: str, column) -> array:
+    copy = array(typecode)
+    copy.frombytes(memoryview(column).cast("B"))
+    return copy
+
+
+class ReadingSeries:
+    """
+    One channel's time-ordered readings as columns: int64 epoch-microsecond
+    created_at, float64 power_w and float64 energy_total_wh.
+
+    A year of minute readings is three flat arrays instead of half a million
+    Reading objects, each with its own datetime. Slicing returns a series of
+    memoryviews over the same buffers, so cutting out a day copies nothing;
+    indexing one position returns a Reading.
+    """
+
+    __slots__ = ("channel", "created_us", "power_w", "energy_total_wh")
+
+    def __init__(self, channel: int, created_us=None, power_w=None, energy_total_wh=None):
+        self.channel = channel
+        self.created_us = array("q") if created_us is None else created_us
+        self.power_w = array("d") if power_w is None else power_w
+        self.energy_total_wh = array("d") if energy_total_wh is None else energy_total_wh
+
+    @classmethod
+    def from_rows(cls, channel: int, rows: Iterable[dict]) -> ReadingSeries:
+        series = cls(channel)
+        for row in rows:
+            series.created_us.append(epoch_us(parse_datetime(row["created_at"])))
+            series.power_w.append(float(row.get("power_w") or 0))
+            series.energy_total_wh.append(float(row.get("energy_total_wh") or 0))
+        return series
+
+    @classmethod
+    def from_seconds(cls, channel: int, created_at, power_w, energy_total_wh) -> ReadingSeries:
+        """A series from float epoch-second timestamps, as kept in the columnar cache."""
+        # Rounding recovers the exact microsecond: a float64 epoch second is
+        # finer than half a microsecond until 2106.
+        return cls(channel, array("q", map(round, map((1e6).__mul__, created_at))), power_w, energy_total_wh)
+
+    @classmethod
+    def concat(cls, channel: int, parts: Iterable[ReadingSeries]) -> ReadingSeries:
+        series = cls(channel)
+        for part in parts:
+            series.created_us.frombytes(memoryview(part.created_us).cast("B"))
+            series.power_w.frombytes(memoryview(part.power_w).cast("B"))
+            series.energy_total_wh.frombytes(memoryview(part.energy_total_wh).cast("B"))
+        return series
+
+    def seconds_columns(self) -> list[array]:
+        """created_at as float epoch seconds, power_w and energy_total_wh, for the columnar cache."""
+        return [
+            array("d", (created / 1e6 for created in self.created_us)),
+            _copied("d", self.power_w),
+            _copied("d", self.energy_total_wh),
+        ]
+
+    def __len__(self) -> int:
+        return len(self.created_us)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return ReadingSeries(
+                self.channel,
+                memoryview(self.created_us)[index],
+                memoryview(self.power_w)[index],
+                memoryview(self.energy_total_wh)[index],
+            )
+        return Reading(
+            self.channel,
+            EPOCH + self.created_us[index] * MICROSECOND,
+            self.power_w[index],
+            self.energy_total_wh[index],
+        )
+
+    def __reduce__(self):
+        # Views cannot be pickled; a worker receives compact copies of just the viewed range.
+        return ReadingSeries, (
+            self.channel,
+            _copied("q", self.created_us),
+            _copied("d", self.power_w),
+            _copied("d", self.energy_total_wh),
+        )
+
+
+@dataclass(frozen=True)
+class BaselineProfile:
+    """A baseline day's half-hour energy shape (weights summing to 1), total kWh and heater starts."""
+
+    day: date
+    weights: tuple[float, ...]
+    total_kwh: float
+    starts: int
+
+
+@dataclass(frozen=True)
+class Scenario:
+    baseline: BaselineProfile
+    weighting: str
+    energy: str
+
+
+@dataclass(frozen=True)
+class DaySlots:
+    """The 48 local half-hour slots of one UK day as epoch seconds, ordered by start."""
+
+    starts: tuple[float, ...]
+    ends: tuple[float, ...]
+    indices: tuple[int, ...]
+    longest: float
+
+
+class RateIndex:
+    """Rates ordered by start as epoch seconds, so overlap lookups bisect instead of scanning."""
+
+    def __init__(self, rates: list[Rate]):
+        ordered = sorted(rates, key=lambda rate: rate.valid_from)
+        self.starts = [rate.valid_from.timestamp() for rate in ordered]
+        self.ends = [rate.valid_to.timestamp() for rate in ordered]
+        self.prices = [rate.price_ppkwh for rate in ordered]
+        # Any rate starting more than one rate length before a window ends before it.
+        self.longest = max((end - start for start, end in zip(self.starts, self.ends)), default=0.0)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def overlapping(self, start: float, end: float):
+        """Yield (seconds, price) for every rate overlapping [start, end)."""
+        first = bisect.bisect_right(self.starts, start - self.longest)
+        last = bisect.bisect_left(self.starts, end, first)
+        for position in range(first, last):
+            seconds = min(end, self.ends[position]) - max(start, self.starts[position])
+            if seconds > 0:
+                yield seconds, self.prices[position]
+
+    def covers(self, start: float, end: float) -> bool:
+        return next(self.overlapping(start, end), None) is not None
+
+
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Estimate flexible heater scheduling value.")
-    parser.add_argument("--baseline-date", default="2026-01-19", help="UK date to use as thermostat baseline profile.")
-    parser.add_argument("--start", default=None, help="UK start date inclusive. Defaults to the day after baseline date.")
+    parser.add_argument(
+        "--baseline-date",
+        default="2026-01-19",
+        help="Comma-separated UK dates to use as thermostat baseline profiles; the first drives the summary.",
+    )
+    parser.add_argument("--weightings", default="profile,uniform", help="Comma-separated slot weightings: " + ", ".join(WEIGHTINGS) + ".")
+    parser.add_argument("--energy-bases", default="same_kwh,thermostat", help="Comma-separated energy bases: " + ", ".join(ENERGY_BASES) + ".")
+    parser.add_argument("--start", default=None, help="UK start date inclusive. Defaults to the day after the first baseline date.")
     parser.add_argument("--end", default=None, help="UK end date inclusive. Defaults to yesterday.")
     parser.add_argument("--channels", default="0,1", help="Comma-separated Shelly channels to include in actual usage.")
     parser.add_argument("--output-dir", default="analysis/output", help="Directory for CSV/Markdown outputs.")
+    parser.add_argument("--cache-dir", default="analysis/cache", help="Local readings/rates cache; empty to always fetch.")
+    parser.add_argument(
+        "--aggregate",
+        choices=("client", "server"),
+        default="client",
+        help=(
+            "Difference raw readings locally, or fetch half-hour kWh from the get_half_hour_energy RPC. "
+            "The kWh agree; a heater start exactly at UK midnight counts in both days client-side "
+            "but once, in the day it begins, server-side (19 vs 18 actual_starts per GMT day on the stand-ins)."
+        ),
+    )
+    parser.add_argument("--jobs", type=int, default=1, help="Worker processes computing days; 1 runs inline.")
+    parser.add_argument("--fetch-workers", type=int, default=4, help="Concurrent Supabase requests when fetching readings.")
     return parser.parse_args()
 
 
@@ -100,45 +302,208 @@ def daterange(start_day: date, end_day: date):
         current += timedelta(days=1)
 
 
-def http_json(url: str, headers: dict[str, str] | None = None) -> object:
-    request = urllib.request.Request(url, headers=headers or {})
-    with urllib.request.urlopen(request, timeout=45) as response:
-        return json.loads(response.read().decode("utf-8"))
-
-
-def supabase_rows(
+_connections = threading.local()
+
+
+def _connection(scheme: str, netloc: str) -> http.client.HTTPConnection:
+    """This thread's keep-alive connection to scheme://netloc."""
+    pool = _connections.__dict__.setdefault("pool", {})
+    connection = pool.get((scheme, netloc))
+    if connection is None:
+        connection_class = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        connection = pool[(scheme, netloc)] = connection_class(netloc, timeout=HTTP_TIMEOUT_SECONDS)
+    return connection
+
+
+def _drop_connection(scheme: str, netloc: str) -> None:
+    connection = _connections.__dict__.get("pool", {}).pop((scheme, netloc), None)
+    if connection is not None:
+        connection.close()
+
+
+def _http_request(url: str, headers: dict[str, str], body: bytes | None) -> bytes:
+    parts = urllib.parse.urlsplit(url)
+    target = f"{parts.path}?{parts.query}" if parts.query else parts.path
+    try:
+        connection = _connection(parts.scheme, parts.netloc)
+        connection.request("GET" if body is None else "POST", target, body=body, headers=headers)
+        response = connection.getresponse()
+        body = response.read()
+    except (OSError, http.client.HTTPException):
+        _drop_connection(parts.scheme, parts.netloc)
+        raise
+    if response.status >= 400:
+        raise urllib.error.HTTPError(url, response.status, response.reason, response.headers, None)
+    return body
+
+
+def http_json(url: str, headers: dict[str, str] | None = None, payload: object = None) -> object:
+    """
+    GET url (or POST payload as JSON) and decode the JSON response over a
+    connection kept open for this thread.
+
+    Only reads are sent through here, so connection failures, timeouts, 429
+    and 5xx responses are retried with exponential backoff; other HTTP
+    errors are raised at once.
+    """
+    body = None
+    if payload is not None:
+        body = json.dumps(payload).encode("utf-8")
+        headers = {**(headers or {}), "Content-Type": "application/json"}
+    for attempt in range(1, HTTP_ATTEMPTS + 1):
+        try:
+            return json.loads(_http_request(url, headers or {}, body).decode("utf-8"))
+        except (OSError, http.client.HTTPException) as exc:
+            status = getattr(exc, "code", None)
+            retryable = status is None or status == 429 or status >= 500
+            if not retryable or attempt == HTTP_ATTEMPTS:
+                raise
+            sleep(HTTP_RETRY_BACKOFF_SECONDS * 2 ** (attempt - 1))
+    raise AssertionError("unreachable")
+
+
+def supabase_get(
     table: str,
     params: list[tuple[str, str]],
-    page_size: int = 1000,
+    headers: dict[str, str] | None = None,
+    payload: dict | None = None,
 ) -> list[dict]:
+    """GET rows from a table or view, or POST payload to an RPC path such as rpc/<function>."""
     supabase_url = require_env("SUPABASE_URL").rstrip("/")
     supabase_key = require_env("SUPABASE_KEY")
-    headers = {
-        "apikey": supabase_key,
-        "Authorization": f"Bearer {supabase_key}",
-    }
-    rows: list[dict] = []
+    query = urllib.parse.urlencode(params, doseq=True, safe=",.:()+")
+    page = http_json(
+        f"{supabase_url}/rest/v1/{table}?{query}" if query else f"{supabase_url}/rest/v1/{table}",
+        headers={
+            "apikey": supabase_key,
+            "Authorization": f"Bearer {supabase_key}",
+            **(headers or {}),
+        },
+        payload=payload,
+    )
+    if not isinstance(page, list):
+        raise RuntimeError(f"Unexpected Supabase response for {table}: {page}")
+    return page
+
+
+def supabase_pages(
+    table: str,
+    params: list[tuple[str, str]],
+    page_size: int = 1000,
+) -> Iterator[dict]:
+    """Yield rows one page at a time; the next page is only requested once this one is consumed."""
     offset = 0
 
     while True:
-        query = urllib.parse.urlencode(params, doseq=True, safe=",.:()+")
-        url = f"{supabase_url}/rest/v1/{table}?{query}"
-        page_headers = dict(headers)
-        page_headers["Range"] = f"{offset}-{offset + page_size - 1}"
-        page = http_json(url, headers=page_headers)
-        if not isinstance(page, list):
-            raise RuntimeError(f"Unexpected Supabase response for {table}: {page}")
-
-        rows.extend(page)
+        page = supabase_get(table, params, headers={"Range": f"{offset}-{offset + page_size - 1}"})
+        yield from page
         if len(page) < page_size:
             break
         offset += page_size
 
-    return rows
+
+def supabase_keyset_pages(
+    table: str,
+    params: list[tuple[str, str]],
+    page_size: int = READING_PAGE_SIZE,
+) -> Iterator[dict]:
+    """
+    Yield rows ordered by (created_at, id), starting each page after the last key seen.
+
+    Unlike Range offsets, which make the database skip every earlier row again,
+    each page is an index scan from where the previous one stopped, and a
+    retried page resumes from the same key. params must not set order/limit
+    and must select id and created_at.
+    """
+    after: tuple[str, object] | None = None
+    while True:
+        page_params = list(params) + [("order", "created_at.asc,id.asc"), ("limit", str(page_size))]
+        if after is not None:
+            created_at, row_id = after
+            page_params.append(("or", f"(created_at.gt.{created_at},and(created_at.eq.{created_at},id.gt.{row_id}))"))
+        page = supabase_get(table, page_params)
+        yield from page
+        if len(page) < page_size:
+            return
+        after = (utc_iso(parse_datetime(page[-1]["created_at"])), page[-1]["id"])
 
 
-def fetch_readings(channel: int, start_utc: datetime, end_utc: datetime) -> list[Reading]:
-    previous = supabase_rows(
+def supabase_rows(
+    table: str,
+    params: list[tuple[str, str]],
+    page_size: int = 1000,
+) -> list[dict]:
+    return list(supabase_pages(table, params, page_size))
+
+
+def reading_chunks(start_utc: datetime, end_utc: datetime) -> Iterator[tuple[datetime, datetime, bool]]:
+    """(chunk_start, chunk_end, includes_end) pieces of start_utc..end_utc (inclusive), split at UTC midnights."""
+    chunk_start = start_utc
+    while True:
+        chunk_end = utc_day_start(chunk_start.astimezone(timezone.utc).date() + timedelta(days=1))
+        if chunk_end > end_utc:
+            yield chunk_start, end_utc, True
+            return
+        yield chunk_start, chunk_end, False
+        if chunk_end == end_utc:
+            yield end_utc, end_utc, True
+            return
+        chunk_start = chunk_end
+
+
+def cached_day_readings(cache: ColumnarCache, channel: int, day: date) -> ReadingSeries:
+    """A final UTC day's readings, fetched and written to the cache on first use."""
+    dataset = f"energy_readings/channel={channel}"
+    columns = cache.load(dataset, day)
+    if columns is None:
+        day_start = utc_day_start(day)
+        readings = fetch_reading_chunk(channel, day_start, day_start + timedelta(days=1), False)
+        cache.store(dataset, day, readings.seconds_columns())
+        return readings
+    return ReadingSeries.from_seconds(channel, *columns)
+
+
+def fetch_reading_chunk(
+    channel: int,
+    chunk_start: datetime,
+    chunk_end: datetime,
+    includes_end: bool,
+    cache: ColumnarCache | None = None,
+) -> ReadingSeries:
+    """Readings of one chunk (within a single UTC day), from the cache once that day is final."""
+    day = chunk_start.astimezone(timezone.utc).date()
+    if cache is None or not cache.is_final(day):
+        rows = supabase_keyset_pages(
+            "energy_readings",
+            [
+                ("select", "id,channel,power_w,energy_total_wh,created_at"),
+                ("channel", f"eq.{channel}"),
+                ("created_at", f"gte.{utc_iso(chunk_start)}"),
+                ("created_at", f"{'lte' if includes_end else 'lt'}.{utc_iso(chunk_end)}"),
+            ],
+        )
+        return ReadingSeries.from_rows(channel, rows)
+
+    readings = cached_day_readings(cache, channel, day)
+    first = bisect.bisect_left(readings.created_us, epoch_us(chunk_start))
+    last = (bisect.bisect_right if includes_end else bisect.bisect_left)(readings.created_us, epoch_us(chunk_end))
+    return readings[first:last]
+
+
+def previous_reading(channel: int, start_utc: datetime, cache: ColumnarCache | None = None) -> ReadingSeries:
+    """
+    The last reading before start_utc as a series of one, or an empty series;
+    looked up in the start and previous days' partitions when cached.
+    """
+    day = start_utc.astimezone(timezone.utc).date()
+    if cache is not None and cache.is_final(day):
+        for candidate in (day, day - timedelta(days=1)):
+            readings = cached_day_readings(cache, channel, candidate)
+            position = bisect.bisect_left(readings.created_us, epoch_us(start_utc))
+            if position:
+                return readings[position - 1:position]
+
+    rows = supabase_rows(
         "energy_readings",
         [
             ("select", "channel,power_w,energy_total_wh,created_at"),
@@ -148,35 +513,169 @@ def fetch_readings(channel: int, start_utc: datetime, end_utc: datetime) -> list
             ("limit", "1"),
         ],
     )
-    rows = supabase_rows(
-        "energy_readings",
-        [
-            ("select", "channel,power_w,energy_total_wh,created_at"),
-            ("channel", f"eq.{channel}"),
-            ("created_at", f"gte.{utc_iso(start_utc)}"),
-            ("created_at", f"lte.{utc_iso(end_utc)}"),
-            ("order", "created_at.asc"),
-        ],
+    return ReadingSeries.from_rows(channel, rows)
+
+
+def prefetched(executor: Executor, fetch, items: Iterable[tuple], ahead: int) -> Iterator:
+    """Yield fetch(*item) in order while up to `ahead` later items are fetched in the background."""
+    in_flight: deque = deque()
+    for item in items:
+        in_flight.append(executor.submit(fetch, *item))
+        if len(in_flight) > ahead:
+            yield in_flight.popleft().result()
+    while in_flight:
+        yield in_flight.popleft().result()
+
+
+def iter_readings(
+    channel: int,
+    start_utc: datetime,
+    end_utc: datetime,
+    executor: Executor | None = None,
+    ahead: int = 4,
+    cache: ColumnarCache | None = None,
+) -> Iterator[ReadingSeries]:
+    """
+    Yield the last reading before start_utc (a series of at most one), then
+    every reading up to end_utc, one series per chunk.
+
+    The range is fetched in UTC-day chunks, which are read from the cache
+    once their day is final. With an executor, up to `ahead` chunks are
+    fetched concurrently ahead of the consumer, so memory stays bounded
+    while several requests are in flight.
+    """
+    yield previous_reading(channel, start_utc, cache)
+
+    fetch = functools.partial(fetch_reading_chunk, channel, cache=cache)
+    chunks = reading_chunks(start_utc, end_utc)
+    if executor is None:
+        pages = (fetch(*chunk) for chunk in chunks)
+    else:
+        pages = prefetched(executor, fetch, chunks, ahead)
+    yield from pages
+
+
+def fetch_readings(
+    channel: int,
+    start_utc: datetime,
+    end_utc: datetime,
+    cache: ColumnarCache | None = None,
+) -> ReadingSeries:
+    return ReadingSeries.concat(channel, iter_readings(channel, start_utc, end_utc, cache=cache))
+
+
+def fetch_half_hour_energy(channels: list[int], start_utc: datetime, end_utc: datetime) -> list[tuple[float, int, float, int]]:
+    """(slot_start, channel, kwh, starts) rows from the get_half_hour_energy RPC, ordered by slot."""
+    rows = supabase_get(
+        "rpc/get_half_hour_energy",
+        [],
+        payload={
+            "p_start": utc_iso(start_utc),
+            "p_end": utc_iso(end_utc),
+            "p_channels": channels,
+            "p_max_power_w": MAX_PLAUSIBLE_CHANNEL_POWER_W,
+            "p_on_threshold_w": POWER_ON_THRESHOLD_W,
+        },
     )
-
-    result: list[Reading] = []
-    for row in list(reversed(previous)) + rows:
-        result.append(
-            Reading(
-                channel=int(row["channel"]),
-                created_at=parse_datetime(row["created_at"]),
-                power_w=float(row.get("power_w") or 0),
-                energy_total_wh=float(row.get("energy_total_wh") or 0),
-            )
-        )
-    return result
+    return [
+        (parse_datetime(row["slot_start"]).timestamp(), int(row["channel"]), float(row["kwh"] or 0), int(row["starts"] or 0))
+        for row in rows
+    ]
 
 
-def fetch_rates(start_utc: datetime, end_utc: datetime) -> list[Rate]:
+def iter_half_hour_energy(
+    channels: list[int],
+    days: list[date],
+    executor: Executor | None = None,
+    ahead: int = 4,
+) -> Iterator[tuple[float, int, float, int]]:
+    """
+    Server-aggregated half-hour rows for consecutive UK days.
+
+    Each RPC call covers as many whole days as fit under PostgREST's default
+    1,000-row response limit (50 half-hours on the long DST day).
+    """
+    days_per_call = max(1, SUPABASE_MAX_ROWS // (50 * len(channels)))
+    chunks = [
+        (channels, uk_day_bounds(days[index])[0], uk_day_bounds(days[min(index + days_per_call, len(days)) - 1])[1])
+        for index in range(0, len(days), days_per_call)
+    ]
+    if executor is None:
+        pages = (fetch_half_hour_energy(*chunk) for chunk in chunks)
+    else:
+        pages = prefetched(executor, fetch_half_hour_energy, chunks, ahead)
+    for page in pages:
+        yield from page
+
+
+def half_hour_day_segments(
+    rows: Iterable[tuple[float, int, float, int]],
+    days: Iterable[date],
+) -> Iterator[tuple[date, list[tuple[float, float, float]], int]]:
+    """Group ordered half-hour rows into (day, sorted kWh segments, starts) per ascending UK day."""
+    rows = iter(rows)
+    pending = next(rows, None)
+    for day in days:
+        start_utc, end_utc = uk_day_bounds(day)
+        start, end = start_utc.timestamp(), end_utc.timestamp()
+        while pending is not None and pending[0] < start:
+            pending = next(rows, None)
+
+        segments: list[tuple[float, float, float]] = []
+        starts = 0
+        while pending is not None and pending[0] < end:
+            slot_start, _, kwh, slot_starts = pending
+            if kwh > 0:
+                segments.append((slot_start, slot_start + HALF_HOUR_SECONDS, kwh))
+            starts += slot_starts
+            pending = next(rows, None)
+        segments.sort()
+        yield day, segments, starts
+
+
+def day_windows(
+    channel: int,
+    readings: Iterable[ReadingSeries],
+    days: Iterable[date],
+) -> Iterator[tuple[date, ReadingSeries]]:
+    """
+    Split a channel's time-ordered reading chunks into one window per UK
+    day, for ascending days.
+
+    A window runs from the last reading before midnight to the first reading
+    at or after the next midnight, so every segment overlapping the day is
+    complete. Windows are views of the buffered chunks, and readings before
+    the current day are dropped from the buffer, so only about one day of
+    readings is held at a time.
+    """
+    chunks = iter(readings)
+    buffered = ReadingSeries(channel)
+    exhausted = False
+    for day in days:
+        start_us, end_us = (epoch_us(bound) for bound in uk_day_bounds(day))
+        while not exhausted and (not len(buffered) or buffered.created_us[-1] < end_us):
+            chunk = next(chunks, None)
+            if chunk is None:
+                exhausted = True
+            elif len(chunk):
+                buffered = ReadingSeries.concat(channel, (buffered, chunk))
+
+        first = max(bisect.bisect_left(buffered.created_us, start_us) - 1, 0)
+        closing = bisect.bisect_left(buffered.created_us, end_us)
+        yield day, buffered[first:closing + 1]
+        # The last reading before the next midnight opens the next window.
+        buffered = buffered[max(closing - 1, 0):]
+
+
+def octopus_tariff() -> tuple[str, str]:
     product = os.getenv("OCTOPUS_PRODUCT_CODE", "AGILE-24-10-01")
     region = os.getenv("OCTOPUS_REGION_CODE", "C")
-    tariff = f"E-1R-{product}-{region}"
-    base = f"https://api.octopus.energy/v1/products/{product}/electricity-tariffs/{tariff}/standard-unit-rates/"
+    return product, f"E-1R-{product}-{region}"
+
+
+def fetch_octopus_rates(start_utc: datetime, end_utc: datetime) -> list[Rate]:
+    product, tariff = octopus_tariff()
+    base = f"{OCTOPUS_API_URL}/{product}/electricity-tariffs/{tariff}/standard-unit-rates/"
     query = urllib.parse.urlencode(
         {
             "period_from": utc_iso(start_utc),
@@ -206,6 +705,57 @@ def fetch_rates(start_utc: datetime, end_utc: datetime) -> list[Rate]:
     return rates
 
 
+def fetch_rates(start_utc: datetime, end_utc: datetime, cache: ColumnarCache | None = None) -> list[Rate]:
+    """
+    Rates overlapping start_utc..end_utc, ordered by start.
+
+    With a cache, final UTC days are read from their partitions; runs of
+    uncached final days are fetched with one request each and written back,
+    and only days still open are always fetched live.
+    """
+    if cache is None:
+        return fetch_octopus_rates(start_utc, end_utc)
+
+    dataset = f"rates/{octopus_tariff()[1]}"
+    rates: list[Rate] = []
+    missing: list[date] = []
+    day = start_utc.astimezone(timezone.utc).date()
+    last_day = end_utc.astimezone(timezone.utc).date()
+    while day <= last_day and cache.is_final(day):
+        columns = cache.load(dataset, day)
+        if columns is None:
+            missing.append(day)
+        else:
+            rates.extend(
+                Rate(datetime.fromtimestamp(valid_from, timezone.utc), datetime.fromtimestamp(valid_to, timezone.utc), price)
+                for valid_from, valid_to, price in zip(*columns)
+            )
+        day += timedelta(days=1)
+
+    for _, run in itertools.groupby(enumerate(missing), key=lambda item: item[1].toordinal() - item[0]):
+        run_days = [missing_day for _, missing_day in run]
+        by_day: dict[date, list[Rate]] = {missing_day: [] for missing_day in run_days}
+        for rate in fetch_octopus_rates(utc_day_start(run_days[0]), utc_day_start(run_days[-1] + timedelta(days=1))):
+            day_rates = by_day.get(rate.valid_from.astimezone(timezone.utc).date())
+            if day_rates is not None:
+                day_rates.append(rate)
+        for missing_day, day_rates in by_day.items():
+            cache.store(dataset, missing_day, [
+                [rate.valid_from.timestamp() for rate in day_rates],
+                [rate.valid_to.timestamp() for rate in day_rates],
+                [rate.price_ppkwh for rate in day_rates],
+            ])
+            rates.extend(day_rates)
+
+    if day <= last_day:
+        live_from = utc_day_start(day)
+        rates.extend(rate for rate in fetch_octopus_rates(max(live_from, start_utc), end_utc) if rate.valid_from >= live_from)
+
+    rates = [rate for rate in rates if rate.valid_from < end_utc and rate.valid_to > start_utc]
+    rates.sort(key=lambda rate: rate.valid_from)
+    return rates
+
+
 def overlap_seconds(a_start: datetime, a_end: datetime, b_start: datetime, b_end: datetime) -> float:
     start = max(a_start, b_start)
     end = min(a_end, b_end)
@@ -220,26 +770,45 @@ def local_slot_bounds(day: date, slot_index: int) -> tuple[datetime, datetime]:
     return start_local.astimezone(timezone.utc), end_local.astimezone(timezone.utc)
 
 
+@lru_cache(maxsize=64)
+def day_slots(day: date) -> DaySlots:
+    bounds = sorted(
+        (start.timestamp(), end.timestamp(), slot_index)
+        for slot_index, (start, end) in ((index, local_slot_bounds(day, index)) for index in range(48))
+    )
+    return DaySlots(
+        starts=tuple(start for start, _, _ in bounds),
+        ends=tuple(end for _, end, _ in bounds),
+        indices=tuple(index for _, _, index in bounds),
+        longest=max(end - start for start, end, _ in bounds),
+    )
+
+
 def allocate_segment_to_slots(
     slots_kwh: list[float],
     day: date,
-    segment_start: datetime,
-    segment_end: datetime,
+    start: float,
+    end: float,
     segment_kwh: float,
 ) -> None:
-    duration = (segment_end - segment_start).total_seconds()
+    """Spread an epoch-second segment's kWh over the day's local slots by overlap."""
+    duration = end - start
     if duration <= 0 or segment_kwh <= 0:
         return
 
-    for slot_index in range(48):
-        slot_start, slot_end = local_slot_bounds(day, slot_index)
-        seconds = overlap_seconds(segment_start, segment_end, slot_start, slot_end)
+    # Only slots starting within one slot length before the segment can
+    # overlap it; a one-minute segment touches one slot, occasionally two.
+    slots = day_slots(day)
+    first = bisect.bisect_right(slots.starts, start - slots.longest)
+    last = bisect.bisect_left(slots.starts, end, first)
+    for position in range(first, last):
+        seconds = min(end, slots.ends[position]) - max(start, slots.starts[position])
         if seconds > 0:
-            slots_kwh[slot_index] += segment_kwh * (seconds / duration)
+            slots_kwh[slots.indices[position]] += segment_kwh * (seconds / duration)
 
 
 def cost_for_energy_window(
-    rates: list[Rate],
+    rates: RateIndex,
     segment_start: datetime,
     segment_end: datetime,
     segment_kwh: float,
@@ -250,24 +819,52 @@ def cost_for_energy_window(
 
     priced_kwh = 0.0
     cost_pence = 0.0
-    for rate in rates:
-        seconds = overlap_seconds(segment_start, segment_end, rate.valid_from, rate.valid_to)
-        if seconds <= 0:
-            continue
-
+    for seconds, price_ppkwh in rates.overlapping(segment_start.timestamp(), segment_end.timestamp()):
         kwh = segment_kwh * (seconds / duration)
         priced_kwh += kwh
-        cost_pence += kwh * rate.price_ppkwh
+        cost_pence += kwh * price_ppkwh
+
+    return priced_kwh, cost_pence
+
+
+def price_segments(rates: RateIndex, segments: list[tuple[float, float, float]]) -> tuple[float, float]:
+    """
+    Price (start, end, kwh) epoch-second segments sorted by start in one pass.
+
+    The first candidate rate only moves forward as segments advance, so a
+    day's segments are merged against the rates instead of searched one by
+    one. Returns (priced_kwh, cost_pence).
+    """
+    starts, ends, prices = rates.starts, rates.ends, rates.prices
+    first = 0
+    priced_kwh = 0.0
+    cost_pence = 0.0
+    for start, end, kwh in segments:
+        duration = end - start
+        if duration <= 0 or kwh <= 0:
+            continue
+
+        while first < len(starts) and starts[first] <= start - rates.longest:
+            first += 1
+        position = first
+        while position < len(starts) and starts[position] < end:
+            seconds = min(end, ends[position]) - max(start, starts[position])
+            if seconds > 0:
+                share = kwh * (seconds / duration)
+                priced_kwh += share
+                cost_pence += share * prices[position]
+            position += 1
 
     return priced_kwh, cost_pence
 
 
-def clipped_segment_kwh(previous: Reading, current: Reading) -> tuple[float, float]:
-    full_duration = (current.created_at - previous.created_at).total_seconds()
+def clipped_segment_kwh(readings: ReadingSeries, index: int) -> tuple[float, float]:
+    """(kWh, seconds) of the counter-delta segment ending at readings[index]."""
+    full_duration = (readings.created_us[index] - readings.created_us[index - 1]) / 1e6
     if full_duration <= 0:
         return 0.0, 0.0
 
-    delta_wh = current.energy_total_wh - previous.energy_total_wh
+    delta_wh = readings.energy_total_wh[index] - readings.energy_total_wh[index - 1]
     if delta_wh <= 0:
         return 0.0, full_duration
 
@@ -278,30 +875,29 @@ def clipped_segment_kwh(previous: Reading, current: Reading) -> tuple[float, flo
     return delta_wh / 1000.0, full_duration
 
 
-def price_for_slot(rates: list[Rate], slot_start: datetime, slot_end: datetime) -> float | None:
+def price_for_slot(rates: RateIndex, slot_start: datetime, slot_end: datetime) -> float | None:
     weighted = 0.0
     seconds_total = 0.0
-    for rate in rates:
-        seconds = overlap_seconds(slot_start, slot_end, rate.valid_from, rate.valid_to)
-        if seconds > 0:
-            weighted += rate.price_ppkwh * seconds
-            seconds_total += seconds
+    for seconds, price_ppkwh in rates.overlapping(slot_start.timestamp(), slot_end.timestamp()):
+        weighted += price_ppkwh * seconds
+        seconds_total += seconds
     if seconds_total <= 0:
         return None
     return weighted / seconds_total
 
 
-def starts_for_readings(readings: list[Reading], start_utc: datetime, end_utc: datetime) -> int:
-    if not readings:
+def starts_for_readings(readings: ReadingSeries, start_utc: datetime, end_utc: datetime) -> int:
+    if not len(readings):
         return 0
 
+    start_us, end_us = epoch_us(start_utc), epoch_us(end_utc)
     starts = 0
-    previous_on = readings[0].power_w > POWER_ON_THRESHOLD_W
-    for reading in readings[1:]:
-        if not (start_utc <= reading.created_at <= end_utc):
+    previous_on = readings.power_w[0] > POWER_ON_THRESHOLD_W
+    for created_us, power_w in zip(readings.created_us[1:], readings.power_w[1:]):
+        if not (start_us <= created_us <= end_us):
             continue
 
-        current_on = reading.power_w > POWER_ON_THRESHOLD_W
+        current_on = power_w > POWER_ON_THRESHOLD_W
         if current_on and not previous_on:
             starts += 1
         previous_on = current_on
@@ -309,16 +905,54 @@ def starts_for_readings(readings: list[Reading], start_utc: datetime, end_utc: d
     return starts
 
 
-def actual_for_day(
+def day_segments(
     day: date,
-    readings_by_channel: dict[int, list[Reading]],
-    rates: list[Rate],
-) -> dict[str, float]:
+    readings_by_channel: dict[int, ReadingSeries],
+) -> tuple[list[tuple[float, float, float]], int]:
+    """
+    Counter-delta (start, end, kwh) epoch-second segments within the UK day,
+    sorted by start, and the number of heater starts across the channels.
+    """
     start_utc, end_utc = uk_day_bounds(day)
+    start_us, end_us = epoch_us(start_utc), epoch_us(end_utc)
+    segments: list[tuple[float, float, float]] = []
+    starts = 0
+
+    for readings in readings_by_channel.values():
+        starts += starts_for_readings(readings, start_utc, end_utc)
+
+        created = readings.created_us
+        for index in range(1, len(readings)):
+            previous_us, current_us = created[index - 1], created[index]
+            if current_us <= start_us or previous_us >= end_us:
+                continue
+
+            full_segment_kwh, full_duration = clipped_segment_kwh(readings, index)
+            if full_segment_kwh <= 0 or full_duration <= 0:
+                continue
+
+            segment_start = max(previous_us, start_us)
+            segment_end = min(current_us, end_us)
+            if segment_end <= segment_start:
+                continue
+
+            segment_kwh = full_segment_kwh * (((segment_end - segment_start) / 1e6) / full_duration)
+            segments.append((segment_start / 1e6, segment_end / 1e6, segment_kwh))
+
+    segments.sort()
+    return segments, starts
+
+
+def actual_from_segments(
+    day: date,
+    segments: list[tuple[float, float, float]],
+    starts: int,
+    rates: RateIndex,
+) -> dict[str, float]:
     peak_start_local = datetime.combine(day, time(PEAK_WINDOW_START_HOUR), tzinfo=UK_TZ)
     peak_end_local = datetime.combine(day, time(PEAK_WINDOW_END_HOUR), tzinfo=UK_TZ)
-    peak_start_utc = peak_start_local.astimezone(timezone.utc)
-    peak_end_utc = peak_end_local.astimezone(timezone.utc)
+    peak_start = peak_start_local.timestamp()
+    peak_end = peak_end_local.timestamp()
 
     totals = {
         "actual_kwh": 0.0,
@@ -326,124 +960,396 @@ def actual_for_day(
         "actual_cost_pence": 0.0,
         "actual_peak_kwh": 0.0,
         "actual_peak_cost_pence": 0.0,
-        "actual_starts": 0.0,
+        "actual_starts": float(starts),
     }
 
-    for readings in readings_by_channel.values():
-        totals["actual_starts"] += starts_for_readings(readings, start_utc, end_utc)
-
-        for previous, current in zip(readings, readings[1:]):
-            if current.created_at <= start_utc or previous.created_at >= end_utc:
-                continue
-
-            full_segment_kwh, full_duration = clipped_segment_kwh(previous, current)
-            if full_segment_kwh <= 0 or full_duration <= 0:
-                continue
+    peak_segments: list[tuple[float, float, float]] = []
+    for segment_start, segment_end, segment_kwh in segments:
+        totals["actual_kwh"] += segment_kwh
+        peak_seconds = min(segment_end, peak_end) - max(segment_start, peak_start)
+        if peak_seconds > 0:
+            peak_kwh = segment_kwh * (peak_seconds / (segment_end - segment_start))
+            totals["actual_peak_kwh"] += peak_kwh
+            peak_segments.append((max(segment_start, peak_start), min(segment_end, peak_end), peak_kwh))
+
+    # Segments are sorted by start, so each set is priced in one pass.
+    totals["actual_priced_kwh"], totals["actual_cost_pence"] = price_segments(rates, segments)
+    _, totals["actual_peak_cost_pence"] = price_segments(rates, peak_segments)
+    return totals
 
-            segment_start = max(previous.created_at, start_utc)
-            segment_end = min(current.created_at, end_utc)
-            clipped_duration = (segment_end - segment_start).total_seconds()
-            if clipped_duration <= 0:
-                continue
 
-            segment_kwh = full_segment_kwh * (clipped_duration / full_duration)
-            priced_kwh, cost_pence = cost_for_energy_window(rates, segment_start, segment_end, segment_kwh)
-            totals["actual_kwh"] += segment_kwh
-            totals["actual_priced_kwh"] += priced_kwh
-            totals["actual_cost_pence"] += cost_pence
+def actual_for_day(
+    day: date,
+    readings_by_channel: dict[int, ReadingSeries],
+    rates: RateIndex,
+) -> dict[str, float]:
+    return actual_from_segments(day, *day_segments(day, readings_by_channel), rates)
 
-            peak_seconds = overlap_seconds(segment_start, segment_end, peak_start_utc, peak_end_utc)
-            if peak_seconds > 0:
-                peak_kwh = segment_kwh * (peak_seconds / clipped_duration)
-                _, peak_cost = cost_for_energy_window(rates, max(segment_start, peak_start_utc), min(segment_end, peak_end_utc), peak_kwh)
-                totals["actual_peak_kwh"] += peak_kwh
-                totals["actual_peak_cost_pence"] += peak_cost
 
-    return totals
+def baseline_profile_from_segments(
+    day: date,
+    segments: list[tuple[float, float, float]],
+    starts: int,
+) -> tuple[list[float], float, int]:
+    slots_kwh = [0.0 for _ in range(48)]
+    for segment_start, segment_end, segment_kwh in segments:
+        allocate_segment_to_slots(slots_kwh, day, segment_start, segment_end, segment_kwh)
+    return slots_kwh, sum(slots_kwh), starts
 
 
 def baseline_profile_for_day(
     day: date,
-    readings: list[Reading],
+    readings: ReadingSeries,
 ) -> tuple[list[float], float, int]:
+    return baseline_profile_from_segments(day, *day_segments(day, {readings.channel: readings}))
+
+
+def load_baseline(day: date, channel: int, aggregate: str, cache: ColumnarCache | None = None) -> BaselineProfile:
     start_utc, end_utc = uk_day_bounds(day)
-    slots_kwh = [0.0 for _ in range(48)]
+    if aggregate == "server":
+        _, segments, day_starts = next(half_hour_day_segments(fetch_half_hour_energy([channel], start_utc, end_utc), [day]))
+        slots_kwh, total_kwh, starts = baseline_profile_from_segments(day, segments, day_starts)
+    else:
+        slots_kwh, total_kwh, starts = baseline_profile_for_day(day, fetch_readings(channel, start_utc, end_utc, cache))
+    if total_kwh <= 0:
+        raise SystemExit(f"Baseline date {day} has no measured kWh on channel {channel}")
+    return BaselineProfile(day, tuple(slot / total_kwh for slot in slots_kwh), total_kwh, starts)
+
+
+UNIFORM_WEIGHTS = tuple(1.0 / 48.0 for _ in range(48))
+
+# How a scenario spreads its day's kWh over the 48 local half-hour slots.
+WEIGHTINGS = {
+    "profile": lambda baseline: baseline.weights,
+    "uniform": lambda baseline: UNIFORM_WEIGHTS,
+}
+
+# A scenario's (kWh, expected starts) for a day, given the measured kWh: the
+# same energy at the baseline's starts per kWh, or the baseline day repeated.
+ENERGY_BASES = {
+    "same_kwh": lambda baseline, actual_kwh: (actual_kwh, actual_kwh * baseline.starts / baseline.total_kwh),
+    "thermostat": lambda baseline, actual_kwh: (baseline.total_kwh, baseline.starts),
+}
+
+# The first baseline's scenarios behind the wide CSV and the summary sections.
+SUMMARY_SCENARIOS = (("profile", "same_kwh"), ("uniform", "same_kwh"), ("profile", "thermostat"), ("uniform", "thermostat"))
+SCENARIO_MEASURES = ("kwh", "priced_kwh", "cost_pence", "peak_kwh", "peak_cost_pence", "starts")
+
+
+def scenario_matrix(baselines: list[BaselineProfile], weightings: list[str], energy_bases: list[str]) -> list[Scenario]:
+    """The summary scenarios followed by every other baseline x weighting x energy basis."""
+    scenarios = [Scenario(baselines[0], weighting, energy) for weighting, energy in SUMMARY_SCENARIOS]
+    scenarios.extend(itertools.starmap(Scenario, itertools.product(baselines, weightings, energy_bases)))
+    return list(dict.fromkeys(scenarios))
+
+
+def slot_price_vectors(day: date, rates: RateIndex) -> tuple[list[float], ...]:
+    """
+    The day's 48 slot prices as (priced, prices, peak_priced, peak_prices)
+    vectors for dot products: 1/0 masks and prices zeroed where a slot is
+    unpriced or, for the peak pair, outside 16:00-19:00.
+    """
+    prices = [price_for_slot(rates, *local_slot_bounds(day, slot_index)) for slot_index in range(48)]
+    priced = [0.0 if slot_price is None else 1.0 for slot_price in prices]
+    peak = [float(PEAK_WINDOW_START_HOUR <= (slot_index * 30) // 60 < PEAK_WINDOW_END_HOUR) for slot_index in range(48)]
+    zeroed = [slot_price or 0.0 for slot_price in prices]
+    return priced, zeroed, list(map(operator.mul, priced, peak)), list(map(operator.mul, zeroed, peak))
+
+
+def scenario_costs(
+    day: date,
+    rates: RateIndex,
+    scenarios: list[Scenario],
+    actual_kwh: float,
+) -> list[dict[str, float]]:
+    """
+    Each scenario's kWh, priced kWh, cost, 16:00-19:00 kWh and cost, and
+    expected starts for the day.
+
+    Slot prices are looked up once per day. A scenario's day is its kWh times
+    a one-kWh profile of its weights, so each distinct weights vector costs
+    four dot products and each scenario on top of it one multiplication.
+    """
+    vectors = slot_price_vectors(day, rates)
+    unit_costs: dict[tuple[float, ...], tuple[float, ...]] = {}
+    costs = []
+    for scenario in scenarios:
+        weights = WEIGHTINGS[scenario.weighting](scenario.baseline)
+        unit = unit_costs.get(weights)
+        if unit is None:
+            unit = unit_costs[weights] = tuple(sum(map(operator.mul, weights, vector)) for vector in vectors)
+        kwh, starts = ENERGY_BASES[scenario.energy](scenario.baseline, actual_kwh)
+        priced, cost, peak, peak_cost = (kwh * value for value in unit)
+        costs.append({
+            "kwh": kwh,
+            "priced_kwh": priced,
+            "cost_pence": cost,
+            "peak_kwh": peak,
+            "peak_cost_pence": peak_cost,
+            "starts": starts,
+        })
+    return costs
+
+
+def scenario_row(day: str, scenario: dict, actual_cost_pence: float) -> dict[str, float | str]:
+    """A long-format CSV row for one scenario's day or period totals."""
+    return {
+        "date": day,
+        "baseline_date": scenario["baseline_date"],
+        "weighting": scenario["weighting"],
+        "energy": scenario["energy"],
+        "kwh": scenario["kwh"],
+        "cost_gbp": scenario["cost_pence"] / 100.0,
+        "avg_ppkwh": scenario["cost_pence"] / scenario["kwh"] if scenario["kwh"] else 0.0,
+        "saving_gbp": (scenario["cost_pence"] - actual_cost_pence) / 100.0,
+        "peak_kwh": scenario["peak_kwh"],
+        "expected_starts": scenario["starts"],
+    }
 
-    for previous, current in zip(readings, readings[1:]):
-        if current.created_at <= start_utc or previous.created_at >= end_utc:
-            continue
 
-        full_segment_kwh, full_duration = clipped_segment_kwh(previous, current)
-        if full_segment_kwh <= 0 or full_duration <= 0:
-            continue
+def money(value_pence: float) -> str:
+    return f"GBP {value_pence / 100:.2f}"
 
-        segment_start = max(previous.created_at, start_utc)
-        segment_end = min(current.created_at, end_utc)
-        clipped_duration = (segment_end - segment_start).total_seconds()
-        if clipped_duration <= 0:
-            continue
 
-        segment_kwh = full_segment_kwh * (clipped_duration / full_duration)
-        allocate_segment_to_slots(slots_kwh, day, segment_start, segment_end, segment_kwh)
+def price(value_pence_per_kwh: float | None) -> str:
+    if value_pence_per_kwh is None:
+        return "n/a"
+    return f"{value_pence_per_kwh:.2f}p/kWh"
 
-    total_kwh = sum(slots_kwh)
-    starts = starts_for_readings(readings, start_utc, end_utc)
-    return slots_kwh, total_kwh, starts
 
+def daily_inputs(
+    days: list[date],
+    channels: list[int],
+    aggregate: str,
+    executor: Executor | None,
+    fetch_workers: int,
+    cache: ColumnarCache | None,
+) -> Iterator[tuple[date, object]]:
+    """
+    (day, day input) for consecutive UK days: the day's reading window per
+    channel, or with server aggregation its (half-hour segments, starts).
+    """
+    if aggregate == "server":
+        # The database returns at most 48 half-hour rows per channel and day.
+        for day, segments, day_starts in half_hour_day_segments(iter_half_hour_energy(channels, days, executor), days):
+            yield day, (segments, day_starts)
+        return
 
-def baseline_cost_for_day(
-    day: date,
-    rates: list[Rate],
-    baseline_weights: list[float],
-    target_kwh: float,
-) -> dict[str, float]:
-    peak_kwh = 0.0
-    peak_cost_pence = 0.0
-    cost_pence = 0.0
-    priced_kwh = 0.0
+    # Readings stream in page by page and are cut into per-day windows, so
+    # memory stays at about one day of readings whatever the period.
+    # Channels and the chunks ahead of the current day are fetched concurrently.
+    start_utc, _ = uk_day_bounds(days[0])
+    _, end_utc = uk_day_bounds(days[-1])
+    ahead = max(1, fetch_workers // max(1, len(channels)))
+    channel_windows = [
+        day_windows(channel, iter_readings(channel, start_utc, end_utc, executor, ahead, cache), days)
+        for channel in channels
+    ]
+    for windows in zip(*channel_windows):
+        yield windows[0][0], {channel: window for channel, (_, window) in zip(channels, windows)}
 
-    for slot_index, weight in enumerate(baseline_weights):
-        slot_kwh = target_kwh * weight
-        if slot_kwh <= 0:
-            continue
 
-        slot_start, slot_end = local_slot_bounds(day, slot_index)
-        price = price_for_slot(rates, slot_start, slot_end)
-        if price is None:
-            continue
+def segments_for_input(day: date, day_input) -> tuple[list[tuple[float, float, float]], int]:
+    if isinstance(day_input, dict):
+        return day_segments(day, day_input)
+    return day_input
 
-        priced_kwh += slot_kwh
-        cost_pence += slot_kwh * price
 
-        local_hour = (slot_index * 30) // 60
-        if PEAK_WINDOW_START_HOUR <= local_hour < PEAK_WINDOW_END_HOUR:
-            peak_kwh += slot_kwh
-            peak_cost_pence += slot_kwh * price
+def pack_input(day_input):
+    """Flatten server segments into one float64 array; reading series already pickle as arrays."""
+    if isinstance(day_input, dict):
+        return day_input
+    segments, day_starts = day_input
+    return array("d", itertools.chain.from_iterable(segments)), day_starts
 
-    return {
-        "baseline_kwh": target_kwh,
-        "baseline_priced_kwh": priced_kwh,
-        "baseline_cost_pence": cost_pence,
-        "baseline_peak_kwh": peak_kwh,
-        "baseline_peak_cost_pence": peak_cost_pence,
+
+def unpack_input(packed):
+    if isinstance(packed, dict):
+        return packed
+    values, day_starts = packed
+    return list(zip(values[0::3], values[1::3], values[2::3])), day_starts
+
+
+def day_result(
+    day: date,
+    segments: list[tuple[float, float, float]],
+    day_starts: int,
+    rates: RateIndex,
+    scenarios: list[Scenario],
+) -> dict:
+    """The day's wide CSV row, its scenario results and its contributions to the actual totals."""
+    actual = actual_from_segments(day, segments, day_starts, rates)
+    costs = scenario_costs(day, rates, scenarios, actual["actual_kwh"])
+    same_kwh, uniform_same_kwh, thermostat, uniform_thermostat = costs[:len(SUMMARY_SCENARIOS)]
+
+    row = {
+        "date": day.isoformat(),
+        "actual_kwh": actual["actual_kwh"],
+        "actual_cost_gbp": actual["actual_cost_pence"] / 100.0,
+        "actual_avg_ppkwh": actual["actual_cost_pence"] / actual["actual_kwh"] if actual["actual_kwh"] else 0.0,
+        "actual_peak_kwh": actual["actual_peak_kwh"],
+        "actual_starts": actual["actual_starts"],
+        "same_kwh_baseline_cost_gbp": same_kwh["cost_pence"] / 100.0,
+        "same_kwh_saving_gbp": (same_kwh["cost_pence"] - actual["actual_cost_pence"]) / 100.0,
+        "same_kwh_peak_kwh": same_kwh["peak_kwh"],
+        "same_kwh_expected_starts": same_kwh["starts"],
+        "uniform_same_kwh_baseline_cost_gbp": uniform_same_kwh["cost_pence"] / 100.0,
+        "uniform_same_kwh_saving_gbp": (uniform_same_kwh["cost_pence"] - actual["actual_cost_pence"]) / 100.0,
+        "uniform_same_kwh_peak_kwh": uniform_same_kwh["peak_kwh"],
+        "thermostat_baseline_kwh": thermostat["kwh"],
+        "thermostat_baseline_cost_gbp": thermostat["cost_pence"] / 100.0,
+        "thermostat_saving_gbp": (thermostat["cost_pence"] - actual["actual_cost_pence"]) / 100.0,
+        "thermostat_peak_kwh": thermostat["peak_kwh"],
+        "thermostat_expected_starts": thermostat["starts"],
+        "uniform_thermostat_baseline_cost_gbp": uniform_thermostat["cost_pence"] / 100.0,
+        "uniform_thermostat_saving_gbp": (uniform_thermostat["cost_pence"] - actual["actual_cost_pence"]) / 100.0,
+        "uniform_thermostat_peak_kwh": uniform_thermostat["peak_kwh"],
     }
+    totals = {
+        "days": 1,
+        "actual_kwh": actual["actual_kwh"],
+        "actual_cost_pence": actual["actual_cost_pence"],
+        "actual_peak_kwh": actual["actual_peak_kwh"],
+        "actual_peak_cost_pence": actual["actual_peak_cost_pence"],
+        "actual_starts": actual["actual_starts"],
+    }
+    scenario_results = [
+        {
+            "baseline_date": scenario.baseline.day.isoformat(),
+            "weighting": scenario.weighting,
+            "energy": scenario.energy,
+            **cost,
+        }
+        for scenario, cost in zip(scenarios, costs)
+    ]
+    return {"row": row, "totals": totals, "scenarios": scenario_results}
 
 
-def money(value_pence: float) -> str:
-    return f"GBP {value_pence / 100:.2f}"
+# Per-process state, set once by init_day_worker so each task only pickles its day.
+_worker_rates: RateIndex | None = None
+_worker_scenarios: list[Scenario] = []
 
 
-def price(value_pence_per_kwh: float | None) -> str:
-    if value_pence_per_kwh is None:
-        return "n/a"
-    return f"{value_pence_per_kwh:.2f}p/kWh"
+def init_day_worker(rates: RateIndex, scenarios: list[Scenario]) -> None:
+    global _worker_rates, _worker_scenarios
+    _worker_rates = rates
+    _worker_scenarios = scenarios
+
+
+def day_result_in_worker(day: date, packed) -> tuple[date, dict]:
+    segments, day_starts = segments_for_input(day, unpack_input(packed))
+    return day, day_result(day, segments, day_starts, _worker_rates, _worker_scenarios)
+
+
+def compute_day_results(
+    inputs: Iterable[tuple[date, object]],
+    rates: RateIndex,
+    scenarios: list[Scenario],
+    jobs: int = 1,
+) -> Iterator[tuple[date, dict]]:
+    """
+    (day, day_result) for each day whose rates are available, in day order.
+
+    With jobs > 1, days are turned into segments and priced on a process
+    pool while the next ones are fetched. Rates and the scenarios reach each
+    worker once; a day's readings travel as ReadingSeries arrays, which pickle
+    as single buffers instead of one object per reading. Results come back
+    in day order, so totals add up exactly as in a serial run.
+    """
+    covered = (
+        (day, day_input)
+        for day, day_input in inputs
+        if rates.covers(*(bound.timestamp() for bound in uk_day_bounds(day)))
+    )
+    if jobs <= 1:
+        for day, day_input in covered:
+            segments, day_starts = segments_for_input(day, day_input)
+            yield day, day_result(day, segments, day_starts, rates, scenarios)
+        return
+
+    with ProcessPoolExecutor(
+        max_workers=jobs,
+        initializer=init_day_worker,
+        initargs=(rates, scenarios),
+    ) as pool:
+        tasks = ((day, pack_input(day_input)) for day, day_input in covered)
+        yield from prefetched(pool, day_result_in_worker, tasks, jobs * 2)
+
+
+def day_is_final(day: date) -> bool:
+    """Whether the UK day's readings and rates can no longer change."""
+    return uk_day_bounds(day)[1] + SETTLE <= datetime.now(timezone.utc)
+
+
+def result_sources() -> list[Path]:
+    """This script, the telemetry cache and the migrations defining get_half_hour_energy."""
+    here = Path(__file__).resolve().parent
+    migrations = sorted(
+        path
+        for path in MIGRATIONS_DIR.glob("*.sql")
+        if "get_half_hour_energy" in path.read_text(encoding="utf-8")
+    )
+    return [here / "flex_savings.py", here / "telemetry_cache.py", *migrations]
+
+
+@lru_cache(maxsize=1)
+def code_version() -> str:
+    digest = hashlib.sha256()
+    for path in result_sources():
+        digest.update(path.name.encode("utf-8") + b"\0" + path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def day_result_key(channels: list[int], aggregate: str, scenarios: list[Scenario]) -> str:
+    """Hash of everything besides the day's own data that a day result depends on."""
+    identity = json.dumps({
+        "channels": sorted(channels),
+        "aggregate": aggregate,
+        "scenarios": [
+            [scenario.baseline.day.isoformat(), scenario.baseline.weights, scenario.baseline.total_kwh,
+             scenario.baseline.starts, scenario.weighting, scenario.energy]
+            for scenario in scenarios
+        ],
+        "schema": RESULT_SCHEMA_VERSION,
+        "code": code_version(),
+    })
+    return hashlib.sha256(identity.encode("utf-8")).hexdigest()[:16]
+
+
+class DayResultStore:
+    """Memoised day_result records, one JSON file per day under a result-key directory."""
+
+    def __init__(self, root: Path, key: str):
+        self.directory = Path(root) / "flex_days" / key
+
+    def load(self, day: date) -> dict | None:
+        try:
+            return json.loads((self.directory / f"{day.isoformat()}.json").read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+
+    def store(self, day: date, record: dict) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / f"{day.isoformat()}.json"
+        partial = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        partial.write_text(json.dumps(record), encoding="utf-8")
+        os.replace(partial, path)
 
 
 def main() -> int:
     args = parse_args()
     load_environment()
 
-    baseline_day = date.fromisoformat(args.baseline_date)
+    baseline_days = list(dict.fromkeys(date.fromisoformat(item.strip()) for item in args.baseline_date.split(",") if item.strip()))
+    weightings = [item.strip() for item in args.weightings.split(",") if item.strip()]
+    energy_bases = [item.strip() for item in args.energy_bases.split(",") if item.strip()]
+    unknown = [item for item in weightings if item not in WEIGHTINGS] + [item for item in energy_bases if item not in ENERGY_BASES]
+    if not baseline_days:
+        raise SystemExit("At least one baseline date is required")
+    if unknown:
+        raise SystemExit(f"Unknown weightings or energy bases: {', '.join(unknown)}")
+
+    baseline_day = baseline_days[0]
     default_start = baseline_day + timedelta(days=1)
     yesterday_uk = datetime.now(UK_TZ).date() - timedelta(days=1)
     start_day = date.fromisoformat(args.start) if args.start else default_start
@@ -456,30 +1362,16 @@ def main() -> int:
     output_dir = Path(args.output_dir)
     output_dir.mkdir(parents=True, exist_ok=True)
 
-    analysis_start_utc, _ = uk_day_bounds(start_day)
-    _, analysis_end_utc = uk_day_bounds(end_day)
-    baseline_start_utc, baseline_end_utc = uk_day_bounds(baseline_day)
-    fetch_start = min(analysis_start_utc, baseline_start_utc)
-    fetch_end = max(analysis_end_utc, baseline_end_utc)
-
-    all_rates = fetch_rates(fetch_start, fetch_end)
-    readings_by_channel = {
-        channel: fetch_readings(channel, fetch_start, fetch_end)
-        for channel in channels
-    }
-
-    baseline_channel = 1 if 1 in readings_by_channel else channels[0]
-    baseline_slots, baseline_total_kwh, baseline_starts = baseline_profile_for_day(
-        baseline_day,
-        readings_by_channel[baseline_channel],
-    )
-    if baseline_total_kwh <= 0:
-        raise SystemExit(f"Baseline date {baseline_day} has no measured kWh on channel {baseline_channel}")
+    cache = ColumnarCache(Path(args.cache_dir)) if args.cache_dir else None
 
-    baseline_weights = [slot / baseline_total_kwh for slot in baseline_slots]
-    baseline_starts_per_kwh = baseline_starts / baseline_total_kwh if baseline_total_kwh else 0.0
+    baseline_channel = 1 if 1 in channels else channels[0]
+    baselines = [load_baseline(day, baseline_channel, args.aggregate, cache) for day in baseline_days]
+    baseline = baselines[0]
+    baseline_starts_per_kwh = baseline.starts / baseline.total_kwh
+    scenarios = scenario_matrix(baselines, weightings, energy_bases)
 
     daily_rows: list[dict[str, float | str]] = []
+    scenario_rows: list[dict[str, float | str]] = []
     totals = {
         "days": 0,
         "actual_kwh": 0.0,
@@ -487,89 +1379,68 @@ def main() -> int:
         "actual_peak_kwh": 0.0,
         "actual_peak_cost_pence": 0.0,
         "actual_starts": 0.0,
-        "same_kwh_cost_pence": 0.0,
-        "same_kwh_peak_kwh": 0.0,
-        "same_kwh_peak_cost_pence": 0.0,
-        "same_kwh_starts": 0.0,
-        "uniform_same_kwh_cost_pence": 0.0,
-        "uniform_same_kwh_peak_kwh": 0.0,
-        "uniform_same_kwh_peak_cost_pence": 0.0,
-        "thermostat_kwh": 0.0,
-        "thermostat_cost_pence": 0.0,
-        "thermostat_peak_kwh": 0.0,
-        "thermostat_peak_cost_pence": 0.0,
-        "thermostat_starts": 0.0,
-        "uniform_thermostat_kwh": 0.0,
-        "uniform_thermostat_cost_pence": 0.0,
-        "uniform_thermostat_peak_kwh": 0.0,
-        "uniform_thermostat_peak_cost_pence": 0.0,
     }
-    uniform_weights = [1.0 / 48.0 for _ in range(48)]
+    scenario_totals = {
+        (scenario.baseline.day.isoformat(), scenario.weighting, scenario.energy): dict.fromkeys(SCENARIO_MEASURES, 0.0)
+        for scenario in scenarios
+    }
 
-    for day in daterange(start_day, end_day):
-        day_start_utc, day_end_utc = uk_day_bounds(day)
-        day_rates = [
-            rate for rate in all_rates
-            if overlap_seconds(day_start_utc, day_end_utc, rate.valid_from, rate.valid_to) > 0
-        ]
-        if not day_rates:
-            continue
+    # Final days are memoised per channel set, baseline profile and code
+    # version; only new or invalidated days are fetched and computed.
+    days = list(daterange(start_day, end_day))
+    results = None
+    if args.cache_dir:
+        results = DayResultStore(
+            Path(args.cache_dir),
+            day_result_key(channels, args.aggregate, scenarios),
+        )
+    memoised = {}
+    for day in days:
+        record = results.load(day) if results is not None else None
+        if record is not None:
+            memoised[day] = record
+    pending_days = [day for day in days if day not in memoised]
 
-        actual = actual_for_day(day, readings_by_channel, day_rates)
-        same_kwh = baseline_cost_for_day(day, day_rates, baseline_weights, actual["actual_kwh"])
-        uniform_same_kwh = baseline_cost_for_day(day, day_rates, uniform_weights, actual["actual_kwh"])
-        thermostat = baseline_cost_for_day(day, day_rates, baseline_weights, baseline_total_kwh)
-        uniform_thermostat = baseline_cost_for_day(day, day_rates, uniform_weights, baseline_total_kwh)
-
-        same_kwh_starts = actual["actual_kwh"] * baseline_starts_per_kwh
-
-        row = {
-            "date": day.isoformat(),
-            "actual_kwh": actual["actual_kwh"],
-            "actual_cost_gbp": actual["actual_cost_pence"] / 100.0,
-            "actual_avg_ppkwh": actual["actual_cost_pence"] / actual["actual_kwh"] if actual["actual_kwh"] else 0.0,
-            "actual_peak_kwh": actual["actual_peak_kwh"],
-            "actual_starts": actual["actual_starts"],
-            "same_kwh_baseline_cost_gbp": same_kwh["baseline_cost_pence"] / 100.0,
-            "same_kwh_saving_gbp": (same_kwh["baseline_cost_pence"] - actual["actual_cost_pence"]) / 100.0,
-            "same_kwh_peak_kwh": same_kwh["baseline_peak_kwh"],
-            "same_kwh_expected_starts": same_kwh_starts,
-            "uniform_same_kwh_baseline_cost_gbp": uniform_same_kwh["baseline_cost_pence"] / 100.0,
-            "uniform_same_kwh_saving_gbp": (uniform_same_kwh["baseline_cost_pence"] - actual["actual_cost_pence"]) / 100.0,
-            "uniform_same_kwh_peak_kwh": uniform_same_kwh["baseline_peak_kwh"],
-            "thermostat_baseline_kwh": thermostat["baseline_kwh"],
-            "thermostat_baseline_cost_gbp": thermostat["baseline_cost_pence"] / 100.0,
-            "thermostat_saving_gbp": (thermostat["baseline_cost_pence"] - actual["actual_cost_pence"]) / 100.0,
-            "thermostat_peak_kwh": thermostat["baseline_peak_kwh"],
-            "thermostat_expected_starts": baseline_starts,
-            "uniform_thermostat_baseline_cost_gbp": uniform_thermostat["baseline_cost_pence"] / 100.0,
-            "uniform_thermostat_saving_gbp": (uniform_thermostat["baseline_cost_pence"] - actual["actual_cost_pence"]) / 100.0,
-            "uniform_thermostat_peak_kwh": uniform_thermostat["baseline_peak_kwh"],
-        }
-        daily_rows.append(row)
-
-        totals["days"] += 1
-        totals["actual_kwh"] += actual["actual_kwh"]
-        totals["actual_cost_pence"] += actual["actual_cost_pence"]
-        totals["actual_peak_kwh"] += actual["actual_peak_kwh"]
-        totals["actual_peak_cost_pence"] += actual["actual_peak_cost_pence"]
-        totals["actual_starts"] += actual["actual_starts"]
-        totals["same_kwh_cost_pence"] += same_kwh["baseline_cost_pence"]
-        totals["same_kwh_peak_kwh"] += same_kwh["baseline_peak_kwh"]
-        totals["same_kwh_peak_cost_pence"] += same_kwh["baseline_peak_cost_pence"]
-        totals["same_kwh_starts"] += same_kwh_starts
-        totals["uniform_same_kwh_cost_pence"] += uniform_same_kwh["baseline_cost_pence"]
-        totals["uniform_same_kwh_peak_kwh"] += uniform_same_kwh["baseline_peak_kwh"]
-        totals["uniform_same_kwh_peak_cost_pence"] += uniform_same_kwh["baseline_peak_cost_pence"]
-        totals["thermostat_kwh"] += thermostat["baseline_kwh"]
-        totals["thermostat_cost_pence"] += thermostat["baseline_cost_pence"]
-        totals["thermostat_peak_kwh"] += thermostat["baseline_peak_kwh"]
-        totals["thermostat_peak_cost_pence"] += thermostat["baseline_peak_cost_pence"]
-        totals["thermostat_starts"] += baseline_starts
-        totals["uniform_thermostat_kwh"] += uniform_thermostat["baseline_kwh"]
-        totals["uniform_thermostat_cost_pence"] += uniform_thermostat["baseline_cost_pence"]
-        totals["uniform_thermostat_peak_kwh"] += uniform_thermostat["baseline_peak_kwh"]
-        totals["uniform_thermostat_peak_cost_pence"] += uniform_thermostat["baseline_peak_cost_pence"]
+    rates: list[Rate] = []
+    if pending_days:
+        rates = fetch_rates(uk_day_bounds(pending_days[0])[0], uk_day_bounds(pending_days[-1])[1], cache)
+    rate_index = RateIndex(rates)
+
+    executor = ThreadPoolExecutor(max_workers=args.fetch_workers) if args.fetch_workers > 1 else None
+    runs = [
+        [day for _, day in run]
+        for _, run in itertools.groupby(enumerate(pending_days), key=lambda item: item[1].toordinal() - item[0])
+    ]
+    computed = compute_day_results(
+        itertools.chain.from_iterable(
+            daily_inputs(run, channels, args.aggregate, executor, args.fetch_workers, cache) for run in runs
+        ),
+        rate_index,
+        scenarios,
+        args.jobs,
+    )
+    next_computed = next(computed, None)
+    for day in days:
+        record = memoised.get(day)
+        if record is None:
+            # Days without rates are not computed.
+            if next_computed is None or next_computed[0] != day:
+                continue
+            record = next_computed[1]
+            next_computed = next(computed, None)
+            if results is not None and day_is_final(day):
+                results.store(day, record)
+
+        daily_rows.append(record["row"])
+        for key, value in record["totals"].items():
+            totals[key] += value
+        for scenario in record["scenarios"]:
+            accumulated = scenario_totals[scenario["baseline_date"], scenario["weighting"], scenario["energy"]]
+            for measure in SCENARIO_MEASURES:
+                accumulated[measure] += scenario[measure]
+            scenario_rows.append(scenario_row(record["row"]["date"], scenario, record["totals"]["actual_cost_pence"]))
+    if executor is not None:
+        executor.shutdown()
 
     csv_path = output_dir / "flex_savings_daily.csv"
     with csv_path.open("w", newline="", encoding="utf-8") as csv_file:
@@ -578,24 +1449,55 @@ def main() -> int:
             writer.writeheader()
             writer.writerows(daily_rows)
 
+    scenarios_path = output_dir / "flex_savings_scenarios.csv"
+    with scenarios_path.open("w", newline="", encoding="utf-8") as csv_file:
+        writer = csv.DictWriter(csv_file, fieldnames=list(scenario_rows[0].keys()) if scenario_rows else [])
+        if scenario_rows:
+            writer.writeheader()
+            writer.writerows(scenario_rows)
+
+    same_kwh, uniform_same_kwh, thermostat, uniform_thermostat = (
+        scenario_totals[baseline_day.isoformat(), weighting, energy] for weighting, energy in SUMMARY_SCENARIOS
+    )
     actual_avg = totals["actual_cost_pence"] / totals["actual_kwh"] if totals["actual_kwh"] else None
-    same_kwh_avg = totals["same_kwh_cost_pence"] / totals["actual_kwh"] if totals["actual_kwh"] else None
-    uniform_same_kwh_avg = totals["uniform_same_kwh_cost_pence"] / totals["actual_kwh"] if totals["actual_kwh"] else None
-    thermostat_avg = totals["thermostat_cost_pence"] / totals["thermostat_kwh"] if totals["thermostat_kwh"] else None
-    uniform_thermostat_avg = totals["uniform_thermostat_cost_pence"] / totals["uniform_thermostat_kwh"] if totals["uniform_thermostat_kwh"] else None
-    same_kwh_saving = totals["same_kwh_cost_pence"] - totals["actual_cost_pence"]
-    uniform_same_kwh_saving = totals["uniform_same_kwh_cost_pence"] - totals["actual_cost_pence"]
-    thermostat_saving = totals["thermostat_cost_pence"] - totals["actual_cost_pence"]
-    uniform_thermostat_saving = totals["uniform_thermostat_cost_pence"] - totals["actual_cost_pence"]
-    starts_avoided_same_kwh = totals["same_kwh_starts"] - totals["actual_starts"]
-    starts_avoided_thermostat = totals["thermostat_starts"] - totals["actual_starts"]
+    same_kwh_avg = same_kwh["cost_pence"] / totals["actual_kwh"] if totals["actual_kwh"] else None
+    uniform_same_kwh_avg = uniform_same_kwh["cost_pence"] / totals["actual_kwh"] if totals["actual_kwh"] else None
+    thermostat_avg = thermostat["cost_pence"] / thermostat["kwh"] if thermostat["kwh"] else None
+    uniform_thermostat_avg = uniform_thermostat["cost_pence"] / uniform_thermostat["kwh"] if uniform_thermostat["kwh"] else None
+    same_kwh_saving = same_kwh["cost_pence"] - totals["actual_cost_pence"]
+    uniform_same_kwh_saving = uniform_same_kwh["cost_pence"] - totals["actual_cost_pence"]
+    thermostat_saving = thermostat["cost_pence"] - totals["actual_cost_pence"]
+    uniform_thermostat_saving = uniform_thermostat["cost_pence"] - totals["actual_cost_pence"]
+    starts_avoided_same_kwh = same_kwh["starts"] - totals["actual_starts"]
+    starts_avoided_thermostat = thermostat["starts"] - totals["actual_starts"]
+
+    # Beyond the four summary sections, the matrix is tabulated when it has more scenarios.
+    matrix_lines = []
+    if len(scenario_totals) > len(SUMMARY_SCENARIOS):
+        matrix_lines = [
+            "## Scenario matrix",
+            "",
+            "Period totals for every baseline date, slot weighting and energy basis.",
+            "",
+            "| Baseline date | Weighting | Energy | kWh | Cost | Avg unit rate | Saving vs actual | 16:00-19:00 kWh | Starts avoided |",
+            "| --- | --- | --- | ---: | ---: | ---: | ---: | ---: | ---: |",
+            *(
+                f"| {baseline_date} | {weighting} | {energy} | {measures['kwh']:.1f} | {money(measures['cost_pence'])} | "
+                f"{price(measures['cost_pence'] / measures['kwh'] if measures['kwh'] else None)} | "
+                f"{money(measures['cost_pence'] - totals['actual_cost_pence'])} | {measures['peak_kwh']:.1f} | "
+                f"{measures['starts'] - totals['actual_starts']:.0f} |"
+                for (baseline_date, weighting, energy), measures in scenario_totals.items()
+            ),
+            "",
+        ]
 
     summary_lines = [
         "# Flex Savings Analysis",
         "",
         f"Period: {start_day.isoformat()} to {end_day.isoformat()} ({int(totals['days'])} complete UK days)",
         f"Baseline thermostat profile date: {baseline_day.isoformat()} (channel {baseline_channel})",
-        f"Baseline profile: {baseline_total_kwh:.2f} kWh/day, {baseline_starts:.0f} starts/day, {baseline_starts_per_kwh:.2f} starts/kWh",
+        *([f"Further baseline dates: {', '.join(day.isoformat() for day in baseline_days[1:])}"] if len(baseline_days) > 1 else []),
+        f"Baseline profile: {baseline.total_kwh:.2f} kWh/day, {baseline.starts:.0f} starts/day, {baseline_starts_per_kwh:.2f} starts/kWh",
         "",
         "## Actual measured operation",
         "",
@@ -609,44 +1511,45 @@ def main() -> int:
         "",
         "This isolates tariff shifting value. It assumes the same daily kWh was needed, but spread through the day like the baseline thermostat profile.",
         "",
-        f"- Baseline cost: {money(totals['same_kwh_cost_pence'])}",
+        f"- Baseline cost: {money(same_kwh['cost_pence'])}",
         f"- Baseline average unit rate: {price(same_kwh_avg)}",
         f"- Estimated tariff-shifting saving: {money(same_kwh_saving)}",
-        f"- Baseline 16:00-19:00 energy: {totals['same_kwh_peak_kwh']:.1f} kWh",
+        f"- Baseline 16:00-19:00 energy: {same_kwh['peak_kwh']:.1f} kWh",
         f"- Estimated starts avoided: {starts_avoided_same_kwh:.0f}",
         "",
         "## All-day thermostat counterfactual: same kWh, no tariff awareness",
         "",
         "This also keeps daily kWh equal to actual, but spreads it evenly through the day to represent thermostatic maintenance that would keep cycling through 16:00-19:00.",
         "",
-        f"- Baseline cost: {money(totals['uniform_same_kwh_cost_pence'])}",
+        f"- Baseline cost: {money(uniform_same_kwh['cost_pence'])}",
         f"- Baseline average unit rate: {price(uniform_same_kwh_avg)}",
         f"- Estimated tariff-shifting saving: {money(uniform_same_kwh_saving)}",
-        f"- Baseline 16:00-19:00 energy: {totals['uniform_same_kwh_peak_kwh']:.1f} kWh",
+        f"- Baseline 16:00-19:00 energy: {uniform_same_kwh['peak_kwh']:.1f} kWh",
         f"- Estimated starts avoided: {starts_avoided_same_kwh:.0f}",
         "",
         "## Wider counterfactual: old thermostat maintained temperature every day",
         "",
         "This estimates what would have happened if the heater kept repeating the measured baseline-day timing every day.",
         "",
-        f"- Baseline energy: {totals['thermostat_kwh']:.1f} kWh",
-        f"- Baseline cost: {money(totals['thermostat_cost_pence'])}",
+        f"- Baseline energy: {thermostat['kwh']:.1f} kWh",
+        f"- Baseline cost: {money(thermostat['cost_pence'])}",
         f"- Baseline average unit rate: {price(thermostat_avg)}",
         f"- Estimated total saving versus actual: {money(thermostat_saving)}",
-        f"- Baseline 16:00-19:00 energy: {totals['thermostat_peak_kwh']:.1f} kWh",
+        f"- Baseline 16:00-19:00 energy: {thermostat['peak_kwh']:.1f} kWh",
         f"- Estimated starts avoided: {starts_avoided_thermostat:.0f}",
         "",
         "## Wider all-day thermostat counterfactual",
         "",
         "This uses the baseline day's total kWh and starts, but spreads maintenance evenly through the day, including 16:00-19:00.",
         "",
-        f"- Baseline energy: {totals['uniform_thermostat_kwh']:.1f} kWh",
-        f"- Baseline cost: {money(totals['uniform_thermostat_cost_pence'])}",
+        f"- Baseline energy: {uniform_thermostat['kwh']:.1f} kWh",
+        f"- Baseline cost: {money(uniform_thermostat['cost_pence'])}",
         f"- Baseline average unit rate: {price(uniform_thermostat_avg)}",
         f"- Estimated total saving versus actual: {money(uniform_thermostat_saving)}",
-        f"- Baseline 16:00-19:00 energy: {totals['uniform_thermostat_peak_kwh']:.1f} kWh",
+        f"- Baseline 16:00-19:00 energy: {uniform_thermostat['peak_kwh']:.1f} kWh",
         f"- Estimated starts avoided: {starts_avoided_thermostat:.0f}",
         "",
+        *matrix_lines,
         "## Method notes",
         "",
         "- Actual cost uses measured Shelly cumulative kWh deltas priced against Octopus Agile half-hour intervals.",
@@ -656,6 +1559,7 @@ def main() -> int:
         "- The all-day models are better for the assumption that thermostat maintenance would keep cycling through 16:00-19:00.",
         "- The wider models include avoided kWh and should be read as thermostat-maintenance scenarios, not guaranteed bill counterfactuals.",
         f"- Daily CSV: `{csv_path}`",
+        f"- Scenario matrix CSV (one row per day and scenario): `{scenarios_path}`",
         "",
     ]
     summary_path = output_dir / "flex_savings_summary.md"
@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+Replay historical Agile rates through SmartScheduler for many parameter sets.
+
+Every combination of daily budget, absolute max price, below-average mode and
+blocked-hour set is scheduled against each UK day in the period, the same way
+the controller schedules one day at a time. Rates are fetched from Octopus once
+and cached locally as JSON, so later sweeps over the same period run offline.
+Combinations are spread over a process pool; each worker receives the rates
+once and keeps them grouped by local day.
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import itertools
+import json
+import logging
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+from flex_savings import (
+    PEAK_WINDOW_END_HOUR,
+    PEAK_WINDOW_START_HOUR,
+    UK_TZ,
+    fetch_rates,
+    load_environment,
+    parse_datetime,
+    uk_day_bounds,
+    utc_iso,
+)
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "ingestion"))
+
+from services.smart_scheduler import SmartScheduler  # noqa: E402
+
+
+@dataclass(frozen=True)
+class SweepParams:
+    budget_hours: float
+    max_price: float
+    use_below_average: bool
+    blocked_hours: tuple[int, ...]
+
+
+@dataclass
+class SweepResult:
+    budget_hours: float
+    max_price: float
+    use_below_average: bool
+    blocked_hours: str
+    days: int
+    days_short: int
+    slots: int
+    kwh: float
+    cost_gbp: float
+    avg_ppkwh: float
+    max_slot_ppkwh: float
+    peak_kwh: float
+    peak_cost_gbp: float
+
+
+class SweepConfig:
+    LOCAL_TIMEZONE = "Europe/London"
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Sweep SmartScheduler settings over historical Agile rates.")
+    parser.add_argument("--start", required=True, help="UK start date inclusive.")
+    parser.add_argument("--end", default=None, help="UK end date inclusive. Defaults to yesterday.")
+    parser.add_argument("--budgets", default="3,4,5,6", help="Comma-separated DAILY_HEATING_BUDGET_HOURS values.")
+    parser.add_argument("--max-prices", default="20,25,30,35", help="Comma-separated ABSOLUTE_MAX_PRICE values.")
+    parser.add_argument("--below-average", default="true,false", help="Comma-separated USE_BELOW_AVERAGE values.")
+    parser.add_argument(
+        "--blocked-hours",
+        default="[7,8,16,17,18];[16,17,18];[]",
+        help="Semicolon-separated JSON arrays of BLOCKED_HOURS.",
+    )
+    parser.add_argument("--heater-kw", type=float, default=3.0, help="Heater element power used to price each slot.")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Worker processes; 1 runs inline.")
+    parser.add_argument("--rates-cache", default="analysis/cache/agile_rates.json", help="Local JSON cache of Octopus rates.")
+    parser.add_argument("--output-dir", default="analysis/output", help="Directory for CSV/Markdown outputs.")
+    parser.add_argument("--top", type=int, default=15, help="Rows per table in the Markdown summary.")
+    return parser.parse_args()
+
+
+def parse_bool(value: str) -> bool:
+    normalized = value.strip().lower()
+    if normalized in {"1", "true", "yes", "on"}:
+        return True
+    if normalized in {"0", "false", "no", "off"}:
+        return False
+    raise SystemExit(f"Invalid boolean value: {value}")
+
+
+def parse_grid(args: argparse.Namespace) -> list[SweepParams]:
+    budgets = [float(item) for item in args.budgets.split(",") if item.strip()]
+    max_prices = [float(item) for item in args.max_prices.split(",") if item.strip()]
+    below_average = [parse_bool(item) for item in args.below_average.split(",") if item.strip()]
+    blocked_sets = []
+    for raw in args.blocked_hours.split(";"):
+        try:
+            hours = json.loads(raw)
+        except json.JSONDecodeError:
+            hours = None
+        if not isinstance(hours, list) or any(type(hour) is not int or not 0 <= hour <= 23 for hour in hours):
+            raise SystemExit(f"Invalid blocked hours: {raw}")
+        blocked_sets.append(tuple(sorted(hours)))
+
+    return [
+        SweepParams(budget, max_price, below, blocked)
+        for budget, max_price, below, blocked in itertools.product(budgets, max_prices, below_average, blocked_sets)
+    ]
+
+
+def load_rates(cache_path: Path, start_utc: datetime, end_utc: datetime) -> list[dict]:
+    """Return scheduler-format rates for the period, fetching only when the cache does not cover it."""
+    if cache_path.exists():
+        cached = json.loads(cache_path.read_text(encoding="utf-8"))
+        if parse_datetime(cached["from"]) <= start_utc and parse_datetime(cached["to"]) >= end_utc:
+            return [
+                {
+                    "valid_from": parse_datetime(item["valid_from"]),
+                    "valid_to": parse_datetime(item["valid_to"]),
+                    "value_inc_vat": item["value_inc_vat"],
+                }
+                for item in cached["rates"]
+                if start_utc <= parse_datetime(item["valid_from"]) < end_utc
+            ]
+
+    rates = fetch_rates(start_utc, end_utc)
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    cache_path.write_text(
+        json.dumps(
+            {
+                "product": os.getenv("OCTOPUS_PRODUCT_CODE", "AGILE-24-10-01"),
+                "region": os.getenv("OCTOPUS_REGION_CODE", "C"),
+                "from": utc_iso(start_utc),
+                "to": utc_iso(end_utc),
+                "rates": [
+                    {
+                        "valid_from": utc_iso(rate.valid_from),
+                        "valid_to": utc_iso(rate.valid_to),
+                        "value_inc_vat": rate.price_ppkwh,
+                    }
+                    for rate in rates
+                ],
+            }
+        ),
+        encoding="utf-8",
+    )
+    return [
+        {"valid_from": rate.valid_from, "valid_to": rate.valid_to, "value_inc_vat": rate.price_ppkwh}
+        for rate in rates
+    ]
+
+
+# Per-process state, set once by init_worker so each task only pickles its parameters.
+_scheduler: SmartScheduler | None = None
+_rates_by_day: dict[date, list[dict]] = {}
+_slot_kwh = 0.0
+
+
+def init_worker(rates: list[dict], heater_kw: float) -> None:
+    global _scheduler, _rates_by_day, _slot_kwh
+    logging.disable(logging.CRITICAL)
+    # Every rate is looked up for every combination; keep them all cached.
+    _scheduler = SmartScheduler(SweepConfig, local_time_cache_limit=len(rates) + 1)
+    _rates_by_day = _scheduler.rates_by_local_date(rates)
+    _slot_kwh = heater_kw / 2
+
+
+def simulate(params: SweepParams) -> SweepResult:
+    slots = days_short = 0
+    cost_pence = peak_kwh = peak_cost_pence = max_slot = 0.0
+    blocked_hours = list(params.blocked_hours)
+    target_slots = int(params.budget_hours * 2)
+
+    for day, day_rates in _rates_by_day.items():
+        selected = _scheduler.compute_schedule_for_date(
+            target_date=day,
+            rates=day_rates,
+            budget_hours=params.budget_hours,
+            max_price=params.max_price,
+            use_below_average=params.use_below_average,
+            blocked_hours=blocked_hours,
+        )
+        if len(selected) < target_slots:
+            days_short += 1
+        for slot in selected:
+            slot_price = slot["value_inc_vat"]
+            slots += 1
+            cost_pence += slot_price * _slot_kwh
+            max_slot = max(max_slot, slot_price)
+            if PEAK_WINDOW_START_HOUR <= _scheduler.local_time(slot).hour < PEAK_WINDOW_END_HOUR:
+                peak_kwh += _slot_kwh
+                peak_cost_pence += slot_price * _slot_kwh
+
+    kwh = slots * _slot_kwh
+    return SweepResult(
+        budget_hours=params.budget_hours,
+        max_price=params.max_price,
+        use_below_average=params.use_below_average,
+        blocked_hours=json.dumps(blocked_hours),
+        days=len(_rates_by_day),
+        days_short=days_short,
+        slots=slots,
+        kwh=kwh,
+        cost_gbp=cost_pence / 100.0,
+        avg_ppkwh=cost_pence / kwh if kwh else 0.0,
+        max_slot_ppkwh=max_slot,
+        peak_kwh=peak_kwh,
+        peak_cost_gbp=peak_cost_pence / 100.0,
+    )
+
+
+def run_sweep(grid: list[SweepParams], rates: list[dict], heater_kw: float, jobs: int) -> list[SweepResult]:
+    if jobs <= 1:
+        init_worker(rates, heater_kw)
+        return [simulate(params) for params in grid]
+
+    chunksize = max(1, len(grid) // (jobs * 4))
+    with ProcessPoolExecutor(max_workers=jobs, initializer=init_worker, initargs=(rates, heater_kw)) as pool:
+        return list(pool.map(simulate, grid, chunksize=chunksize))
+
+
+def markdown_table(results: list[SweepResult]) -> list[str]:
+    lines = [
+        "| Budget h | Max price | Below avg | Blocked hours | kWh | Cost | Avg p/kWh | Max slot | 16:00-19:00 kWh | Short days |",
+        "|---:|---:|:---:|---|---:|---:|---:|---:|---:|---:|",
+    ]
+    for result in results:
+        lines.append(
+            f"| {result.budget_hours:g} | {result.max_price:g} | {'yes' if result.use_below_average else 'no'} "
+            f"| {result.blocked_hours} | {result.kwh:.1f} | GBP {result.cost_gbp:.2f} | {result.avg_ppkwh:.2f} "
+            f"| {result.max_slot_ppkwh:.2f} | {result.peak_kwh:.1f} | {result.days_short} |"
+        )
+    return lines
+
+
+def main() -> int:
+    args = parse_args()
+    load_environment()
+
+    start_day = date.fromisoformat(args.start)
+    end_day = date.fromisoformat(args.end) if args.end else datetime.now(UK_TZ).date() - timedelta(days=1)
+    if end_day < start_day:
+        raise SystemExit("End date must be on or after start date")
+
+    grid = parse_grid(args)
+    start_utc, _ = uk_day_bounds(start_day)
+    _, end_utc = uk_day_bounds(end_day)
+    rates = load_rates(Path(args.rates_cache), start_utc, end_utc)
+    if not rates:
+        raise SystemExit("No rates available for the requested period")
+
+    results = run_sweep(grid, rates, args.heater_kw, args.jobs)
+    results.sort(key=lambda result: (result.avg_ppkwh, result.peak_kwh))
+
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    csv_path = output_dir / "schedule_sweep.csv"
+    with csv_path.open("w", newline="", encoding="utf-8") as csv_file:
+        writer = csv.DictWriter(csv_file, fieldnames=list(asdict(results[0]).keys()))
+        writer.writeheader()
+        writer.writerows(asdict(result) for result in results)
+
+    no_peak = [result for result in results if result.peak_kwh == 0]
+    summary_lines = [
+        "# Schedule Parameter Sweep",
+        "",
+        f"Period: {start_day.isoformat()} to {end_day.isoformat()} ({len(rates)} rates)",
+        f"Combinations: {len(results)}, heater {args.heater_kw:g} kW",
+        "",
+        "## Lowest average unit rate",
+        "",
+        *markdown_table(results[:args.top]),
+        "",
+        "## No 16:00-19:00 heating, fewest days short of budget",
+        "",
+        *markdown_table(sorted(no_peak, key=lambda result: (result.days_short, result.avg_ppkwh))[:args.top]),
+        "",
+        "## Highest 16:00-19:00 exposure",
+        "",
+        *markdown_table(sorted(results, key=lambda result: result.peak_kwh, reverse=True)[:args.top]),
+        "",
+    ]
+    summary_path = output_dir / "schedule_sweep_summary.md"
+    summary_path.write_text("\n".join(summary_lines), encoding="utf-8")
+
+    print(f"Wrote {csv_path}")
+    print(f"Wrote {summary_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,88 @@
+"""
+Local Telemetry Cache
+
+Append-only columnar copies of Supabase energy_readings and Octopus rates for
+the analysis scripts, one file per dataset and UTC day:
+
+    <root>/energy_readings/channel=<n>/<YYYY-MM-DD>.f64   created_at, power_w, energy_total_wh
+    <root>/rates/<tariff>/<YYYY-MM-DD>.f64                valid_from, valid_to, price_ppkwh
+
+Timestamps are stored as epoch seconds. Each file is a small header followed
+by one float64 array per column, so a day loads with a single read and no
+parsing. A partition is only written once its day is final (SETTLE after the
+day ended, so late uploads have landed) and is never rewritten; days that are
+still open are always fetched live.
+"""
+
+from __future__ import annotations
+
+import os
+import struct
+import sys
+import threading
+from array import array
+from collections.abc import Sequence
+from datetime import date, datetime, time, timedelta, timezone
+from pathlib import Path
+
+SETTLE = timedelta(hours=6)
+
+_HEADER = struct.Struct("<4sHHI")
+_MAGIC = b"FXC1"
+
+
+def utc_day_start(day: date) -> datetime:
+    return datetime.combine(day, time.min, tzinfo=timezone.utc)
+
+
+class ColumnarCache:
+    """Immutable per-day float64 column files under one root directory."""
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+
+    def path(self, dataset: str, day: date) -> Path:
+        return self.root / dataset / f"{day.isoformat()}.f64"
+
+    @staticmethod
+    def is_final(day: date, now: datetime | None = None) -> bool:
+        """Whether the UTC day ended long enough ago for its data to be complete."""
+        return utc_day_start(day) + timedelta(days=1) + SETTLE <= (now or datetime.now(timezone.utc))
+
+    def load(self, dataset: str, day: date) -> list[array] | None:
+        """The day's columns, or None when the partition has not been written."""
+        try:
+            data = self.path(dataset, day).read_bytes()
+        except FileNotFoundError:
+            return None
+        magic, _, column_count, row_count = _HEADER.unpack_from(data)
+        if magic != _MAGIC or len(data) != _HEADER.size + column_count * row_count * 8:
+            raise RuntimeError(f"Corrupt cache partition {self.path(dataset, day)}")
+        values = array("d")
+        values.frombytes(data[_HEADER.size:])
+        if sys.byteorder != "little":
+            values.byteswap()
+        return [values[index * row_count:(index + 1) * row_count] for index in range(column_count)]
+
+    def store(self, dataset: str, day: date, columns: Sequence[Sequence[float]]) -> None:
+        """Write the day's columns once; an existing partition is left untouched."""
+        path = self.path(dataset, day)
+        if path.exists():
+            return
+        row_count = len(columns[0]) if columns else 0
+        if any(len(column) != row_count for column in columns):
+            raise ValueError("cache columns must have equal lengths")
+
+        values = array("d")
+        for column in columns:
+            values.extend(column)
+        if sys.byteorder != "little":
+            values.byteswap()
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Written beside the target and renamed, so readers never see a partial file.
+        partial = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with partial.open("wb") as cache_file:
+            cache_file.write(_HEADER.pack(_MAGIC, 0, len(columns), row_count))
+            values.tofile(cache_file)
+        os.replace(partial, path)
@@ -0,0 +1,668 @@
+import contextlib
+import csv
+import io
+import os
+import pickle
+import random
+import shutil
+import sys
+import tempfile
+import unittest
+import urllib.parse
+from array import array
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+import flex_savings  # noqa: E402
+from flex_savings import (  # noqa: E402
+    MAX_PLAUSIBLE_CHANNEL_POWER_W,
+    PEAK_WINDOW_END_HOUR,
+    PEAK_WINDOW_START_HOUR,
+    POWER_ON_THRESHOLD_W,
+    SUMMARY_SCENARIOS,
+    BaselineProfile,
+    DayResultStore,
+    Rate,
+    Reading,
+    RateIndex,
+    ReadingSeries,
+    Scenario,
+    allocate_segment_to_slots,
+    day_result_key,
+    day_segments,
+    day_windows,
+    local_slot_bounds,
+    overlap_seconds,
+    parse_datetime,
+    scenario_costs,
+    scenario_matrix,
+    supabase_keyset_pages,
+    uk_day_bounds,
+    utc_iso,
+)
+from stand_ins import READING_INTERVAL, StandIns, meter_reading, octopus_rates  # noqa: E402
+
+# Spring-forward day: 23 hours, and local 01:00-02:00 does not exist.
+DST_DAY = date(2026, 3, 29)
+
+
+def scan_allocate(slots_kwh, day, segment_start, segment_end, segment_kwh):
+    """Every segment against all 48 slots, as before slot bounds were precomputed."""
+    duration = (segment_end - segment_start).total_seconds()
+    for slot_index in range(48):
+        seconds = overlap_seconds(segment_start, segment_end, *local_slot_bounds(day, slot_index))
+        if seconds > 0:
+            slots_kwh[slot_index] += segment_kwh * (seconds / duration)
+
+
+def reference_readings(channel, day):
+    """The stand-in readings for the UK day, with the last one before it."""
+    start_utc, end_utc = uk_day_bounds(day)
+    readings = []
+    created_at = start_utc - READING_INTERVAL
+    while created_at <= end_utc:
+        row = meter_reading(channel, created_at)
+        readings.append((parse_datetime(row["created_at"]), row["power_w"], row["energy_total_wh"]))
+        created_at += READING_INTERVAL
+    return readings
+
+
+def reference_segments(day, readings):
+    start_utc, end_utc = uk_day_bounds(day)
+    for (previous_at, _, previous_wh), (current_at, _, current_wh) in zip(readings, readings[1:]):
+        if current_at <= start_utc or previous_at >= end_utc:
+            continue
+        duration = (current_at - previous_at).total_seconds()
+        delta_wh = current_wh - previous_wh
+        if delta_wh <= 0 or delta_wh / (duration / 3600.0) > MAX_PLAUSIBLE_CHANNEL_POWER_W:
+            continue
+        segment_start, segment_end = max(previous_at, start_utc), min(current_at, end_utc)
+        yield segment_start, segment_end, delta_wh / 1000.0 * (segment_end - segment_start).total_seconds() / duration
+
+
+def reference_starts(day, readings):
+    start_utc, end_utc = uk_day_bounds(day)
+    starts = 0
+    previous_on = readings[0][1] > POWER_ON_THRESHOLD_W
+    for created_at, power_w, _ in readings[1:]:
+        if start_utc <= created_at <= end_utc:
+            current_on = power_w > POWER_ON_THRESHOLD_W
+            starts += current_on and not previous_on
+            previous_on = current_on
+    return starts
+
+
+def reference_cost(rates, start, end, kwh):
+    duration = (end - start).total_seconds()
+    return sum(kwh * overlap_seconds(start, end, valid_from, valid_to) / duration * price for valid_from, valid_to, price in rates)
+
+
+def reference_slot_cost(day, rates, weights, kwh):
+    """(priced kWh, cost, peak kWh, peak cost) of spreading kWh over the day's slots by weight."""
+    priced_kwh = cost = peak_kwh = peak_cost = 0.0
+    for slot_index, weight in enumerate(weights):
+        slot_start, slot_end = local_slot_bounds(day, slot_index)
+        overlaps = [(overlap_seconds(slot_start, slot_end, valid_from, valid_to), price) for valid_from, valid_to, price in rates]
+        seconds = sum(seconds for seconds, _ in overlaps if seconds > 0)
+        if kwh * weight <= 0 or not seconds:
+            continue
+        slot_cost = kwh * weight * sum(seconds * price for seconds, price in overlaps if seconds > 0) / seconds
+        priced_kwh += kwh * weight
+        cost += slot_cost
+        if PEAK_WINDOW_START_HOUR <= slot_index // 2 < PEAK_WINDOW_END_HOUR:
+            peak_kwh += kwh * weight
+            peak_cost += slot_cost
+    return priced_kwh, cost, peak_kwh, peak_cost
+
+
+def reference_rates(day):
+    """The stand-in rates covering the UK day as (valid_from, valid_to, price), oldest first."""
+    start_utc, end_utc = uk_day_bounds(day)
+    return sorted(
+        (parse_datetime(rate["valid_from"]), parse_datetime(rate["valid_to"]), rate["value_inc_vat"])
+        for rate in octopus_rates(start_utc, end_utc)
+    )
+
+
+def reference_day(day, channels, baseline_day, baseline_channel):
+    """
+    A day's wide CSV row, computed the way flex_savings did before it was
+    optimised: plain lists, every slot and every rate checked per segment.
+    """
+    rates = reference_rates(day)
+    peak_start = datetime.combine(day, datetime.min.time().replace(hour=PEAK_WINDOW_START_HOUR), tzinfo=flex_savings.UK_TZ)
+    peak_end = datetime.combine(day, datetime.min.time().replace(hour=PEAK_WINDOW_END_HOUR), tzinfo=flex_savings.UK_TZ)
+
+    actual_kwh = actual_cost = actual_peak_kwh = 0.0
+    actual_starts = 0
+    for channel in channels:
+        readings = reference_readings(channel, day)
+        actual_starts += reference_starts(day, readings)
+        for segment_start, segment_end, kwh in reference_segments(day, readings):
+            actual_kwh += kwh
+            actual_cost += reference_cost(rates, segment_start, segment_end, kwh)
+            peak_seconds = overlap_seconds(segment_start, segment_end, peak_start, peak_end)
+            actual_peak_kwh += kwh * peak_seconds / (segment_end - segment_start).total_seconds()
+
+    baseline_readings = reference_readings(baseline_channel, baseline_day)
+    slots_kwh = [0.0] * 48
+    for segment in reference_segments(baseline_day, baseline_readings):
+        scan_allocate(slots_kwh, baseline_day, *segment)
+    baseline_kwh = sum(slots_kwh)
+    baseline_starts = reference_starts(baseline_day, baseline_readings)
+    profile = [slot_kwh / baseline_kwh for slot_kwh in slots_kwh]
+    uniform = [1.0 / 48] * 48
+
+    row = {
+        "actual_kwh": actual_kwh,
+        "actual_cost_gbp": actual_cost / 100.0,
+        "actual_peak_kwh": actual_peak_kwh,
+        "actual_starts": actual_starts,
+        "same_kwh_expected_starts": actual_kwh * baseline_starts / baseline_kwh,
+        "thermostat_baseline_kwh": baseline_kwh,
+        "thermostat_expected_starts": baseline_starts,
+    }
+    for prefix, weights, kwh in (
+        ("same_kwh", profile, actual_kwh),
+        ("uniform_same_kwh", uniform, actual_kwh),
+        ("thermostat", profile, baseline_kwh),
+        ("uniform_thermostat", uniform, baseline_kwh),
+    ):
+        _, cost, peak_kwh, _ = reference_slot_cost(day, rates, weights, kwh)
+        row[f"{prefix}_baseline_cost_gbp"] = cost / 100.0
+        row[f"{prefix}_peak_kwh"] = peak_kwh
+    return row
+
+
+def serve_stand_ins(test):
+    """Start the stand-ins for a test or test class, closing this thread's connection to them afterwards."""
+    stand_ins = StandIns().start()
+    netloc = urllib.parse.urlsplit(stand_ins.base_url).netloc
+    cleanup = test.addClassCleanup if isinstance(test, type) else test.addCleanup
+    cleanup(stand_ins.stop)
+    cleanup(flex_savings._drop_connection, "http", netloc)
+    return stand_ins
+
+
+def make_scenarios(total_kwh=10.0):
+    baseline = BaselineProfile(date(2026, 1, 19), (1.0 / 48,) * 48, total_kwh, 6)
+    return [Scenario(baseline, "kwh", "actual")]
+
+
+class ReadingSeriesTests(unittest.TestCase):
+    def rows(self, count):
+        base = datetime(2026, 3, 29, 0, 59, 30, 123456, tzinfo=timezone.utc)
+        return [
+            {
+                "channel": 1,
+                "created_at": (base + timedelta(seconds=30 * index)).isoformat().replace("+00:00", "Z"),
+                "power_w": 3000.0 if index % 3 else None,
+                "energy_total_wh": 1000.0 + 25.5 * index,
+            }
+            for index in range(count)
+        ]
+
+    def test_rows_index_as_readings_with_exact_timestamps(self):
+        rows = self.rows(5)
+        series = ReadingSeries.from_rows(1, rows)
+
+        self.assertEqual(len(series), 5)
+        self.assertEqual(series[1], Reading(1, parse_datetime(rows[1]["created_at"]), 3000.0, 1025.5))
+        self.assertEqual(series[-2], Reading(1, parse_datetime(rows[3]["created_at"]), 0.0, 1076.5))
+
+    def test_slices_are_views_of_the_same_buffers(self):
+        series = ReadingSeries.from_rows(1, self.rows(100))
+
+        window = series[10:40][5:10]
+
+        self.assertIsInstance(window.created_us, memoryview)
+        self.assertEqual(len(window), 5)
+        self.assertEqual([window[index] for index in range(5)], [series[index] for index in range(15, 20)])
+        series.energy_total_wh[15] = -1.0
+        self.assertEqual(window[0].energy_total_wh, -1.0)
+
+    def test_pickled_slice_is_a_compact_copy(self):
+        series = ReadingSeries.from_rows(1, self.rows(10000))
+        window = series[5000:5010]
+
+        copy = pickle.loads(pickle.dumps(window))
+
+        self.assertIsInstance(copy.created_us, array)
+        self.assertEqual(copy.channel, 1)
+        self.assertEqual([copy[index] for index in range(len(copy))], [window[index] for index in range(len(window))])
+        self.assertLess(len(pickle.dumps(window)), 1000)
+
+    def test_concat_joins_views_in_order(self):
+        series = ReadingSeries.from_rows(1, self.rows(30))
+
+        joined = ReadingSeries.concat(1, (series[:10], ReadingSeries(1), series[10:30]))
+
+        self.assertIsInstance(joined.created_us, array)
+        self.assertEqual([joined[index] for index in range(30)], [series[index] for index in range(30)])
+
+    def test_cache_columns_round_trip_to_the_microsecond(self):
+        series = ReadingSeries.from_rows(1, self.rows(50))
+
+        restored = ReadingSeries.from_seconds(1, *series.seconds_columns())
+
+        self.assertEqual(restored.created_us, series.created_us)
+        self.assertEqual([restored[index] for index in range(50)], [series[index] for index in range(50)])
+
+
+class DaySlotsTests(unittest.TestCase):
+    def test_allocation_matches_scanning_every_slot(self):
+        generator = random.Random(41)
+        for day in (date(2026, 1, 19), DST_DAY, date(2026, 10, 25)):
+            start_utc, end_utc = uk_day_bounds(day)
+            day_seconds = (end_utc - start_utc).total_seconds()
+            for _ in range(200):
+                offset = generator.uniform(-600.0, day_seconds)
+                start = start_utc + timedelta(seconds=offset)
+                end = start + timedelta(seconds=generator.choice((60.0, 900.0, 2700.0, 7300.0)))
+                expected, allocated = [0.0] * 48, [0.0] * 48
+
+                scan_allocate(expected, day, start, end, 1.5)
+                allocate_segment_to_slots(allocated, day, start.timestamp(), end.timestamp(), 1.5)
+
+                with self.subTest(day=day.isoformat(), start=start.isoformat()):
+                    for expected_kwh, allocated_kwh in zip(expected, allocated):
+                        self.assertAlmostEqual(allocated_kwh, expected_kwh, delta=1e-6)
+
+
+class RateIndexTests(unittest.TestCase):
+    START = datetime(2026, 3, 2, tzinfo=timezone.utc)
+
+    def rate(self, start_minutes, end_minutes, price):
+        return Rate(self.START + timedelta(minutes=start_minutes), self.START + timedelta(minutes=end_minutes), price)
+
+    def make_rates(self):
+        # Out of order, with a gap from 90 to 120 minutes and one two-hour rate.
+        return [
+            self.rate(30, 60, 20.0),
+            self.rate(0, 30, 10.0),
+            self.rate(120, 240, 5.0),
+            self.rate(60, 90, 30.0),
+            self.rate(240, 270, 40.0),
+        ]
+
+    def make_index(self):
+        return RateIndex(self.make_rates())
+
+    def seconds(self, minutes):
+        return (self.START + timedelta(minutes=minutes)).timestamp()
+
+    def test_overlapping_matches_checking_every_rate(self):
+        index = self.make_index()
+        rates = [(rate.valid_from.timestamp(), rate.valid_to.timestamp(), rate.price_ppkwh) for rate in self.make_rates()]
+        for start_minutes, end_minutes in ((0, 30), (15, 75), (85, 125), (90, 120), (130, 140), (200, 250), (-30, 0), (270, 300), (-10, 400)):
+            start, end = self.seconds(start_minutes), self.seconds(end_minutes)
+            expected = [
+                (min(end, rate_end) - max(start, rate_start), price)
+                for rate_start, rate_end, price in sorted(rates)
+                if min(end, rate_end) > max(start, rate_start)
+            ]
+            with self.subTest(window=(start_minutes, end_minutes)):
+                self.assertEqual(list(index.overlapping(start, end)), expected)
+
+    def test_window_inside_the_long_rate_finds_it(self):
+        index = self.make_index()
+
+        self.assertEqual(list(index.overlapping(self.seconds(200), self.seconds(210))), [(600.0, 5.0)])
+
+    def test_covers_only_windows_touching_a_rate(self):
+        index = self.make_index()
+
+        self.assertTrue(index.covers(self.seconds(10), self.seconds(20)))
+        self.assertTrue(index.covers(self.seconds(80), self.seconds(100)))
+        self.assertFalse(index.covers(self.seconds(90), self.seconds(120)))
+        self.assertFalse(index.covers(self.seconds(270), self.seconds(300)))
+        self.assertFalse(index.covers(self.seconds(-30), self.seconds(0)))
+        self.assertFalse(RateIndex([]).covers(self.seconds(0), self.seconds(30)))
+
+
+def make_series(channel, created_at, power_w=None, energy_total_wh=None):
+    """A series from datetimes; energy rises by 10 Wh per reading unless given."""
+    power_w = [3000.0] * len(created_at) if power_w is None else power_w
+    energy_total_wh = [10.0 * index for index in range(len(created_at))] if energy_total_wh is None else energy_total_wh
+    return ReadingSeries.from_seconds(
+        channel,
+        [value.timestamp() for value in created_at],
+        array("d", power_w),
+        array("d", energy_total_wh),
+    )
+
+
+def chunked(series, sizes):
+    position = 0
+    for size in sizes:
+        yield series[position:position + size]
+        position += size
+    yield series[position:]
+
+
+class DayWindowsTests(unittest.TestCase):
+    DAYS = [date(2026, 3, 28), DST_DAY, date(2026, 3, 30), date(2026, 3, 31)]
+
+    def readings(self):
+        # Every 20 minutes, including each midnight, and none at all on 2026-03-30.
+        # Chunks of (3, 72, 69) readings end exactly at the 2026-03-28 and 2026-03-29 midnights.
+        start_utc, end_utc = uk_day_bounds(self.DAYS[0])[0] - timedelta(hours=1), uk_day_bounds(self.DAYS[-1])[1]
+        gap_start, gap_end = uk_day_bounds(date(2026, 3, 30))
+        created_at = []
+        while start_utc <= end_utc + timedelta(hours=1):
+            if not (gap_start <= start_utc < gap_end):
+                created_at.append(start_utc)
+            start_utc += timedelta(minutes=20)
+        return make_series(1, created_at)
+
+    def expected_window(self, series, day):
+        """From the last reading before the day to the first at or after its end."""
+        start_utc, end_utc = uk_day_bounds(day)
+        created_at = [series[index].created_at for index in range(len(series))]
+        first = max([index for index, value in enumerate(created_at) if value < start_utc], default=0)
+        closing = min([index for index, value in enumerate(created_at) if value >= end_utc], default=len(series) - 1)
+        return [series[index] for index in range(first, closing + 1)]
+
+    def test_windows_carry_the_boundary_readings_whatever_the_chunking(self):
+        series = self.readings()
+        for sizes in ((len(series),), (1,) * len(series), (7, 0, 72, 3, 69, 71), (3, 72, 69)):
+            windows = list(day_windows(1, chunked(series, sizes), self.DAYS))
+
+            self.assertEqual([day for day, _ in windows], self.DAYS)
+            for day, window in windows:
+                with self.subTest(sizes=sizes[:6], day=day.isoformat()):
+                    self.assertEqual([window[index] for index in range(len(window))], self.expected_window(series, day))
+
+    def test_midnight_reading_closes_one_window_and_follows_the_opening_of_the_next(self):
+        series = self.readings()
+        windows = dict(day_windows(1, chunked(series, (50,)), self.DAYS))
+        midnight = uk_day_bounds(DST_DAY)[0]
+
+        self.assertEqual(windows[self.DAYS[0]][len(windows[self.DAYS[0]]) - 1].created_at, midnight)
+        self.assertEqual(windows[DST_DAY][0].created_at, midnight - timedelta(minutes=20))
+        self.assertEqual(windows[DST_DAY][1].created_at, midnight)
+
+    def test_day_without_readings_spans_the_gap(self):
+        windows = dict(day_windows(1, chunked(self.readings(), (40, 40)), self.DAYS))
+        gap = windows[date(2026, 3, 30)]
+        gap_start, gap_end = uk_day_bounds(date(2026, 3, 30))
+
+        self.assertEqual(len(gap), 2)
+        self.assertLess(gap[0].created_at, gap_start)
+        self.assertGreaterEqual(gap[1].created_at, gap_end)
+
+    def test_segments_from_windows_match_the_whole_series(self):
+        series = self.readings()
+        for day, window in day_windows(1, chunked(series, (13, 100, 5)), self.DAYS):
+            with self.subTest(day=day.isoformat()):
+                self.assertEqual(day_segments(day, {1: window}), day_segments(day, {1: series}))
+
+
+class KeysetTable:
+    """Answers supabase_get like PostgREST over rows ordered by (created_at, id)."""
+
+    def __init__(self, rows):
+        self.rows = sorted(rows, key=lambda row: (parse_datetime(row["created_at"]), row["id"]))
+        self.requests = []
+
+    def __call__(self, table, params, headers=None, payload=None):
+        params = dict(params)
+        self.requests.append(params)
+        rows = self.rows
+        if "or" in params:
+            after, after_id = params["or"].split(",and(created_at.eq.")[1].rstrip("))").split(",id.gt.")
+            after_at = parse_datetime(after)
+            rows = [row for row in rows if (parse_datetime(row["created_at"]), row["id"]) > (after_at, int(after_id))]
+        return rows[:int(params["limit"])]
+
+
+class KeysetPagesTests(unittest.TestCase):
+    def test_pages_split_inside_created_at_ties_return_each_row_once(self):
+        base = datetime(2026, 3, 2, tzinfo=timezone.utc)
+        # Five rows share each timestamp, with ids out of insertion order, and
+        # PostgREST's +00:00 offsets rather than the Z the keyset filter sends.
+        rows = [
+            {"id": row_id, "created_at": (base + timedelta(minutes=minute)).isoformat()}
+            for minute in range(4)
+            for row_id in (minute * 10 + 7, minute * 10 + 2, minute * 10 + 9, minute * 10 + 4, minute * 10 + 5)
+        ]
+        table = KeysetTable(rows)
+
+        with patch.object(flex_savings, "supabase_get", table):
+            seen = list(supabase_keyset_pages("energy_readings", [("select", "id,created_at")], page_size=3))
+
+        self.assertEqual(seen, table.rows)
+        self.assertEqual(len(table.requests), len(rows) // 3 + 1)
+        self.assertEqual(table.requests[1]["or"], f"(created_at.gt.{utc_iso(base)},and(created_at.eq.{utc_iso(base)},id.gt.5))")
+        self.assertTrue(all(request["order"] == "created_at.asc,id.asc" for request in table.requests))
+
+    def test_channels_sharing_every_timestamp_page_through_the_stand_ins(self):
+        start_utc, end_utc = uk_day_bounds(date(2026, 3, 2))
+        end_utc = start_utc + timedelta(minutes=30)
+        expected = []
+        created_at = start_utc
+        while created_at < end_utc:
+            expected.extend(meter_reading(channel, created_at) for channel in (0, 1))
+            created_at += READING_INTERVAL
+
+        stand_ins = serve_stand_ins(self)
+        with patch.dict(os.environ, {"SUPABASE_URL": stand_ins.base_url, "SUPABASE_KEY": "stand-in"}):
+            rows = list(supabase_keyset_pages(
+                "energy_readings",
+                [
+                    ("select", "id,channel,power_w,energy_total_wh,created_at"),
+                    ("created_at", f"gte.{utc_iso(start_utc)}"),
+                    ("created_at", f"lt.{utc_iso(end_utc)}"),
+                ],
+                page_size=7,
+            ))
+
+        self.assertEqual([(row["created_at"], row["id"]) for row in rows], [(row["created_at"], row["id"]) for row in expected])
+
+
+class ScenarioMatrixTests(unittest.TestCase):
+    def profile(self, day, total_kwh, starts):
+        # More energy in later slots, so profile and uniform weightings price differently.
+        weights = tuple((slot_index + 1) / (48 * 49 / 2) for slot_index in range(48))
+        return BaselineProfile(day, weights, total_kwh, starts)
+
+    def test_summary_scenarios_come_first_and_duplicates_are_dropped(self):
+        first = self.profile(date(2026, 1, 19), 12.0, 6)
+        second = self.profile(DST_DAY, 8.0, 4)
+
+        scenarios = scenario_matrix([first, second], ["uniform", "profile"], ["thermostat"])
+
+        self.assertEqual(
+            [(scenario.baseline.day, scenario.weighting, scenario.energy) for scenario in scenarios],
+            [(first.day, weighting, energy) for weighting, energy in SUMMARY_SCENARIOS]
+            + [(second.day, "uniform", "thermostat"), (second.day, "profile", "thermostat")],
+        )
+
+    def test_costs_match_pricing_each_scenario_slot_by_slot(self):
+        baselines = [self.profile(date(2026, 1, 19), 12.0, 6), self.profile(DST_DAY, 8.0, 4)]
+        scenarios = scenario_matrix(baselines, ["profile", "uniform"], ["same_kwh", "thermostat"])
+        for day in (date(2026, 3, 2), DST_DAY):
+            rates = reference_rates(day)
+            index = RateIndex([Rate(*rate) for rate in rates])
+
+            costs = scenario_costs(day, index, scenarios, 9.0)
+
+            self.assertEqual(len(costs), len(scenarios))
+            for scenario, cost in zip(scenarios, costs):
+                baseline = scenario.baseline
+                weights = baseline.weights if scenario.weighting == "profile" else (1.0 / 48,) * 48
+                kwh, starts = (9.0, 9.0 * baseline.starts / baseline.total_kwh) if scenario.energy == "same_kwh" else (baseline.total_kwh, baseline.starts)
+                priced_kwh, cost_pence, peak_kwh, peak_cost = reference_slot_cost(day, rates, weights, kwh)
+                with self.subTest(day=day.isoformat(), scenario=(baseline.day.isoformat(), scenario.weighting, scenario.energy)):
+                    self.assertAlmostEqual(cost["kwh"], kwh, places=9)
+                    self.assertAlmostEqual(cost["starts"], starts, places=9)
+                    self.assertAlmostEqual(cost["priced_kwh"], priced_kwh, places=9)
+                    self.assertAlmostEqual(cost["cost_pence"], cost_pence, places=9)
+                    self.assertAlmostEqual(cost["peak_kwh"], peak_kwh, places=9)
+                    self.assertAlmostEqual(cost["peak_cost_pence"], peak_cost, places=9)
+
+    def test_unpriced_slots_are_left_out_of_priced_kwh_and_cost(self):
+        day = date(2026, 3, 2)
+        # Rates only for the first twelve hours of the day.
+        rates = reference_rates(day)[:24]
+        scenarios = scenario_matrix([self.profile(day, 12.0, 6)], ["uniform"], ["same_kwh"])
+
+        costs = scenario_costs(day, RateIndex([Rate(*rate) for rate in rates]), scenarios, 4.8)
+        uniform = costs[SUMMARY_SCENARIOS.index(("uniform", "same_kwh"))]
+
+        self.assertAlmostEqual(uniform["kwh"], 4.8, places=9)
+        self.assertAlmostEqual(uniform["priced_kwh"], 2.4, places=9)
+        self.assertAlmostEqual(uniform["cost_pence"], reference_slot_cost(day, rates, (1.0 / 48,) * 48, 4.8)[1], places=9)
+        self.assertEqual(uniform["peak_kwh"], 0.0)
+
+
+class StandInBaselineEquivalenceTests(unittest.TestCase):
+    """flex_savings against the stand-ins matches the unoptimised computation, across DST."""
+
+    BASELINE_DAY = DST_DAY
+    DAYS = (date(2026, 3, 28), DST_DAY, date(2026, 3, 30))
+
+    @classmethod
+    def setUpClass(cls):
+        cls.stand_ins = serve_stand_ins(cls)
+        cls.expected = {
+            day.isoformat(): reference_day(day, (0, 1), cls.BASELINE_DAY, 1)
+            for day in cls.DAYS
+        }
+
+    def run_outputs(self, *args):
+        """The CSV and Markdown files a run writes, with its output directory masked."""
+        output_dir = tempfile.mkdtemp()
+        argv = [
+            "flex_savings.py",
+            "--baseline-date", self.BASELINE_DAY.isoformat(),
+            "--start", self.DAYS[0].isoformat(),
+            "--end", self.DAYS[-1].isoformat(),
+            "--output-dir", output_dir,
+            *args,
+        ]
+        environment = {"SUPABASE_URL": self.stand_ins.base_url, "SUPABASE_KEY": "stand-in"}
+        with (
+            patch.object(sys, "argv", argv),
+            patch.dict(os.environ, environment),
+            patch.object(flex_savings, "OCTOPUS_API_URL", f"{self.stand_ins.base_url}/v1/products"),
+            contextlib.redirect_stdout(io.StringIO()),
+        ):
+            flex_savings.main()
+        return {
+            name: Path(output_dir, name).read_text(encoding="utf-8").replace(output_dir, "<output>")
+            for name in ("flex_savings_daily.csv", "flex_savings_scenarios.csv", "flex_savings_summary.md")
+        }
+
+    def run_flex_savings(self, *args):
+        return list(csv.DictReader(io.StringIO(self.run_outputs(*args)["flex_savings_daily.csv"])))
+
+    def assert_matches_reference(self, rows, expected_rows=None):
+        expected_rows = expected_rows or self.expected
+        self.assertEqual([row["date"] for row in rows], list(expected_rows))
+        for row in rows:
+            for column, expected in expected_rows[row["date"]].items():
+                with self.subTest(day=row["date"], column=column):
+                    self.assertAlmostEqual(float(row[column]), expected, delta=1e-9 * max(1.0, abs(expected)))
+
+    def test_uncached_run_matches_reference(self):
+        self.assert_matches_reference(self.run_flex_savings("--cache-dir", ""))
+
+    def test_server_aggregation_counts_a_midnight_start_once(self):
+        # Channel 0 turns on at 00:00 UTC, which is UK midnight between
+        # 2026-03-28 and the spring-forward day. Client-side differencing
+        # counts that start on both days; the RPC only on the day it begins.
+        expected = {day: dict(row) for day, row in self.expected.items()}
+        expected["2026-03-28"]["actual_starts"] -= 1
+
+        self.assert_matches_reference(self.run_flex_savings("--cache-dir", "", "--aggregate", "server"), expected)
+
+    def test_process_pool_runs_write_the_same_files_as_a_serial_run(self):
+        for aggregate in ("client", "server"):
+            serial = self.run_outputs("--cache-dir", "", "--aggregate", aggregate, "--jobs", "1")
+            for jobs in ("2", "3"):
+                with self.subTest(aggregate=aggregate, jobs=jobs):
+                    self.assertEqual(self.run_outputs("--cache-dir", "", "--aggregate", aggregate, "--jobs", jobs), serial)
+
+    def test_process_pool_run_with_cache_matches_reference(self):
+        self.assert_matches_reference(self.run_flex_savings("--cache-dir", tempfile.mkdtemp(), "--jobs", "2"))
+
+    def test_cold_and_warm_cache_runs_match_reference(self):
+        cache_dir = tempfile.mkdtemp()
+        self.assert_matches_reference(self.run_flex_savings("--cache-dir", cache_dir))
+
+        # Without the memoised day results, readings and rates come from the cache.
+        shutil.rmtree(os.path.join(cache_dir, "flex_days"))
+        self.stand_ins.stats.clear()
+        self.assert_matches_reference(self.run_flex_savings("--cache-dir", cache_dir))
+        self.assertEqual(self.stand_ins.stats["supabase.energy_readings"], 0)
+        self.assertEqual(self.stand_ins.stats["octopus.rates"], 0)
+
+        # With them, the period's days are not computed again.
+        with patch.object(flex_savings, "day_result", side_effect=AssertionError("day recomputed")):
+            self.assert_matches_reference(self.run_flex_savings("--cache-dir", cache_dir))
+
+
+class DayResultStoreTests(unittest.TestCase):
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp())
+        self.addCleanup(flex_savings.code_version.cache_clear)
+
+    def test_stored_day_is_loaded_and_other_days_miss(self):
+        store = DayResultStore(self.root, day_result_key([0, 1], "client", make_scenarios()))
+        record = {"daily": {"date": "2026-03-02", "actual_kwh": 12.5}, "scenarios": []}
+
+        store.store(date(2026, 3, 2), record)
+
+        self.assertEqual(store.load(date(2026, 3, 2)), record)
+        self.assertIsNone(store.load(date(2026, 3, 3)))
+
+    def test_key_ignores_channel_order_but_not_inputs(self):
+        key = day_result_key([0, 1], "client", make_scenarios())
+
+        self.assertEqual(day_result_key([1, 0], "client", make_scenarios()), key)
+        self.assertNotEqual(day_result_key([1], "client", make_scenarios()), key)
+        self.assertNotEqual(day_result_key([0, 1], "server", make_scenarios()), key)
+        self.assertNotEqual(day_result_key([0, 1], "client", make_scenarios(total_kwh=11.0)), key)
+
+    def test_schema_version_bump_invalidates_the_store(self):
+        day = date(2026, 3, 2)
+        DayResultStore(self.root, day_result_key([0, 1], "client", make_scenarios())).store(day, {"daily": {}})
+
+        with patch.object(flex_savings, "RESULT_SCHEMA_VERSION", flex_savings.RESULT_SCHEMA_VERSION + 1):
+            key = day_result_key([0, 1], "client", make_scenarios())
+
+        self.assertIsNone(DayResultStore(self.root, key).load(day))
+
+    def test_changed_cache_module_or_migration_invalidates_the_store(self):
+        sources = [self.root / name for name in ("flex_savings.py", "telemetry_cache.py", "half_hour_energy_rpc.sql")]
+        for path in sources:
+            path.write_text("original\n", encoding="utf-8")
+        day = date(2026, 3, 2)
+
+        with patch.object(flex_savings, "result_sources", return_value=sources):
+            flex_savings.code_version.cache_clear()
+            original_key = day_result_key([0, 1], "client", make_scenarios())
+            DayResultStore(self.root, original_key).store(day, {"daily": {}})
+            for path in sources[1:]:
+                with self.subTest(changed=path.name):
+                    path.write_text("changed\n", encoding="utf-8")
+                    flex_savings.code_version.cache_clear()
+                    key = day_result_key([0, 1], "client", make_scenarios())
+                    path.write_text("original\n", encoding="utf-8")
+
+                    self.assertNotEqual(key, original_key)
+                    self.assertIsNone(DayResultStore(self.root, key).load(day))
+
+    def test_sources_include_cache_module_and_rpc_migration(self):
+        names = [path.name for path in flex_savings.result_sources()]
+
+        self.assertEqual(names[:2], ["flex_savings.py", "telemetry_cache.py"])
+        self.assertTrue(any(name.endswith("_half_hour_energy_rpc.sql") for name in names[2:]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,171 @@
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import unittest
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+import flex_savings  # noqa: E402
+from flex_savings import parse_datetime, uk_day_bounds  # noqa: E402
+from schedule_sweep import SweepParams, init_worker, load_rates, parse_grid, run_sweep, simulate  # noqa: E402
+from stand_ins import octopus_rates  # noqa: E402
+from test_flex_savings import serve_stand_ins  # noqa: E402
+
+# A winter day, so local slots are UTC slots.
+WINTER_DAY = date(2026, 1, 14)
+
+
+def grid_args(**overrides):
+    values = {
+        "budgets": "3,4",
+        "max_prices": "25,30",
+        "below_average": "true,false",
+        "blocked_hours": "[16,17,18];[]",
+    }
+    values.update(overrides)
+    return argparse.Namespace(**values)
+
+
+def day_rates(day, prices):
+    """Scheduler-format rates for a GMT day, one price per half hour."""
+    start = datetime.combine(day, datetime.min.time(), timezone.utc)
+    return [
+        {
+            "valid_from": start + timedelta(minutes=30 * index),
+            "valid_to": start + timedelta(minutes=30 * (index + 1)),
+            "value_inc_vat": price,
+        }
+        for index, price in enumerate(prices)
+    ]
+
+
+def stand_in_rates(first_day, days):
+    """Scheduler-format stand-in rates for whole UK days, oldest first."""
+    start_utc, _ = uk_day_bounds(first_day)
+    _, end_utc = uk_day_bounds(first_day + timedelta(days=days - 1))
+    return [
+        {
+            "valid_from": parse_datetime(item["valid_from"]),
+            "valid_to": parse_datetime(item["valid_to"]),
+            "value_inc_vat": item["value_inc_vat"],
+        }
+        for item in reversed(octopus_rates(start_utc, end_utc))
+    ]
+
+
+class ParseGridTests(unittest.TestCase):
+    def test_grid_is_the_product_of_every_setting(self):
+        grid = parse_grid(grid_args(blocked_hours="[18,16,17];[]"))
+
+        self.assertEqual(len(grid), 2 * 2 * 2 * 2)
+        self.assertEqual(grid[0], SweepParams(3.0, 25.0, True, (16, 17, 18)))
+        self.assertEqual(grid[-1], SweepParams(4.0, 30.0, False, ()))
+
+    def test_bad_specs_are_rejected(self):
+        for overrides in (
+            {"blocked_hours": "[7,24]"},
+            {"blocked_hours": "[7.5]"},
+            {"blocked_hours": "7,8"},
+            {"blocked_hours": "[7];{"},
+            {"below_average": "true,maybe"},
+        ):
+            with self.subTest(**overrides), self.assertRaises(SystemExit):
+                parse_grid(grid_args(**overrides))
+
+
+class LoadRatesTests(unittest.TestCase):
+    def setUp(self):
+        self.stand_ins = serve_stand_ins(self)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.cache_path = Path(directory.name) / "cache" / "agile_rates.json"
+
+    def load(self, first_day, last_day):
+        start_utc, _ = uk_day_bounds(first_day)
+        _, end_utc = uk_day_bounds(last_day)
+        with patch.object(flex_savings, "OCTOPUS_API_URL", f"{self.stand_ins.base_url}/v1/products"):
+            return load_rates(self.cache_path, start_utc, end_utc)
+
+    def test_cache_round_trip(self):
+        fetched = self.load(date(2026, 3, 28), date(2026, 3, 30))
+        requests = self.stand_ins.stats["octopus.rates"]
+
+        self.assertTrue(self.cache_path.exists())
+        self.assertEqual(len(fetched), 23 * 2 + 2 * 48)
+        self.assertEqual(fetched, stand_in_rates(date(2026, 3, 28), 3))
+
+        # A period inside the cached one is answered from the file alone.
+        self.assertEqual(self.load(date(2026, 3, 29), date(2026, 3, 29)), fetched[48:48 + 46])
+        self.assertEqual(self.stand_ins.stats["octopus.rates"], requests)
+
+        # One the file does not cover is fetched again.
+        self.load(date(2026, 3, 28), date(2026, 3, 31))
+        self.assertGreater(self.stand_ins.stats["octopus.rates"], requests)
+
+
+class SimulateTests(unittest.TestCase):
+    def setUp(self):
+        # init_worker silences logging for the worker process it runs in.
+        self.addCleanup(logging.disable, logging.NOTSET)
+        prices = [10.0] * 48
+        prices[32] = 1.0  # 16:00
+        prices[34:38] = [40.0] * 4  # 17:00-19:00, above every max price
+        init_worker(day_rates(WINTER_DAY, prices), 3.0)
+
+    def test_fixed_rates(self):
+        result = simulate(SweepParams(5.0, 30.0, False, ()))
+
+        # Greedy: 04:00-06:00, 14:00-15:00 and 19:00-20:00 for the windows,
+        # then 16:00 and 23:00 as the cheapest late slots.
+        self.assertEqual((result.days, result.days_short, result.slots), (1, 0, 10))
+        self.assertAlmostEqual(result.kwh, 15.0)
+        self.assertAlmostEqual(result.cost_gbp, (9 * 10.0 + 1.0) * 1.5 / 100)
+        self.assertAlmostEqual(result.avg_ppkwh, 9.1)
+        self.assertEqual(result.max_slot_ppkwh, 10.0)
+        self.assertAlmostEqual(result.peak_kwh, 1.5)
+        self.assertAlmostEqual(result.peak_cost_gbp, 0.015)
+        self.assertEqual(result.blocked_hours, "[]")
+
+    def test_blocked_hours_move_heating_out_of_the_peak(self):
+        result = simulate(SweepParams(5.0, 30.0, False, (16,)))
+
+        self.assertEqual(result.slots, 10)
+        self.assertEqual(result.peak_kwh, 0.0)
+        self.assertAlmostEqual(result.cost_gbp, 10 * 10.0 * 1.5 / 100)
+
+    def test_days_short_of_budget_are_counted(self):
+        result = simulate(SweepParams(24.0, 30.0, False, ()))
+
+        self.assertEqual(result.slots, 48 - 4)
+        self.assertEqual(result.days_short, 1)
+
+
+class RunSweepTests(unittest.TestCase):
+    def setUp(self):
+        self.addCleanup(logging.disable, logging.NOTSET)
+
+    def test_jobs_match_a_serial_run(self):
+        # Across the spring-forward day, so one day has 46 slots.
+        rates = stand_in_rates(date(2026, 3, 27), 4)
+        grid = parse_grid(grid_args(budgets="2,3.5,6", max_prices="18,25,40", blocked_hours="[7,8,16,17,18];[16];[]"))
+
+        serial = run_sweep(grid, rates, 3.0, 1)
+
+        self.assertEqual(len(serial), len(grid))
+        self.assertEqual(
+            [(result.budget_hours, result.max_price, result.use_below_average) for result in serial],
+            [(params.budget_hours, params.max_price, params.use_below_average) for params in grid],
+        )
+        self.assertTrue(all(result.days == 4 for result in serial))
+        for jobs in (2, 3):
+            with self.subTest(jobs=jobs):
+                self.assertEqual(run_sweep(grid, rates, 3.0, jobs), serial)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import tempfile
+import unittest
+from array import array
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+from telemetry_cache import SETTLE, ColumnarCache, utc_day_start
+
+
+class ColumnarCacheTests(unittest.TestCase):
+    DAY = date(2026, 3, 29)
+
+    def setUp(self):
+        self.cache = ColumnarCache(Path(tempfile.mkdtemp()))
+
+    def test_columns_round_trip_exactly(self):
+        start = utc_day_start(self.DAY).timestamp()
+        columns = [
+            array("d", (start + minute * 60.0 + 0.123456 for minute in range(1440))),
+            array("d", (3000.0 if minute % 7 else 0.0 for minute in range(1440))),
+            array("d", (1234567.8 + minute * 50.1 for minute in range(1440))),
+        ]
+
+        self.cache.store("energy_readings/channel=1", self.DAY, columns)
+
+        self.assertEqual(self.cache.load("energy_readings/channel=1", self.DAY), columns)
+
+    def test_empty_day_round_trips(self):
+        self.cache.store("rates/E-1R-AGILE-24-10-01-C", self.DAY, [array("d"), array("d"), array("d")])
+
+        self.assertEqual(self.cache.load("rates/E-1R-AGILE-24-10-01-C", self.DAY), [array("d"), array("d"), array("d")])
+
+    def test_missing_partition_loads_as_none(self):
+        self.assertIsNone(self.cache.load("energy_readings/channel=1", self.DAY))
+
+    def test_partitions_are_written_once(self):
+        self.cache.store("energy_readings/channel=1", self.DAY, [[1.0, 2.0]])
+        self.cache.store("energy_readings/channel=1", self.DAY, [[3.0, 4.0, 5.0]])
+
+        self.assertEqual(self.cache.load("energy_readings/channel=1", self.DAY), [array("d", [1.0, 2.0])])
+
+    def test_unequal_columns_are_rejected(self):
+        with self.assertRaises(ValueError):
+            self.cache.store("energy_readings/channel=1", self.DAY, [[1.0, 2.0], [3.0]])
+        self.assertFalse(self.cache.path("energy_readings/channel=1", self.DAY).exists())
+
+    def test_truncated_partition_is_reported(self):
+        self.cache.store("energy_readings/channel=1", self.DAY, [[1.0, 2.0]])
+        path = self.cache.path("energy_readings/channel=1", self.DAY)
+        path.write_bytes(path.read_bytes()[:-4])
+
+        with self.assertRaises(RuntimeError):
+            self.cache.load("energy_readings/channel=1", self.DAY)
+
+    def test_day_is_final_once_settled_after_its_utc_end(self):
+        settled = utc_day_start(self.DAY) + timedelta(days=1) + SETTLE
+
+        self.assertFalse(ColumnarCache.is_final(self.DAY, settled - timedelta(microseconds=1)))
+        self.assertTrue(ColumnarCache.is_final(self.DAY, settled))
+        self.assertFalse(ColumnarCache.is_final(self.DAY, datetime(2026, 3, 29, 23, 59, tzinfo=timezone.utc)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,319 @@
+"""End-to-end throughput and latency against local service stand-ins.
+
+Run from the repository root:
+
+    python benchmarks/bench_end_to_end.py
+    python benchmarks/bench_end_to_end.py --latency-ms 80 --jitter-ms 20 --failure-rate 0.02
+    python benchmarks/bench_end_to_end.py --save-baseline
+
+Nothing leaves the machine: Shelly Cloud, Octopus, Supabase and Tuya are
+served by benchmarks/stand_ins.py on 127.0.0.1. Each scenario drives the real
+code path and times every operation:
+
+    cloud_worker   cloud_worker.process_reading(): Shelly v1 status + RPC write
+    update_schedule SmartWaterController.update_schedule(): paginated Octopus
+                   rates, SmartScheduler, replace_heating_schedule RPC
+    control_loop   SmartWaterController.control_loop(): Shelly power read,
+                   Shelly relay lease and Tuya command
+    scheduler      SmartScheduler.compute_schedule_for_date() on stand-in rates
+    flex_savings   analysis/flex_savings.py for --days days of minute readings
+
+The report gives ops/s and p50/p99 latency per scenario and the change from
+the stored baseline (benchmarks/baseline_end_to_end.json). Baselines are only
+compared when they were recorded with the same stand-in settings; the Shelly
+account rate gate is disabled unless --shelly-interval is given, so the
+numbers measure the code rather than the 1 req/s cloud limit.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+INGESTION_DIR = os.path.join(ROOT_DIR, "ingestion")
+sys.path.insert(0, INGESTION_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, "analysis"))
+
+from stand_ins import StandIns, StandInTuyaCloud  # noqa: E402
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline_end_to_end.json")
+SCENARIOS = ("cloud_worker", "update_schedule", "control_loop", "scheduler", "flex_savings")
+FLEX_BASELINE_DATE = date(2026, 10, 1)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark controller, collector and analysis against local stand-ins.")
+    parser.add_argument("--iterations", type=int, default=50, help="Operations per scenario (flex_savings runs a fifth as many).")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="Comma-separated scenarios to run.")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Added latency per stand-in response.")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Standard deviation of the added latency.")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Fraction of requests answered with 503.")
+    parser.add_argument("--shelly-429-every", type=int, default=0, help="Answer every Nth Shelly request with 429.")
+    parser.add_argument("--octopus-page-size", type=int, default=100, help="Rates per Octopus page.")
+    parser.add_argument("--shelly-interval", type=float, default=0.0, help="Shelly rate-gate interval in seconds.")
+    parser.add_argument("--days", type=int, default=7, help="Days analysed per flex_savings run.")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON to compare with.")
+    parser.add_argument("--save-baseline", action="store_true", help="Write this run's results as the baseline.")
+    parser.add_argument("--max-regression", type=float, default=None, help="Exit 1 if ops/s drops by more than this fraction.")
+    parser.add_argument("--verbose", action="store_true", help="Keep application logging enabled.")
+    return parser.parse_args()
+
+
+def configure_environment(base_url, gate_path, shelly_interval):
+    """Point every client at the stand-ins; must run before the ingestion modules are imported."""
+    os.environ.update({
+        "SUPABASE_URL": base_url,
+        "SUPABASE_KEY": "bench-key",
+        "SHELLY_CLOUD_SERVER": base_url,
+        "SHELLY_CLOUD_AUTH_KEY": "bench-auth",
+        "SHELLY_METER_DEVICE_ID": "bench-meter",
+        "SHELLY_RELAY_DEVICE_ID": "bench-relay",
+        "SHELLY_RATE_GATE_PATH": gate_path,
+        "MAIN_HEATER_CONTROL": "shelly",
+        "SECOND_HEATER_CONTROL": "tuya",
+        "TUYA_CONTROL_MODE": "cloud",
+        "TUYA_ACCESS_ID": "bench-id",
+        "TUYA_ACCESS_KEY": "bench-secret",
+        "TUYA_DEVICE_ID_MAIN": "bench-tuya-main",
+        "TUYA_DEVICE_ID_SECOND": "bench-tuya-second",
+        "DRY_RUN": "false",
+        "SMART_COOLDOWN_ENABLED": "true",
+        "CONTROLLER_CHECKPOINT_ENABLED": "false",
+        "STATUS_API_ENABLED": "false",
+    })
+
+    import cloud_worker
+    import tuya_manager
+    from octopus_client import OctopusClient
+    from services.shelly_manager import ShellyManager
+    from services.shelly_rate_gate import SharedShellyRequestGate
+    from services.time_service import TimeService
+
+    cloud_worker.SHELLY_REQUEST_GATE = SharedShellyRequestGate(gate_path, min_interval_seconds=shelly_interval)
+    ShellyManager.CLOUD_MIN_REQUEST_INTERVAL_SECONDS = shelly_interval
+    OctopusClient.BASE_URL = f"{base_url}/v1/products"
+    tuya_manager.tinytuya = type("tinytuya", (), {"Cloud": staticmethod(lambda **kw: StandInTuyaCloud(base_url, **kw))})
+    # No NTP round-trip: the stand-ins run on the local clock anyway.
+    TimeService.check_system_clock = lambda self: (0.0, True)
+
+
+def measure(operation, iterations):
+    """Runs operation iterations times; returns per-call seconds and wall time."""
+    samples = []
+    started = time.perf_counter()
+    for index in range(iterations):
+        call_started = time.perf_counter()
+        operation(index)
+        samples.append(time.perf_counter() - call_started)
+    return samples, time.perf_counter() - started
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def summarize(samples, wall_seconds):
+    return {
+        "ops": len(samples),
+        "ops_per_s": round(len(samples) / wall_seconds, 2) if wall_seconds else 0.0,
+        "p50_ms": round(percentile(samples, 0.50) * 1000, 2),
+        "p99_ms": round(percentile(samples, 0.99) * 1000, 2),
+    }
+
+
+def run_cloud_worker(iterations, args):
+    import cloud_worker
+
+    start = datetime.now(timezone.utc).replace(second=0, microsecond=0)
+    failures = []
+
+    def poll(index):
+        if not cloud_worker.process_reading(scheduled_at=start + timedelta(minutes=index)):
+            failures.append(index)
+
+    samples, wall = measure(poll, iterations)
+    return samples, wall, len(failures)
+
+
+def run_update_schedule(iterations, args, controller):
+    failures = []
+
+    def update(index):
+        controller.update_schedule()
+        if not controller.main_heater_slots and not controller.second_heater_slots:
+            failures.append(index)
+
+    samples, wall = measure(update, iterations)
+    return samples, wall, len(failures)
+
+
+def run_control_loop(iterations, args, controller):
+    # Keep an off-peak slot active so every pass takes the full path (meter
+    # read, relay lease, Tuya command) whatever the time of day.
+    now = datetime.now(timezone.utc)
+    controller.main_heater_slots = [
+        {"valid_from": now - timedelta(minutes=5), "valid_to": now + timedelta(hours=1), "value_inc_vat": 10.0},
+    ]
+    samples, wall = measure(lambda index: controller.control_loop(), iterations)
+    errors = sum(1 for key in ("peak_heater", "off_peak_heater") if controller.system_state[key]["last_error"])
+    return samples, wall, errors
+
+
+def run_scheduler(iterations, args, controller):
+    from services.smart_scheduler import SmartScheduler
+    from config import Config
+
+    today = controller.time_service.now().astimezone(controller.time_service.timezone).date()
+    rates = controller.octopus.get_rates(
+        (datetime.now(timezone.utc) - timedelta(days=1)).isoformat(),
+        (datetime.now(timezone.utc) + timedelta(days=2)).isoformat(),
+    )
+    scheduler = SmartScheduler(Config)
+
+    def schedule(index):
+        scheduler.compute_schedule_for_date(
+            target_date=today + timedelta(days=index % 2),
+            rates=rates,
+            budget_hours=Config.DAILY_HEATING_BUDGET_HOURS,
+            max_price=Config.ABSOLUTE_MAX_PRICE,
+            use_below_average=Config.USE_BELOW_AVERAGE,
+            blocked_hours=Config.BLOCKED_HOURS,
+        )
+
+    samples, wall = measure(schedule, iterations)
+    return samples, wall, 0 if rates else iterations
+
+
+def run_flex_savings(iterations, args):
+    import flex_savings
+
+    flex_savings.OCTOPUS_API_URL = f"{os.environ['SUPABASE_URL']}/v1/products"
+    failures = []
+    with tempfile.TemporaryDirectory() as output_dir:
+        argv = [
+            "flex_savings.py",
+            "--baseline-date", FLEX_BASELINE_DATE.isoformat(),
+            "--start", (FLEX_BASELINE_DATE + timedelta(days=1)).isoformat(),
+            "--end", (FLEX_BASELINE_DATE + timedelta(days=args.days)).isoformat(),
+            "--output-dir", output_dir,
+            "--cache-dir", "",
+        ]
+
+        def analyse(index):
+            saved_argv, sys.argv = sys.argv, argv
+            try:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    exit_code = flex_savings.main()
+                if exit_code != 0:
+                    failures.append(index)
+            except Exception:
+                failures.append(index)
+            finally:
+                sys.argv = saved_argv
+
+        samples, wall = measure(analyse, max(1, iterations // 5))
+    return samples, wall, len(failures)
+
+
+def load_baseline(path):
+    try:
+        with open(path, encoding="utf-8") as baseline_file:
+            return json.load(baseline_file)
+    except (OSError, ValueError):
+        return None
+
+
+def report(results, settings, baseline):
+    comparable = baseline is not None and baseline.get("settings") == settings
+    if baseline is not None and not comparable:
+        print("Baseline was recorded with different stand-in settings; not comparing.\n")
+
+    print(f"{'scenario':<16} {'ops':>5} {'ops/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'errors':>6}  vs baseline")
+    regressions = {}
+    for name, result in results.items():
+        change = ""
+        previous = comparable and baseline["results"].get(name)
+        if previous and previous["ops_per_s"]:
+            ratio = result["ops_per_s"] / previous["ops_per_s"] - 1
+            regressions[name] = -ratio
+            change = f"{ratio:+.1%} ops/s, p99 {previous['p99_ms']:g} -> {result['p99_ms']:g} ms"
+        print(
+            f"{name:<16} {result['ops']:>5} {result['ops_per_s']:>9.2f} {result['p50_ms']:>9.2f} "
+            f"{result['p99_ms']:>9.2f} {result['errors']:>6}  {change}"
+        )
+    return regressions
+
+
+def main():
+    args = parse_args()
+    if not args.verbose:
+        logging.disable(logging.CRITICAL)
+    selected = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = set(selected) - set(SCENARIOS)
+    if unknown:
+        raise SystemExit(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+    settings = {
+        "iterations": args.iterations,
+        "latency_ms": args.latency_ms,
+        "jitter_ms": args.jitter_ms,
+        "failure_rate": args.failure_rate,
+        "shelly_429_every": args.shelly_429_every,
+        "octopus_page_size": args.octopus_page_size,
+        "shelly_interval": args.shelly_interval,
+        "days": args.days,
+    }
+    stand_ins = StandIns(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        failure_rate=args.failure_rate,
+        shelly_429_every=args.shelly_429_every,
+        octopus_page_size=args.octopus_page_size,
+    )
+
+    results = {}
+    with stand_ins, tempfile.TemporaryDirectory() as scratch:
+        configure_environment(stand_ins.base_url, str(Path(scratch) / "shelly-gate.sqlite3"), args.shelly_interval)
+        controller = None
+        if {"update_schedule", "control_loop", "scheduler"} & set(selected):
+            from main import SmartWaterController
+
+            controller = SmartWaterController(dry_run=False)
+            if "update_schedule" not in selected:
+                controller.update_schedule()
+
+        for name in selected:
+            if name in {"cloud_worker", "flex_savings"}:
+                samples, wall, errors = globals()[f"run_{name}"](args.iterations, args)
+            else:
+                samples, wall, errors = globals()[f"run_{name}"](args.iterations, args, controller)
+            results[name] = {**summarize(samples, wall), "errors": errors}
+
+    regressions = report(results, settings, load_baseline(args.baseline))
+    print("\nStand-in requests: " + ", ".join(f"{key}={value}" for key, value in sorted(stand_ins.stats.items())))
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as baseline_file:
+            json.dump({"settings": settings, "results": results}, baseline_file, indent=2, sort_keys=True)
+            baseline_file.write("\n")
+        print(f"Baseline written to {args.baseline}")
+
+    if args.max_regression is not None:
+        worst = {name: drop for name, drop in regressions.items() if drop > args.max_regression}
+        if worst:
+            print("Regressions: " + ", ".join(f"{name} -{drop:.1%}" for name, drop in worst.items()))
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,141 @@
+"""Benchmark flex_savings reading storage over a year of minute readings.
+
+Run from the repository root:
+
+    python benchmarks/bench_flex_memory.py --days 365
+
+Minute readings for two meter channels (generated by the benchmark
+stand-ins) are held three ways, and the memory each allocates is measured
+with tracemalloc:
+
+    objects  one Reading dataclass with a datetime per reading, as
+             flex_savings held them before ReadingSeries
+    slotted  the same readings as __slots__ Reading objects
+    series   one ReadingSeries per channel: int64 epoch-microsecond and
+             float64 columns
+
+The series are then cut into UK-day windows and turned into segments, and
+the kWh is checked against the counter deltas.
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT_DIR, "ingestion"))
+sys.path.insert(0, os.path.join(ROOT_DIR, "analysis"))
+
+from flex_savings import (  # noqa: E402
+    Reading,
+    ReadingSeries,
+    day_segments,
+    day_windows,
+    parse_datetime,
+    uk_day_bounds,
+)
+from stand_ins import READING_INTERVAL, meter_reading  # noqa: E402
+
+
+@dataclass
+class ObjectReading:
+    channel: int
+    created_at: datetime
+    power_w: float
+    energy_total_wh: float
+
+
+def day_rows(channel, day):
+    start_utc, end_utc = uk_day_bounds(day)
+    current_at = start_utc
+    while current_at < end_utc:
+        yield meter_reading(channel, current_at)
+        current_at += READING_INTERVAL
+
+
+def object_readings(reading_class, channel, days):
+    readings = []
+    for day in days:
+        readings.extend(
+            reading_class(
+                int(row["channel"]),
+                parse_datetime(row["created_at"]),
+                float(row["power_w"]),
+                float(row["energy_total_wh"]),
+            )
+            for row in day_rows(channel, day)
+        )
+    return readings
+
+
+def series_readings(channel, days):
+    return ReadingSeries.concat(channel, (ReadingSeries.from_rows(channel, day_rows(channel, day)) for day in days))
+
+
+def measured(build):
+    """(result, bytes still allocated after build, seconds)"""
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = build()
+    seconds = time.perf_counter() - started
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, allocated, seconds
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark flex_savings reading storage.")
+    parser.add_argument("--days", type=int, default=365, help="Number of UK days of minute readings.")
+    parser.add_argument("--start", default="2026-01-01", help="First UK day.")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    first_day = date.fromisoformat(args.start)
+    days = [first_day + timedelta(days=offset) for offset in range(args.days)]
+    channels = (0, 1)
+
+    builds = {
+        "objects": lambda: [object_readings(ObjectReading, channel, days) for channel in channels],
+        "slotted": lambda: [object_readings(Reading, channel, days) for channel in channels],
+        "series": lambda: [series_readings(channel, days) for channel in channels],
+    }
+    sizes = {}
+    series = None
+    for name, build in builds.items():
+        result, sizes[name], seconds = measured(build)
+        reading_count = sum(len(readings) for readings in result)
+        print(
+            f"  {name:<8}: {sizes[name] / 2**20:8.1f} MiB  {sizes[name] / reading_count:6.1f} B/reading  "
+            f"built in {seconds:5.1f} s  ({sizes['objects'] / sizes[name]:4.1f}x reduction)"
+        )
+        if name == "series":
+            series = result
+        del result
+
+    started = time.perf_counter()
+    windows = zip(*(day_windows(readings.channel, [readings], days) for readings in series))
+    kwh = 0.0
+    for window_set in windows:
+        segments, _ = day_segments(window_set[0][0], {window.channel: window for _, window in window_set})
+        kwh += sum(segment_kwh for _, _, segment_kwh in segments)
+    print(f"{args.days} days, {sum(len(readings) for readings in series)} readings")
+    print(f"  windows and segments from series: {(time.perf_counter() - started) * 1000:.1f} ms, {kwh:.1f} kWh")
+
+    # Within the period each channel's counter only rises by what was used.
+    expected = sum(
+        (readings.energy_total_wh[len(readings) - 1] - readings.energy_total_wh[0]) / 1000.0 for readings in series
+    )
+    if abs(kwh - expected) > 1e-6 * max(1.0, expected):
+        print(f"Segment kWh {kwh:.3f} does not match counter delta {expected:.3f}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
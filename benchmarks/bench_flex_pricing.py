@@ -0,0 +1,142 @@
+"""Benchmark flex_savings energy pricing over months of minute readings.
+
+Run from the repository root:
+
+    python benchmarks/bench_flex_pricing.py --days 182
+
+Every UK day's minute segments for two meter channels (generated by the
+benchmark stand-ins) are priced three ways against half-hourly Agile rates:
+
+    scan   every segment checks every rate of its day, as flex_savings did
+           before rates were indexed (the day's rates already filtered out)
+    bisect cost_for_energy_window: a per-segment bisect into the RateIndex
+    sweep  price_segments: one merge pass over a day's sorted segments
+
+The three totals are checked against each other.
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import date, datetime, timedelta, timezone
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT_DIR, "ingestion"))
+sys.path.insert(0, os.path.join(ROOT_DIR, "analysis"))
+
+from flex_savings import (  # noqa: E402
+    Rate,
+    RateIndex,
+    cost_for_energy_window,
+    parse_datetime,
+    price_segments,
+    uk_day_bounds,
+)
+from stand_ins import READING_INTERVAL, meter_reading, octopus_rates  # noqa: E402
+
+
+def day_segments(day):
+    """(start, end, kwh) epoch-second segments for both channels, sorted by start."""
+    start_utc, end_utc = uk_day_bounds(day)
+    segments = []
+    for channel in (0, 1):
+        previous = meter_reading(channel, start_utc)
+        current_at = start_utc + READING_INTERVAL
+        while current_at <= end_utc:
+            current = meter_reading(channel, current_at)
+            kwh = (current["energy_total_wh"] - previous["energy_total_wh"]) / 1000.0
+            if kwh > 0:
+                segments.append(((current_at - READING_INTERVAL).timestamp(), current_at.timestamp(), kwh))
+            previous = current
+            current_at += READING_INTERVAL
+    segments.sort()
+    return segments
+
+
+def price_by_scan(day_rates, segments):
+    cost_pence = 0.0
+    for start, end, kwh in segments:
+        duration = end - start
+        for rate_start, rate_end, price_ppkwh in day_rates:
+            seconds = min(end, rate_end) - max(start, rate_start)
+            if seconds > 0:
+                cost_pence += kwh * (seconds / duration) * price_ppkwh
+    return cost_pence
+
+
+def price_by_bisect(rates, segments):
+    cost_pence = 0.0
+    for start, end, kwh in segments:
+        cost_pence += cost_for_energy_window(
+            rates,
+            datetime.fromtimestamp(start, timezone.utc),
+            datetime.fromtimestamp(end, timezone.utc),
+            kwh,
+        )[1]
+    return cost_pence
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark flex_savings pricing paths.")
+    parser.add_argument("--days", type=int, default=182, help="Number of UK days of minute readings.")
+    parser.add_argument("--start", default="2026-01-01", help="First UK day.")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    first_day = date.fromisoformat(args.start)
+    days = [first_day + timedelta(days=offset) for offset in range(args.days)]
+    range_start, _ = uk_day_bounds(days[0])
+    _, range_end = uk_day_bounds(days[-1])
+
+    started = time.perf_counter()
+    rates = [
+        Rate(parse_datetime(item["valid_from"]), parse_datetime(item["valid_to"]), float(item["value_inc_vat"]))
+        for item in octopus_rates(range_start, range_end)
+    ]
+    rate_index = RateIndex(rates)
+    segments_by_day = {day: day_segments(day) for day in days}
+    segment_count = sum(len(segments) for segments in segments_by_day.values())
+    print(f"Generated {segment_count} segments and {len(rates)} rates in {time.perf_counter() - started:.1f} s")
+
+    timings = {}
+    totals = {}
+
+    started = time.perf_counter()
+    totals["scan"] = 0.0
+    for day, segments in segments_by_day.items():
+        day_start, day_end = (bound.timestamp() for bound in uk_day_bounds(day))
+        day_rates = [
+            (start, end, price_ppkwh)
+            for start, end, price_ppkwh in zip(rate_index.starts, rate_index.ends, rate_index.prices)
+            if min(day_end, end) - max(day_start, start) > 0
+        ]
+        totals["scan"] += price_by_scan(day_rates, segments)
+    timings["scan"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    totals["bisect"] = sum(price_by_bisect(rate_index, segments) for segments in segments_by_day.values())
+    timings["bisect"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    totals["sweep"] = sum(price_segments(rate_index, segments)[1] for segments in segments_by_day.values())
+    timings["sweep"] = time.perf_counter() - started
+
+    print(f"{args.days} days, {segment_count} segments")
+    for name, seconds in timings.items():
+        print(
+            f"  {name:<7}: {seconds * 1000:9.1f} ms  {segment_count / seconds:12.0f} segments/s  "
+            f"cost GBP {totals[name] / 100:.2f}  ({timings['scan'] / seconds:5.1f}x scan)"
+        )
+
+    reference = totals["scan"]
+    if any(abs(total - reference) > 1e-6 * max(1.0, abs(reference)) for total in totals.values()):
+        print("Pricing paths disagree")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,110 @@
+"""Replay a month of rates through daily and rolling-horizon scheduling.
+
+Run from the repository root:
+
+    python benchmarks/bench_rolling_horizon.py
+
+Time advances in half-hour steps. Tomorrow's rates become known at 16:00
+local time, as Octopus publishes them. The daily mode executes each day's
+compute_schedule_for_date selection; the rolling mode re-plans every step
+over all known rates (up to the end of tomorrow) and executes the slot that
+starts at that step. The report compares the price actually paid per slot
+and how many refreshes needed a full solve.
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+INGESTION_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "ingestion")
+sys.path.insert(0, INGESTION_DIR)
+
+from bench_smart_scheduler import BenchmarkConfig, synthetic_rates  # noqa: E402
+from services.smart_scheduler import SmartScheduler  # noqa: E402
+
+BLOCKED_HOURS = [7, 8, 16, 17, 18]
+
+
+def local_midnight_utc(scheduler, day):
+    return scheduler.timezone.localize(datetime.combine(day, datetime.min.time())).astimezone(timezone.utc)
+
+
+def run_daily(rates, budget_hours):
+    scheduler = SmartScheduler(BenchmarkConfig)
+    days = sorted({scheduler.local_time(rate).date for rate in rates})
+    executed = []
+    for day in days:
+        executed.extend(scheduler.compute_schedule_for_date(
+            target_date=day,
+            rates=rates,
+            budget_hours=budget_hours,
+            max_price=30.0,
+            use_below_average=True,
+            blocked_hours=BLOCKED_HOURS,
+        ))
+    return executed
+
+
+def run_rolling(rates, budget_hours, max_gap_hours):
+    scheduler = SmartScheduler(BenchmarkConfig)
+    executed = []
+    elapsed = 0.0
+    for rate in rates:
+        now = rate["valid_from"]
+        local_now = now.astimezone(scheduler.timezone)
+        known_days = 2 if local_now.hour >= 16 else 1
+        horizon_end = local_midnight_utc(scheduler, local_now.date() + timedelta(days=known_days))
+        known = [r for r in rates if r["valid_from"] < horizon_end]
+
+        started = time.perf_counter()
+        plan = scheduler.compute_rolling_schedule(
+            now=now,
+            rates=known,
+            horizon_end=horizon_end,
+            budget_hours=budget_hours,
+            max_price=30.0,
+            blocked_hours=BLOCKED_HOURS,
+            max_gap_hours=max_gap_hours,
+        )
+        elapsed += time.perf_counter() - started
+        if plan and plan[0]["valid_from"] == now:
+            executed.append(plan[0])
+    return executed, scheduler.rolling_stats, elapsed
+
+
+def summarise(name, executed):
+    total = sum(slot["value_inc_vat"] for slot in executed)
+    average = total / len(executed) if executed else 0.0
+    print(f"  {name:8s} slots {len(executed):5d}  average {average:6.2f}p/slot")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark rolling-horizon scheduling.")
+    parser.add_argument("--days", type=int, default=30, help="Number of days of half-hourly rates.")
+    parser.add_argument("--budget-hours", type=float, default=5.0, help="Daily heating budget.")
+    parser.add_argument("--max-gap-hours", type=float, default=12.0, help="Maximum hours between heats.")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    logging.disable(logging.CRITICAL)
+    rates = synthetic_rates(args.days)
+
+    print(f"Rates: {len(rates)} ({args.days} days), budget {args.budget_hours}h, max gap {args.max_gap_hours}h")
+    summarise("daily", run_daily(rates, args.budget_hours))
+    executed, stats, elapsed = run_rolling(rates, args.budget_hours, args.max_gap_hours)
+    summarise("rolling", executed)
+    refreshes = stats["solved"] + stats["reused"]
+    print(
+        f"  rolling refreshes {refreshes}: {stats['solved']} solved, {stats['reused']} reused "
+        f"({elapsed * 1000 / max(refreshes, 1):.2f} ms per refresh)"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,91 @@
+"""Compare the greedy and optimal schedule solvers on a month of rates.
+
+Run from the repository root:
+
+    python benchmarks/bench_schedule_solver.py
+
+Reports the per-day solve time (which must stay far below the controller's
+60-second loop), the total price of the selected slots and the number of
+separate heating runs (heater starts) each solver produces.
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+
+INGESTION_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "ingestion")
+sys.path.insert(0, INGESTION_DIR)
+
+from bench_smart_scheduler import synthetic_rates  # noqa: E402
+from services.smart_scheduler import SmartScheduler  # noqa: E402
+
+
+def solver_config(solver, max_starts):
+    class Config:
+        LOCAL_TIMEZONE = "Europe/London"
+        SCHEDULE_SOLVER = solver
+        MAX_DAILY_HEATER_STARTS = max_starts
+    return Config
+
+
+def run(rates, solver, max_starts, budget_hours):
+    scheduler = SmartScheduler(solver_config(solver, max_starts))
+    days = sorted({scheduler.local_time(rate).date for rate in rates})
+    timings = []
+    total_price = 0.0
+    slot_count = 0
+    starts = 0
+    for day in days:
+        started = time.perf_counter()
+        selected = scheduler.compute_schedule_for_date(
+            target_date=day,
+            rates=rates,
+            budget_hours=budget_hours,
+            max_price=30.0,
+            use_below_average=True,
+            blocked_hours=[7, 8, 16, 17, 18],
+        )
+        timings.append(time.perf_counter() - started)
+        total_price += sum(slot["value_inc_vat"] for slot in selected)
+        slot_count += len(selected)
+        starts += sum(
+            1 for index, slot in enumerate(selected)
+            if index == 0 or selected[index - 1]["valid_to"] != slot["valid_from"]
+        )
+    timings.sort()
+    return {
+        "p50_ms": timings[len(timings) // 2] * 1000,
+        "max_ms": timings[-1] * 1000,
+        "total_price": total_price,
+        "slots": slot_count,
+        "starts": starts,
+    }
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark SmartScheduler solvers.")
+    parser.add_argument("--days", type=int, default=30, help="Number of days of half-hourly rates.")
+    parser.add_argument("--budget-hours", type=float, default=5.0, help="Daily heating budget.")
+    parser.add_argument("--max-starts", type=int, default=4, help="Start cap for the optimal solver.")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    logging.disable(logging.CRITICAL)
+    rates = synthetic_rates(args.days)
+
+    print(f"Rates: {len(rates)} ({args.days} days), budget {args.budget_hours}h")
+    for solver in ("greedy", "optimal"):
+        result = run(rates, solver, args.max_starts, args.budget_hours)
+        print(
+            f"  {solver:8s} p50 {result['p50_ms']:7.2f} ms  max {result['max_ms']:7.2f} ms  "
+            f"slots {result['slots']:4d}  starts {result['starts']:4d}  sum of slot prices {result['total_price']:9.2f}p"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,91 @@
+"""Benchmark SmartScheduler over a month of half-hourly Agile rates.
+
+Run from the repository root:
+
+    python benchmarks/bench_smart_scheduler.py
+
+Every day in the rate set is scheduled twice: once with a fresh scheduler per
+day (each rate start converted to local time again for every day), and once
+with a single long-lived scheduler, as the controller runs it, whose local-time
+cache is reused across days and rate refreshes.
+"""
+
+import argparse
+import logging
+import math
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+INGESTION_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "ingestion")
+sys.path.insert(0, INGESTION_DIR)
+
+from services.smart_scheduler import SmartScheduler  # noqa: E402
+
+
+class BenchmarkConfig:
+    LOCAL_TIMEZONE = "Europe/London"
+
+
+def synthetic_rates(days, start=None):
+    """Return half-hourly rates with an Agile-like daily shape."""
+    start = start or datetime(2026, 10, 1, tzinfo=timezone.utc)
+    rates = []
+    for index in range(days * 48):
+        valid_from = start + timedelta(minutes=30 * index)
+        hour = (index % 48) / 2
+        price = 18.0 + 10.0 * math.sin((hour - 10) / 24 * 2 * math.pi) + (index * 7 % 11) / 2
+        rates.append({
+            "valid_from": valid_from,
+            "valid_to": valid_from + timedelta(minutes=30),
+            "value_inc_vat": round(price, 2),
+        })
+    return rates
+
+
+def schedule_all_days(rates, scheduler_factory):
+    days = sorted({rate["valid_from"].date() for rate in rates})
+    started = time.perf_counter()
+    for day in days:
+        scheduler_factory().compute_schedule_for_date(
+            target_date=day,
+            rates=rates,
+            budget_hours=5.0,
+            max_price=30.0,
+            use_below_average=True,
+            blocked_hours=[7, 8, 16, 17, 18],
+        )
+    return time.perf_counter() - started
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark SmartScheduler local-time handling.")
+    parser.add_argument("--days", type=int, default=30, help="Number of days of half-hourly rates.")
+    parser.add_argument("--repeat", type=int, default=5, help="Best-of repetitions per variant.")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    logging.disable(logging.CRITICAL)
+    rates = synthetic_rates(args.days)
+
+    cold = min(
+        schedule_all_days(rates, lambda: SmartScheduler(BenchmarkConfig))
+        for _ in range(args.repeat)
+    )
+
+    shared = SmartScheduler(BenchmarkConfig)
+    schedule_all_days(rates, lambda: shared)  # populate the cache once
+    warm = min(schedule_all_days(rates, lambda: shared) for _ in range(args.repeat))
+
+    print(f"Rates: {len(rates)} ({args.days} days), best of {args.repeat}")
+    print(f"  fresh scheduler per day : {cold * 1000:8.1f} ms")
+    print(f"  long-lived scheduler    : {warm * 1000:8.1f} ms")
+    print(f"  speedup                 : {cold / warm:8.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -18,16 +18,13 @@ import requests
 from dotenv import load_dotenv
 
 try:
+    from .services.log_setup import configure_logging
     from .services.shelly_rate_gate import SharedShellyRequestGate
 except ImportError:  # Direct execution: python ingestion/cloud_worker.py
+    from services.log_setup import configure_logging
     from services.shelly_rate_gate import SharedShellyRequestGate
 
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    handlers=[logging.FileHandler("cloud_worker.log"), logging.StreamHandler()],
-)
 logger = logging.getLogger(__name__)
 
 load_dotenv()
@@ -354,7 +351,7 @@ def process_reading(*, poll_id=None, scheduled_at=None):
 
     scheduled_at = scheduled_minute(scheduled_at or utc_now())
     poll_id = poll_id or poll_id_for_schedule(scheduled_at)
-    logger.info("Fetching Shelly Cloud status (poll_id=%s)", poll_id)
+    logger.info("Fetching Shelly Cloud status (poll_id=%s)", poll_id, extra={"poll_id": poll_id})
     status, metadata = get_shelly_status(SHELLY_DEVICE_ID)
     if status is None:
         persist_poll_result(build_poll_row(
@@ -412,7 +409,7 @@ def process_reading(*, poll_id=None, scheduled_at=None):
 
     for row in rows:
         last_readings[(row["device_id"], row["channel"])] = row
-    logger.info("Logged %s channel rows (poll_id=%s)", len(rows), poll_id)
+    logger.info("Logged %s channel rows (poll_id=%s)", len(rows), poll_id, extra={"poll_id": poll_id})
     return True
 
 
@@ -454,4 +451,5 @@ def main():
 
 
 if __name__ == "__main__":
+    configure_logging("cloud_worker.log")
     raise SystemExit(main())
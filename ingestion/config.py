@@ -139,8 +139,62 @@ class Config:
         ABSOLUTE_MAX_PRICE = 30.0
 
     USE_BELOW_AVERAGE = os.getenv('USE_BELOW_AVERAGE', 'true').lower() == 'true'
+
+    # Learn the daily budget from metered energy and Smart Cooldown triggers
+    # instead of using DAILY_HEATING_BUDGET_HOURS as a fixed figure.
+    HEAT_DEMAND_LEARNING = bool_env('HEAT_DEMAND_LEARNING', False)
+    try:
+        HEATER_POWER_KW = float(os.getenv('HEATER_POWER_KW', 3.0))
+    except ValueError:
+        HEATER_POWER_KW = 3.0
+    try:
+        MIN_DAILY_HEATING_BUDGET_HOURS = float(os.getenv('MIN_DAILY_HEATING_BUDGET_HOURS', 2.0))
+    except ValueError:
+        MIN_DAILY_HEATING_BUDGET_HOURS = 2.0
+    try:
+        MAX_DAILY_HEATING_BUDGET_HOURS = float(os.getenv('MAX_DAILY_HEATING_BUDGET_HOURS', 8.0))
+    except ValueError:
+        MAX_DAILY_HEATING_BUDGET_HOURS = 8.0
+
+    # Slot selection strategy: 'greedy' (fixed window heuristics) or 'optimal'
+    # (minimum-cost dynamic program that also caps separate heating runs).
+    SCHEDULE_SOLVER = os.getenv('SCHEDULE_SOLVER', 'greedy').lower()
+    if SCHEDULE_SOLVER not in {'greedy', 'optimal'}:
+        SCHEDULE_SOLVER = 'greedy'
+    MAX_DAILY_HEATER_STARTS = int_env('MAX_DAILY_HEATER_STARTS', 4)
+    # Let greedy scale its morning/afternoon/evening minimums down to a budget
+    # below their 4 hours ('optimal' always does); off keeps the fixed windows.
+    SCALE_WINDOW_MINIMUMS = bool_env('SCALE_WINDOW_MINIMUMS', False)
+
+    # 'daily' schedules today and tomorrow separately; 'rolling' optimises every
+    # known future rate together, keeping heats at most MAX_HOURS_BETWEEN_HEATS apart.
+    SCHEDULE_HORIZON = os.getenv('SCHEDULE_HORIZON', 'daily').lower()
+    if SCHEDULE_HORIZON not in {'daily', 'rolling'}:
+        SCHEDULE_HORIZON = 'daily'
+    try:
+        MAX_HOURS_BETWEEN_HEATS = float(os.getenv('MAX_HOURS_BETWEEN_HEATS', 12.0))
+    except ValueError:
+        MAX_HOURS_BETWEEN_HEATS = 12.0
+
     SMART_COOLDOWN_ENABLED = os.getenv('SMART_COOLDOWN_ENABLED', 'false').lower() == 'true'
 
+    # Save controller state after each loop and resume from it after a restart.
+    # Schedules and cooldown older than CHECKPOINT_MAX_AGE_MINUTES are ignored.
+    CONTROLLER_CHECKPOINT_ENABLED = bool_env('CONTROLLER_CHECKPOINT_ENABLED', False)
+    CHECKPOINT_MAX_AGE_MINUTES = clamped_int_env('CHECKPOINT_MAX_AGE_MINUTES', 120, 1, 1440)
+    # SQLite file for the checkpoint; unset uses one under the system temp directory.
+    CONTROLLER_CHECKPOINT_PATH = os.getenv('CONTROLLER_CHECKPOINT_PATH') or None
+
+    # Minutes between stage timing summaries in the log.
+    TIMING_SUMMARY_MINUTES = clamped_int_env('TIMING_SUMMARY_MINUTES', 60, 1, 1440)
+    # While the controller runs, also write every span here as a Chrome trace event.
+    TIMING_TRACE_FILE = os.getenv('TIMING_TRACE_FILE') or None
+
+    # Local HTTP/JSON status API serving get_state() to a UI on the same host/LAN.
+    STATUS_API_ENABLED = bool_env('STATUS_API_ENABLED', False)
+    STATUS_API_HOST = os.getenv('STATUS_API_HOST', '127.0.0.1')
+    STATUS_API_PORT = clamped_int_env('STATUS_API_PORT', 8765, 1, 65535)
+
     MAIN_HEATER_CONTROL = os.getenv('MAIN_HEATER_CONTROL', 'tuya').lower()
     SECOND_HEATER_CONTROL = os.getenv('SECOND_HEATER_CONTROL', 'tuya').lower()
 
@@ -1,3 +1,4 @@
+import logging
 from datetime import datetime, timezone
 
 from config import Config
@@ -195,4 +196,5 @@ def main():
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
     raise SystemExit(main())
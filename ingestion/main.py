@@ -1,28 +1,42 @@
 import time
 import logging
-import schedule
+import threading
 from datetime import datetime, timedelta, timezone
 from config import Config
 from services.time_service import TimeService
 from services.shelly_manager import ShellyManager
 from services.smart_scheduler import SmartScheduler
+from services.schedule_solver import MIN_BUDGET_SLOTS, SCHEDULE_WINDOWS
 from services.schedule_storage import ScheduleStorage
+from services.heat_demand import EnergyCounterReader, HeatDemandModel
 from tuya_manager import TuyaManager
 from octopus_client import OctopusClient
+from services.log_setup import configure_logging
+from services.timing import timed, timings
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("smart_water.log"),
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger(__name__)
 
 class SmartWaterController:
+    # Learned heat demand outlives the schedule; cached relay state and the
+    # low-power streak are only trusted across a quick restart.
+    CHECKPOINT_RETENTION_SECONDS = 7 * 24 * 3600
+    DEVICE_STATE_MAX_AGE_SECONDS = 300
+
+    # Startup deadlines. Three NTP servers at 5s each bound the clock check;
+    # control starts without a fresh schedule if Octopus/Supabase are slower.
+    CLOCK_CHECK_DEADLINE_SECONDS = 20
+    STARTUP_SCHEDULE_DEADLINE_SECONDS = 90
+
     def __init__(self, dry_run=None):
+        # Imported here so that importing main stays cheap; only a running
+        # controller needs the checkpoint, startup and status modules.
+        from services.controller_checkpoint import ControllerCheckpoint
+        from services.startup import FAILED, OK, TIMED_OUT, StartupOrchestrator
+        from services.status_server import StatusSnapshot
+
+        self._started_at = time.monotonic()
+        self._first_control_at = None
+        self._schedule_lock = threading.Lock()
         self.dry_run = Config.DRY_RUN if dry_run is None else dry_run
         logger.info(f"Initializing Smart Water Controller (Dry Run: {self.dry_run})")
 
@@ -32,18 +46,42 @@ class SmartWaterController:
             )
 
         self.time_service = TimeService(Config.LOCAL_TIMEZONE)
-        
-        self.tuya = TuyaManager()
-        if not getattr(self.tuya, 'enabled', True):
+
+        # The NTP check and the Tuya Cloud login are independent round-trips.
+        # TinyTuya is only loaded when a heater is actually switched through Tuya.
+        init = StartupOrchestrator("init")
+        init.add("clock", self.time_service.check_system_clock, deadline=self.CLOCK_CHECK_DEADLINE_SECONDS)
+        if 'tuya' in (Config.MAIN_HEATER_CONTROL, Config.SECOND_HEATER_CONTROL):
+            init.add("tuya", TuyaManager)
+        init.add("shelly", ShellyManager)
+        init.run()
+        for name, result in init.results.items():
+            if name != "clock" and result.status == FAILED:
+                raise result.error
+
+        self.tuya = init.value("tuya")
+        if self.tuya is None:
+            logger.info("No heater uses Tuya control; Tuya Manager not started.")
+        elif not getattr(self.tuya, 'enabled', True):
             logger.warning("Tuya Manager disabled due to missing config.")
             
-        self.shelly = ShellyManager()
+        self.shelly = init.value("shelly")
         if not self.shelly.enabled:
             logger.warning("Shelly Manager disabled. Smart Cooldown will NOT function.")
         
         self.octopus = OctopusClient(Config.OCTOPUS_PRODUCT_CODE, Config.OCTOPUS_REGION_CODE)
         self.scheduler = SmartScheduler(Config)
         self.schedule_storage = ScheduleStorage()
+        self.heat_demand = HeatDemandModel(
+            heater_kw=Config.HEATER_POWER_KW,
+            default_hours=Config.DAILY_HEATING_BUDGET_HOURS,
+            # Below one slot per schedule window the solvers buy the same slots.
+            min_hours=max(Config.MIN_DAILY_HEATING_BUDGET_HOURS, MIN_BUDGET_SLOTS / 2),
+            max_hours=Config.MAX_DAILY_HEATING_BUDGET_HOURS,
+        )
+        self.energy_reader = None
+        if Config.HEAT_DEMAND_LEARNING:
+            self.energy_reader = EnergyCounterReader(Config.SHELLY_METER_DEVICE_ID, self._off_peak_meter_channel())
 
         self.main_heater_slots = []
         self.second_heater_slots = []
@@ -65,12 +103,131 @@ class SmartWaterController:
             "next_schedule_update": None,
             "rates": []
         }
+        self.status_snapshot = StatusSnapshot()
+        self.status_server = None
+
+        self.checkpoint = (
+            ControllerCheckpoint(Config.CONTROLLER_CHECKPOINT_PATH) if Config.CONTROLLER_CHECKPOINT_ENABLED else None
+        )
+        self.resumed_from_checkpoint = False
         
-        # Verify clock on startup
-        offset, safe = self.time_service.check_system_clock()
+        # Verify clock on startup. A check that overran its deadline is treated
+        # like every NTP server failing to respond.
+        clock = init.results["clock"]
+        if clock.status == OK:
+            _, safe = clock.value
+        elif clock.status == TIMED_OUT:
+            safe = not self.time_service.strict_time_check
+        else:
+            safe = False
         if not safe:
             logger.error("System clock is unreliable! Aborting startup.")
             raise SystemExit("Unreliable system clock")
+
+        # Restore only after the clock check: checkpoint staleness uses wall time.
+        self.restore_checkpoint()
+
+    def _checkpoint_state(self):
+        return {
+            "local_date": self.time_service.get_local_time().date(),
+            "cooldown_until": self.cooldown_until,
+            "low_power_count": self.low_power_count,
+            "main_heater_slots": self.main_heater_slots,
+            "second_heater_slots": self.second_heater_slots,
+            "last_rate_check": self.scheduler.last_rate_check,
+            "tomorrow_scheduled": self.scheduler.tomorrow_scheduled,
+            "rolling_history": list(self.scheduler.rolling_history.values()),
+            "heater_state": {
+                key: dict(self.system_state[key]) for key in ("peak_heater", "off_peak_heater")
+            },
+            "display": {
+                key: self.system_state.get(key)
+                for key in ("rates", "schedule", "schedule_writes", "next_schedule_update")
+            },
+            "heat_demand": {
+                "estimate_hours": self.heat_demand.estimate_hours,
+                "days_observed": self.heat_demand.days_observed,
+                "observed_days": self.heat_demand.observed_days,
+                "cooldown_days": self.heat_demand.cooldown_days,
+                "failed_measurement": self.heat_demand.failed_measurement,
+                "window_estimates": self.heat_demand.window_estimates,
+                "window_days_observed": self.heat_demand.window_days_observed,
+            },
+        }
+
+    def save_checkpoint(self):
+        if self.checkpoint:
+            self.checkpoint.save(self._checkpoint_state())
+
+    def restore_checkpoint(self):
+        """
+        Resume from the last checkpoint when it is recent enough.
+
+        Returns True when the schedule was restored, so run() can control
+        straight away and leave the health check and rate fetch until after.
+        """
+        if not self.checkpoint:
+            return False
+
+        loaded = self.checkpoint.load(self.CHECKPOINT_RETENTION_SECONDS)
+        if loaded is None:
+            return False
+        state, age_seconds = loaded
+        now = self.time_service.now()
+
+        try:
+            demand = state["heat_demand"]
+            failed_measurement = demand.get("failed_measurement")
+            # Parse every field before assigning any, so a malformed checkpoint
+            # leaves the model as it was.
+            learned = {
+                "estimate_hours": demand["estimate_hours"],
+                "days_observed": int(demand["days_observed"]),
+                "observed_days": set(demand["observed_days"]),
+                "cooldown_days": set(demand["cooldown_days"]),
+                "failed_measurement": tuple(failed_measurement) if failed_measurement else None,
+                "window_estimates": dict(demand.get("window_estimates") or {}),
+                "window_days_observed": int(demand.get("window_days_observed") or 0),
+            }
+            for name, value in learned.items():
+                setattr(self.heat_demand, name, value)
+
+            if age_seconds > Config.CHECKPOINT_MAX_AGE_MINUTES * 60:
+                logger.info(f"Checkpoint is {age_seconds / 60:.0f} min old; fetching a fresh schedule.")
+                return False
+
+            main_slots = list(state["main_heater_slots"])
+            second_slots = list(state["second_heater_slots"])
+            rolling_history = {slot['valid_from']: slot for slot in state["rolling_history"]}
+            cooldown_until = state["cooldown_until"]
+            heater_state = state["heater_state"]
+            same_day = state["local_date"] == self.time_service.get_local_time().date()
+        except (KeyError, TypeError, ValueError) as e:
+            logger.error(f"Ignoring malformed controller checkpoint: {e}")
+            return False
+
+        self.main_heater_slots = main_slots
+        self.second_heater_slots = second_slots
+        self.scheduler.current_schedule = main_slots
+        self.scheduler.rolling_history = rolling_history
+        self.scheduler.last_rate_check = state.get("last_rate_check")
+        self.scheduler.tomorrow_scheduled = same_day and bool(state.get("tomorrow_scheduled"))
+        self.system_state.update(state.get("display") or {})
+
+        if cooldown_until and cooldown_until > now:
+            self.cooldown_until = cooldown_until
+        if age_seconds <= self.DEVICE_STATE_MAX_AGE_SECONDS:
+            self.low_power_count = int(state.get("low_power_count") or 0)
+            for key in ("peak_heater", "off_peak_heater"):
+                self.system_state[key].update(heater_state.get(key) or {})
+
+        self.resumed_from_checkpoint = True
+        logger.info(
+            f"Resumed from checkpoint saved {age_seconds:.0f}s ago: "
+            f"{len(main_slots)} off-peak and {len(second_slots)} peak slots"
+            + (f", cooldown until {self.cooldown_until.isoformat()}" if self.cooldown_until else "")
+        )
+        return True
 
     def should_update_schedule(self):
         """
@@ -89,6 +246,17 @@ class SmartWaterController:
         return should_check
 
     def update_schedule(self):
+        """Runs a schedule update unless one (e.g. a slow startup update) is already running."""
+        if not self._schedule_lock.acquire(blocking=False):
+            logger.info("Schedule update already in progress; skipping.")
+            return
+        try:
+            self._update_schedule()
+        finally:
+            self._schedule_lock.release()
+
+    @timed("update_schedule")
+    def _update_schedule(self):
         """
         Fetches rates and calculates heating slots using Smart Scheduler.
         Replaces the old fixed 3-Window Strategy with dynamic rate-based scheduling.
@@ -124,28 +292,60 @@ class SmartWaterController:
             logger.info("Tomorrow's rates are now available! Computing optimized schedule...")
             self.scheduler.mark_tomorrow_scheduled()
 
-        # Compute optimal slots using Smart Scheduler for today and tomorrow separately
-        today_slots = self.scheduler.compute_schedule_for_date(
-            target_date=today,
-            rates=rates,
-            budget_hours=Config.DAILY_HEATING_BUDGET_HOURS,
-            max_price=Config.ABSOLUTE_MAX_PRICE,
-            use_below_average=Config.USE_BELOW_AVERAGE,
-            blocked_hours=Config.BLOCKED_HOURS
-        )
-        
-        tomorrow_slots = []
-        if has_tomorrow:
-            tomorrow_slots = self.scheduler.compute_schedule_for_date(
-                target_date=tomorrow,
+        budget_hours = self._daily_budget_hours(today, now)
+        learned_minimums = self.heat_demand.window_slots(SCHEDULE_WINDOWS) if Config.HEAT_DEMAND_LEARNING else None
+
+        # The local today/tomorrow window bounds both the rolling horizon and the
+        # persisted schedule replacement below.
+        local_start = self.time_service.timezone.localize(datetime.combine(today, datetime.min.time()))
+        local_end = self.time_service.timezone.localize(datetime.combine(tomorrow + timedelta(days=1), datetime.min.time()))
+        replace_from = local_start.astimezone(timezone.utc)
+        replace_to = local_end.astimezone(timezone.utc)
+
+        rolling_slots = None
+        if Config.SCHEDULE_HORIZON == 'rolling':
+            rolling_slots = self.scheduler.compute_rolling_schedule(
+                now=now,
+                rates=rates,
+                horizon_end=replace_to,
+                budget_hours=budget_hours,
+                max_price=Config.ABSOLUTE_MAX_PRICE,
+                blocked_hours=Config.BLOCKED_HOURS,
+                max_gap_hours=Config.MAX_HOURS_BETWEEN_HEATS,
+            )
+
+        if rolling_slots is not None:
+            # Keep today's elapsed slots so the dashboard still shows them.
+            elapsed_slots = [
+                s for s in self.main_heater_slots
+                if s['valid_from'] >= replace_from and s['valid_to'] <= now
+            ]
+            self.main_heater_slots = elapsed_slots + rolling_slots
+        else:
+            # Compute optimal slots using Smart Scheduler for today and tomorrow separately
+            today_slots = self.scheduler.compute_schedule_for_date(
+                target_date=today,
                 rates=rates,
-                budget_hours=Config.DAILY_HEATING_BUDGET_HOURS,
+                budget_hours=budget_hours,
                 max_price=Config.ABSOLUTE_MAX_PRICE,
                 use_below_average=Config.USE_BELOW_AVERAGE,
-                blocked_hours=Config.BLOCKED_HOURS
+                blocked_hours=Config.BLOCKED_HOURS,
+                learned_minimums=learned_minimums,
             )
 
-        self.main_heater_slots = today_slots + tomorrow_slots
+            tomorrow_slots = []
+            if has_tomorrow:
+                tomorrow_slots = self.scheduler.compute_schedule_for_date(
+                    target_date=tomorrow,
+                    rates=rates,
+                    budget_hours=budget_hours,
+                    max_price=Config.ABSOLUTE_MAX_PRICE,
+                    use_below_average=Config.USE_BELOW_AVERAGE,
+                    blocked_hours=Config.BLOCKED_HOURS,
+                    learned_minimums=learned_minimums,
+                )
+
+            self.main_heater_slots = today_slots + tomorrow_slots
         self.scheduler.current_schedule = self.main_heater_slots
 
         # Peak Heater: Negative/free rate strategy (unchanged, uses future_rates)
@@ -155,23 +355,13 @@ class SmartWaterController:
 
         # Replace the complete local today/tomorrow window so stale green dots
         # cannot survive when a recomputation selects fewer (or zero) slots.
-        local_start = self.time_service.timezone.localize(datetime.combine(today, datetime.min.time()))
-        local_end = self.time_service.timezone.localize(datetime.combine(tomorrow + timedelta(days=1), datetime.min.time()))
-        replace_from = local_start.astimezone(timezone.utc)
-        replace_to = local_end.astimezone(timezone.utc)
-        off_peak_saved = self.schedule_storage.save_schedule(
-            self.main_heater_slots,
-            heater_type="off_peak",
-            replace_from=replace_from,
-            replace_to=replace_to,
-        )
-        peak_saved = self.schedule_storage.save_schedule(
-            self.second_heater_slots,
-            heater_type="peak",
+        # Both heater types are replaced in one transaction.
+        saved = self.schedule_storage.replace_schedules(
+            {"off_peak": self.main_heater_slots, "peak": self.second_heater_slots},
             replace_from=replace_from,
             replace_to=replace_to,
         )
-        if self.schedule_storage.enabled and not (off_peak_saved and peak_saved):
+        if self.schedule_storage.enabled and not saved:
             logger.error(
                 "Schedule persistence failed; the dashboard markers may not match "
                 "the controller's in-memory schedule."
@@ -179,8 +369,61 @@ class SmartWaterController:
 
         # Update UI state
         self.system_state["rates"] = rates
+        self.system_state["schedule_writes"] = dict(self.schedule_storage.stats)
         self.system_state["schedule"] = self.scheduler.get_schedule_for_display()
         self.system_state["next_schedule_update"] = self._get_next_schedule_check_time(now)
+
+    def _off_peak_meter_channel(self):
+        if Config.OFF_PEAK_HEATER_TARGET == 'main':
+            return Config.SHELLY_CHANNEL_MAIN
+        return Config.SHELLY_CHANNEL_SECOND
+
+    def _daily_budget_hours(self, today, now):
+        """
+        Returns the daily heating budget, learned from yesterday's metered
+        energy when HEAT_DEMAND_LEARNING is enabled.
+        """
+        if not Config.HEAT_DEMAND_LEARNING:
+            return Config.DAILY_HEATING_BUDGET_HOURS
+
+        yesterday = today - timedelta(days=1)
+        if self.heat_demand.should_measure(yesterday, now):
+            day_start = self.time_service.timezone.localize(datetime.combine(yesterday, datetime.min.time()))
+            day_end = self.time_service.timezone.localize(datetime.combine(today, datetime.min.time()))
+            absorbed_kwh = self.energy_reader.energy_kwh(day_start.astimezone(timezone.utc), day_end.astimezone(timezone.utc))
+            if absorbed_kwh is None:
+                self.heat_demand.record_measure_failure(yesterday, now)
+            else:
+                # Yesterday's slots are still in memory until this update replaces them.
+                yesterday_slots = [
+                    s for s in self.main_heater_slots
+                    if day_start <= s['valid_from'] < day_end
+                ]
+                scheduled_hours = len(yesterday_slots) / 2 if yesterday_slots else None
+                self.heat_demand.observe_day(yesterday, absorbed_kwh, scheduled_hours)
+                self.heat_demand.observe_windows(yesterday, self._window_energy(yesterday, yesterday_slots))
+
+        budget_hours = self.heat_demand.budget_hours()
+        if budget_hours != Config.DAILY_HEATING_BUDGET_HOURS:
+            logger.info(f"Learned daily budget: {budget_hours}h (configured {Config.DAILY_HEATING_BUDGET_HOURS}h)")
+        return budget_hours
+
+    def _window_energy(self, day, day_slots):
+        """Metered kWh and scheduled hours in each schedule window of a past local day."""
+        windows = {}
+        for name, (start_hour, start_minute), (end_hour, end_minute), _ in SCHEDULE_WINDOWS:
+            window_start = self.time_service.timezone.localize(
+                datetime.combine(day, datetime.min.time()).replace(hour=start_hour, minute=start_minute)
+            )
+            window_end = self.time_service.timezone.localize(
+                datetime.combine(day, datetime.min.time()).replace(hour=end_hour, minute=end_minute)
+            )
+            scheduled = [s for s in day_slots if window_start <= s['valid_from'] < window_end]
+            if not scheduled:
+                continue
+            absorbed_kwh = self.energy_reader.energy_kwh(window_start.astimezone(timezone.utc), window_end.astimezone(timezone.utc))
+            windows[name] = (absorbed_kwh, len(scheduled) / 2)
+        return windows
 
     def _get_next_schedule_check_time(self, now):
         """Calculate when the next schedule check will occur."""
@@ -198,6 +441,7 @@ class SmartWaterController:
                 return True, slot
         return False, None
 
+    @timed("control_loop")
     def control_loop(self):
         """Main check logic."""
         now_utc = self.time_service.now()
@@ -250,18 +494,19 @@ class SmartWaterController:
                         self.low_power_count = 0
                     elif power < self.LOW_POWER_THRESHOLD:
                         self.low_power_count += 1
-                        logger.debug(f"Low power reading {self.low_power_count}/{self.LOW_POWER_READINGS_REQUIRED} ({power}W)")
+                        logger.debug("Low power reading %s/%s (%sW)", self.low_power_count, self.LOW_POWER_READINGS_REQUIRED, power)
 
                         if self.low_power_count >= self.LOW_POWER_READINGS_REQUIRED:
                             # Confirmed tank is full after multiple consecutive low readings
                             logger.info(f"📉 Tank Full Confirmed ({self.low_power_count} consecutive readings < {self.LOW_POWER_THRESHOLD}W). Triggering Smart Cooldown.")
                             self.cooldown_until = now_utc + timedelta(minutes=90)
+                            self.heat_demand.record_cooldown(now_utc.astimezone(self.time_service.timezone).date())
                             active_offpeak = False
                             self.low_power_count = 0  # Reset counter
                     else:
                         # Power is normal (heater actively drawing), reset counter
                         if self.low_power_count > 0:
-                            logger.debug(f"Power restored ({power}W). Resetting low power counter.")
+                            logger.debug("Power restored (%sW). Resetting low power counter.", power)
                         self.low_power_count = 0
                 else:
                     logger.warning("Failed to read power. Cannot verify Tank Full status.")
@@ -321,7 +566,10 @@ class SmartWaterController:
             if not target_state and self.cooldown_until:
                 reason = "Smart Cooldown Active"
 
-            logger.info(f"{action} {device_name} via Shelly relay channel {channel} ({reason})")
+            logger.info(
+                "%s %s via Shelly relay channel %s (%s)", action, device_name, channel, reason,
+                extra={"heater": key, "device": "shelly", "channel": channel, "slot": slot_info and slot_info['valid_from']},
+            )
 
             if not self.dry_run:
                 result = self.shelly.set_relay(
@@ -368,7 +616,10 @@ class SmartWaterController:
             if not target_state and self.cooldown_until:
                 reason = "Smart Cooldown Active"
                 
-            logger.info(f"{action} {device_name} ({reason})")
+            logger.info(
+                "%s %s (%s)", action, device_name, reason,
+                extra={"heater": key, "device": device_id, "slot": slot_info and slot_info['valid_from']},
+            )
             
             if not self.dry_run:
                 # Send the actual command
@@ -397,6 +648,7 @@ class SmartWaterController:
             else:
                 logger.info("[DRY RUN] Command skipped.")
 
+    @timed("health_check")
     def perform_health_check(self):
         """Checks and prints the health status of all devices."""
         logger.info("--- PERFORMING DEVICE HEALTH CHECK ---")
@@ -477,16 +729,66 @@ class SmartWaterController:
             "schedule": {
                 "main": self.main_heater_slots,
                 "second": self.second_heater_slots
-            }
+            },
+            "timings": timings.summary(),
         }
 
+    def _log_first_control(self):
+        if self._first_control_at is None:
+            self._first_control_at = time.monotonic()
+            logger.info(f"First control pass {self._first_control_at - self._started_at:.2f}s after startup")
+
+    def publish_state(self):
+        """Swap in a fresh snapshot for the local status API."""
+        try:
+            state = self.get_state()
+            # Timings change every pass; keeping them out of the ETag lets
+            # long-polls and event streams wait for a real state change.
+            stage_timings = state.pop("timings")
+            self.status_snapshot.publish(state, unversioned={"timings": stage_timings})
+        except Exception as e:
+            logger.error(f"Failed to publish status snapshot: {e}")
+
     def run(self):
+        import schedule  # only the long-running service needs the job scheduler
+        from services.startup import StartupOrchestrator
+        from services.status_server import StatusServer
+
+        if Config.TIMING_TRACE_FILE:
+            timings.open_trace(Config.TIMING_TRACE_FILE)
+
         # 1. Verification on startup
-        self.perform_health_check()
-        self.update_schedule()
+        # The health check and schedule update share the schedule, system state
+        # and device clients with control_loop, so the loop waits for both. A
+        # schedule update past its deadline keeps running; update_schedule's
+        # lock stops the loop from starting a second one meanwhile.
+        startup = StartupOrchestrator("startup")
+        if self.resumed_from_checkpoint:
+            # Switch from the restored schedule first, then refresh it.
+            self.control_loop()
+            self._log_first_control()
+            self.save_checkpoint()
+            self.publish_state()
+            startup.add("health_check", self.perform_health_check)
+            if self.should_update_schedule():
+                startup.add("schedule", self.update_schedule, deadline=self.STARTUP_SCHEDULE_DEADLINE_SECONDS)
+        else:
+            startup.add("health_check", self.perform_health_check)
+            startup.add("schedule", self.update_schedule, deadline=self.STARTUP_SCHEDULE_DEADLINE_SECONDS)
+        startup.run()
+        self.publish_state()
+
+        if Config.STATUS_API_ENABLED:
+            try:
+                self.status_server = StatusServer(self.status_snapshot, Config.STATUS_API_HOST, Config.STATUS_API_PORT)
+                self.status_server.start()
+            except OSError as e:
+                logger.error(f"Status API failed to start on {Config.STATUS_API_HOST}:{Config.STATUS_API_PORT}: {e}")
+                self.status_server = None
 
         # Health check every hour (keep this on fixed schedule)
         schedule.every(1).hours.do(self.perform_health_check)
+        schedule.every(Config.TIMING_SUMMARY_MINUTES).minutes.do(timings.log_summary)
 
         logger.info("Starting Control Loop (Press Ctrl+C to stop)")
         logger.info(f"Smart Scheduler Config: Budget={Config.DAILY_HEATING_BUDGET_HOURS}h, MaxPrice={Config.ABSOLUTE_MAX_PRICE}p, BelowAvg={Config.USE_BELOW_AVERAGE}")
@@ -508,6 +810,7 @@ class SmartWaterController:
 
         try:
             while True:
+                pass_started = time.monotonic()
                 try:
                     schedule.run_pending()
 
@@ -516,15 +819,29 @@ class SmartWaterController:
                         self.update_schedule()
 
                     self.control_loop()
+                    self._log_first_control()
+                    self.save_checkpoint()
+                    self.publish_state()
                 except Exception as e:
                     logger.error(f"CRITICAL ERROR in control loop: {e}", exc_info=True)
                     time.sleep(5)
+
+                elapsed = time.monotonic() - pass_started
+                if elapsed > 60:
+                    logger.warning(f"Loop pass took {elapsed:.1f}s, over the 60s interval")
+                    timings.log_summary()
 
                 time.sleep(60)  # Check every minute
         except KeyboardInterrupt:
             logger.info("Stopping...")
+        finally:
+            if self.status_server:
+                self.status_server.stop()
+            timings.close_trace()
 
 if __name__ == "__main__":
+    # Logging I/O runs on a background listener; smart_water.log rotates by size.
+    configure_logging("smart_water.log")
     if Config.DRY_RUN:
         logger.warning("Starting Service in DRY RUN mode. Heater commands will be logged but not sent.")
     else:
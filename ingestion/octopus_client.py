@@ -1,9 +1,8 @@
 import requests
 from datetime import datetime, timedelta
 import logging
+from services.timing import timed
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 class OctopusClient:
@@ -13,6 +12,7 @@ class OctopusClient:
         self.product_code = product_code
         self.region_code = region_code
 
+    @timed("octopus.rates")
     def get_rates(self, period_from=None, period_to=None):
         """
         Fetch rates for the specified period.
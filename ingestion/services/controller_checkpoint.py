@@ -0,0 +1,160 @@
+"""Persist controller state across restarts.
+
+A Railway redeploy or crash restart used to begin from nothing: no schedule,
+no Smart Cooldown, no cached relay state, so the controller fetched rates and
+polled every device before it could switch anything. The controller now saves
+a checkpoint after each control-loop pass and restores it on startup.
+
+The checkpoint is one row in a small SQLite database. The row is replaced with
+a single upsert, so a process killed mid-write leaves the previous checkpoint
+intact. Datetimes and dates are tagged in the JSON payload so they come back
+as the same types the controller saved.
+"""
+
+import json
+import logging
+import sqlite3
+import tempfile
+import time
+from datetime import date, datetime
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_FORMAT_VERSION = 1
+# Tolerated wall-clock difference before a checkpoint "from the future" is
+# treated as evidence the clock moved backwards.
+CLOCK_SKEW_TOLERANCE_SECONDS = 60.0
+DEFAULT_CHECKPOINT_PATH = str(Path(tempfile.gettempdir()) / "gwhfi-controller-checkpoint.sqlite3")
+
+
+def _decode(obj):
+    if len(obj) == 1:
+        if "$datetime" in obj:
+            return datetime.fromisoformat(obj["$datetime"])
+        if "$date" in obj:
+            return date.fromisoformat(obj["$date"])
+    return obj
+
+
+def _tag(value):
+    # json.dumps would call default() too late: datetime subclasses date, and
+    # sets must become lists before nested values are tagged.
+    if isinstance(value, datetime):
+        return {"$datetime": value.isoformat()}
+    if isinstance(value, date):
+        return {"$date": value.isoformat()}
+    if isinstance(value, dict):
+        return {key: _tag(item) for key, item in value.items()}
+    if isinstance(value, (set, frozenset)):
+        return [_tag(item) for item in sorted(value)]
+    if isinstance(value, (list, tuple)):
+        return [_tag(item) for item in value]
+    return value
+
+
+class ControllerCheckpoint:
+    """Save and restore one named checkpoint row."""
+
+    def __init__(self, path=None, *, name="smart-water-controller", clock=None):
+        self.path = str(path or DEFAULT_CHECKPOINT_PATH)
+        self.name = name
+        self._clock = clock or time.time
+        self.enabled = True
+
+        try:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            connection = self._connect()
+            try:
+                connection.execute(
+                    """
+                    create table if not exists controller_checkpoint (
+                        name text primary key,
+                        format_version integer not null,
+                        saved_at real not null,
+                        payload text not null
+                    )
+                    """
+                )
+            finally:
+                connection.close()
+        except (OSError, sqlite3.Error) as e:
+            logger.error(f"Controller checkpoint unavailable at {self.path}: {e}")
+            self.enabled = False
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+
+    def save(self, state):
+        """Replace the checkpoint with state. Returns True on success."""
+        if not self.enabled:
+            return False
+
+        try:
+            payload = json.dumps(_tag(state), separators=(",", ":"))
+            connection = self._connect()
+            try:
+                connection.execute(
+                    """
+                    insert into controller_checkpoint (name, format_version, saved_at, payload)
+                    values (?, ?, ?, ?)
+                    on conflict (name) do update
+                    set format_version = excluded.format_version,
+                        saved_at = excluded.saved_at,
+                        payload = excluded.payload
+                    """,
+                    (self.name, CHECKPOINT_FORMAT_VERSION, self._clock(), payload),
+                )
+            finally:
+                connection.close()
+            return True
+        except (TypeError, ValueError, sqlite3.Error) as e:
+            logger.error(f"Failed to save controller checkpoint: {e}")
+            return False
+
+    def load(self, max_age_seconds):
+        """
+        Returns (state, age_seconds) for a usable checkpoint, or None.
+
+        A checkpoint is unusable when it is missing, unreadable, written by a
+        different format version, older than max_age_seconds, or dated in the
+        future (the wall clock moved backwards since it was saved).
+        """
+        if not self.enabled:
+            return None
+
+        try:
+            connection = self._connect()
+            try:
+                row = connection.execute(
+                    "select format_version, saved_at, payload from controller_checkpoint where name = ?",
+                    (self.name,),
+                ).fetchone()
+            finally:
+                connection.close()
+        except sqlite3.Error as e:
+            logger.error(f"Failed to read controller checkpoint: {e}")
+            return None
+
+        if row is None:
+            return None
+
+        format_version, saved_at, payload = row
+        if format_version != CHECKPOINT_FORMAT_VERSION:
+            logger.warning(f"Ignoring controller checkpoint format {format_version}")
+            return None
+
+        age_seconds = self._clock() - float(saved_at)
+        if age_seconds < -CLOCK_SKEW_TOLERANCE_SECONDS:
+            logger.warning("Ignoring controller checkpoint dated in the future; the clock moved backwards.")
+            return None
+        if age_seconds > max_age_seconds:
+            logger.info(f"Ignoring controller checkpoint saved {age_seconds / 60:.0f} min ago (stale).")
+            return None
+
+        try:
+            state = json.loads(payload, object_hook=_decode)
+        except ValueError as e:
+            logger.error(f"Ignoring unreadable controller checkpoint: {e}")
+            return None
+        return state, max(0.0, age_seconds)
@@ -0,0 +1,234 @@
+"""
+Heat Demand Model
+
+Learns how many hours of element heating the off-peak tank actually absorbs
+per day, so the scheduler stops buying slots where the thermostat is already
+open. Each completed day contributes one observation:
+
+- absorbed energy, from the meter's cumulative energy_total_wh counter in
+  energy_readings (first and last reading of the local day), and
+- whether the tank filled before the schedule ran out, either because Smart
+  Cooldown triggered or because the element drew well under the scheduled
+  hours.
+
+A day on which the tank filled measures demand directly. A day on which every
+scheduled slot drew power only bounds demand from below, so the target is
+nudged up by PROBE_HOURS to keep probing for the true figure.
+
+Each schedule window (morning, afternoon, evening) is learned the same way
+from the counter over the window and the slots scheduled in it. The learned
+hours lower that window's minimum (window_slots); they never raise it above
+the configured minimum, and the daily budget still tops the day up. A day whose
+energy cannot be measured (no counter rows, Supabase unreachable) is retried
+at most once per MEASURE_RETRY rather than on every schedule update.
+"""
+
+import os
+import math
+import logging
+from datetime import timedelta
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+
+class HeatDemandModel:
+    """Exponentially smoothed estimates of the heating hours actually absorbed, per day and per window."""
+
+    PROBE_HOURS = 0.5
+    # Drawing less than this share of the scheduled hours means the thermostat opened.
+    SATURATION_RATIO = 0.9
+    MEASURE_RETRY = timedelta(hours=1)
+
+    def __init__(self, heater_kw, default_hours, min_hours, max_hours, smoothing=0.3, headroom=0.15, min_days=3):
+        self.heater_kw = heater_kw
+        self.default_hours = default_hours
+        self.min_hours = min_hours
+        self.max_hours = max_hours
+        self.smoothing = smoothing
+        self.headroom = headroom
+        self.min_days = min_days
+
+        self.estimate_hours = None
+        self.days_observed = 0
+        self.observed_days = set()
+        self.cooldown_days = set()
+        # (day, attempted_at) of the last day whose energy could not be measured.
+        self.failed_measurement = None
+        # Smoothed hours absorbed per schedule window name, and days folded in.
+        self.window_estimates = {}
+        self.window_days_observed = 0
+
+    def record_cooldown(self, day):
+        """Mark a local day on which Smart Cooldown confirmed the tank was full."""
+        self.cooldown_days.add(day)
+
+    def should_measure(self, day, now):
+        """Whether a day still needs observing and is not waiting to retry a failed measurement."""
+        if day in self.observed_days:
+            return False
+        if self.failed_measurement is None:
+            return True
+        failed_day, attempted_at = self.failed_measurement
+        return failed_day != day or now - attempted_at >= self.MEASURE_RETRY
+
+    def record_measure_failure(self, day, now):
+        """Remember that a day's energy could not be measured, so it is retried later."""
+        self.failed_measurement = (day, now)
+
+    def observe_day(self, day, absorbed_kwh, scheduled_hours=None):
+        """
+        Fold one completed local day into the estimate.
+
+        Args:
+            day: Local date the energy was measured over
+            absorbed_kwh: Element energy drawn over the day
+            scheduled_hours: Hours the scheduler selected for the day, if known
+        """
+        if day in self.observed_days:
+            return
+
+        absorbed_hours = absorbed_kwh / self.heater_kw
+        saturated = day in self.cooldown_days or self._saturated(absorbed_hours, scheduled_hours)
+        target = absorbed_hours if saturated else absorbed_hours + self.PROBE_HOURS
+        self.estimate_hours = self._smoothed(self.estimate_hours, target)
+
+        self.days_observed += 1
+        self.observed_days.add(day)
+        self.cooldown_days.discard(day)
+        logger.info(
+            f"Heat demand {day}: absorbed {absorbed_hours:.2f}h "
+            f"({'tank filled' if saturated else 'tank not filled'}), estimate {self.estimate_hours:.2f}h"
+        )
+
+    def observe_windows(self, day, windows):
+        """
+        Fold one completed local day's schedule windows into their estimates.
+
+        Args:
+            day: Local date the windows belong to
+            windows: {window name: (absorbed kWh, scheduled hours)}; windows
+                with no scheduled slots or no measurement are skipped, since
+                they say nothing about demand
+        """
+        observed = False
+        for name, (absorbed_kwh, scheduled_hours) in windows.items():
+            if absorbed_kwh is None or not scheduled_hours:
+                continue
+            absorbed_hours = absorbed_kwh / self.heater_kw
+            saturated = self._saturated(absorbed_hours, scheduled_hours)
+            target = absorbed_hours if saturated else absorbed_hours + self.PROBE_HOURS
+            self.window_estimates[name] = self._smoothed(self.window_estimates.get(name), target)
+            observed = True
+
+        if observed:
+            self.window_days_observed += 1
+            logger.info(
+                f"Heat demand {day} by window: "
+                + ", ".join(f"{name} {hours:.2f}h" for name, hours in self.window_estimates.items())
+            )
+
+    def window_slots(self, windows):
+        """
+        Learned minimum slots for each (name, start, end, minimum) window, or None.
+
+        None until min_days days have been observed. A window keeps at least one
+        slot and never more than its configured minimum; one without an
+        estimate keeps the configured minimum.
+        """
+        if self.window_days_observed < self.min_days:
+            return None
+
+        slots = []
+        for name, _, _, minimum in windows:
+            hours = self.window_estimates.get(name)
+            if hours is None:
+                slots.append(minimum)
+            else:
+                slots.append(max(1, min(minimum, math.ceil(hours * (1 + self.headroom) * 2))))
+        return slots
+
+    def _saturated(self, absorbed_hours, scheduled_hours):
+        return scheduled_hours is not None and absorbed_hours < scheduled_hours * self.SATURATION_RATIO
+
+    def _smoothed(self, estimate, target):
+        if estimate is None:
+            return target
+        return estimate + self.smoothing * (target - estimate)
+
+    def budget_hours(self):
+        """Daily budget in whole half-hour slots, or the configured default until enough days are observed."""
+        if self.estimate_hours is None or self.days_observed < self.min_days:
+            return self.default_hours
+
+        hours = math.ceil(self.estimate_hours * (1 + self.headroom) * 2) / 2
+        return max(self.min_hours, min(self.max_hours, hours))
+
+
+class EnergyCounterReader:
+    """
+    Reads element energy for a time window from energy_readings in Supabase.
+    """
+
+    def __init__(self, device_id, channel):
+        self.device_id = device_id
+        self.channel = channel
+        self.supabase_url = os.getenv("SUPABASE_URL")
+        self.supabase_key = os.getenv("SUPABASE_KEY")
+
+        if not self.supabase_url or not self.supabase_key or not device_id:
+            logger.warning("Supabase or meter configuration missing. Heat demand learning disabled.")
+            self.enabled = False
+        else:
+            self.enabled = True
+            self.headers = {
+                "apikey": self.supabase_key,
+                "Authorization": f"Bearer {self.supabase_key}",
+            }
+
+    def _counter_at_edge(self, from_time, to_time, order):
+        params = [
+            "select=energy_total_wh",
+            f"device_id=eq.{self.device_id}",
+            f"channel=eq.{self.channel}",
+            "energy_total_wh=not.is.null",
+            f"created_at=gte.{from_time.isoformat().replace('+00:00', 'Z')}",
+            f"created_at=lt.{to_time.isoformat().replace('+00:00', 'Z')}",
+            f"order=created_at.{order}",
+            "limit=1",
+        ]
+        response = requests.get(
+            f"{self.supabase_url}/rest/v1/energy_readings?{'&'.join(params)}",
+            headers=self.headers,
+            timeout=15,
+        )
+        if response.status_code != 200:
+            logger.error(f"Failed to fetch energy readings: {response.status_code} - {response.text}")
+            return None
+        rows = response.json()
+        return float(rows[0]["energy_total_wh"]) if rows else None
+
+    def energy_kwh(self, from_time, to_time):
+        """
+        Returns kWh drawn between from_time and to_time, or None when it cannot be measured.
+
+        Only the first and last counter readings are fetched. A counter that went
+        backwards (meter reboot) makes the window unmeasurable rather than zero.
+        """
+        if not self.enabled:
+            return None
+
+        try:
+            first = self._counter_at_edge(from_time, to_time, "asc")
+            last = self._counter_at_edge(from_time, to_time, "desc")
+        except Exception as e:
+            logger.error(f"Error fetching energy readings from Supabase: {e}")
+            return None
+
+        if first is None or last is None:
+            return None
+        if last < first:
+            logger.warning("Energy counter went backwards (meter reset); skipping heat demand observation.")
+            return None
+        return (last - first) / 1000.0
@@ -0,0 +1,97 @@
+"""
+Process-wide logging for the controller and the telemetry collector.
+
+Callers on the control and polling threads only put records on an in-memory
+queue; a QueueListener thread formats them and does the file and console I/O.
+The log file rotates by size instead of growing without bound.
+
+LOG_FORMAT=json writes one JSON object per line, including any structured
+fields passed with extra= (poll_id, device, heater, channel, slot).
+"""
+
+import atexit
+import json
+import logging
+import os
+import queue
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+STRUCTURED_FIELDS = ("poll_id", "device", "heater", "channel", "slot")
+TEXT_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record."""
+
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for field in STRUCTURED_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class _DeferredQueueHandler(QueueHandler):
+    # QueueHandler.prepare() formats the message on the calling thread so the
+    # record can cross a process boundary. This queue never leaves the process,
+    # so leave %-formatting and traceback rendering to the listener.
+    def prepare(self, record):
+        return record
+
+
+class _Listener(QueueListener):
+    def stop(self):
+        # Safe to call twice: once by the caller and again at interpreter exit.
+        if self._thread is not None:
+            super().stop()
+
+
+def configure_logging(log_file, *, level=None, log_format=None, max_bytes=None, backup_count=None):
+    """
+    Route the root logger through a background queue listener.
+
+    Replaces any handlers already on the root logger (modules that call
+    logging.basicConfig at import time would otherwise win). Settings default
+    to LOG_LEVEL, LOG_FORMAT, LOG_MAX_BYTES and LOG_BACKUP_COUNT.
+
+    Returns the started QueueListener; it is stopped (and flushed) at exit.
+    """
+    level = level or os.getenv("LOG_LEVEL", "INFO").upper()
+    log_format = (log_format or os.getenv("LOG_FORMAT", "text")).lower()
+    try:
+        max_bytes = int(max_bytes if max_bytes is not None else os.getenv("LOG_MAX_BYTES", 10_000_000))
+    except ValueError:
+        max_bytes = 10_000_000
+    try:
+        backup_count = int(backup_count if backup_count is not None else os.getenv("LOG_BACKUP_COUNT", 5))
+    except ValueError:
+        backup_count = 5
+
+    formatter = JsonFormatter() if log_format == "json" else logging.Formatter(TEXT_FORMAT)
+    file_handler = RotatingFileHandler(log_file, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8")
+    stream_handler = logging.StreamHandler()
+    for handler in (file_handler, stream_handler):
+        handler.setFormatter(formatter)
+
+    records = queue.SimpleQueue()
+    listener = _Listener(records, file_handler, stream_handler, respect_handler_level=True)
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+        handler.close()
+    root.addHandler(_DeferredQueueHandler(records))
+    root.setLevel(level if isinstance(logging.getLevelName(level), int) else logging.INFO)
+
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
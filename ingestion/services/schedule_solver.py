@@ -0,0 +1,389 @@
+"""
+Schedule Solvers for the Smart Scheduler
+
+A solver receives the slots of one household day that already passed the hard
+price limit and blocked-hour filters, and decides which of them to heat:
+
+- ``greedy``: the original window heuristics. Morning, afternoon and evening
+  minimums are filled one window at a time, then the cheapest remaining slots
+  below the strict threshold top up the budget.
+- ``optimal``: a dynamic program over the day's half-hour slots that minimises
+  total cost subject to the same window minimums and budget, plus a cap on
+  heater starts (separate contiguous heating runs).
+- ``RollingHorizonSolver``: a dynamic program over every known future slot
+  (up to 48 h) with a cap on the hours between heats instead of day windows.
+
+The optimal solver caps the window minimums by the daily budget: a budget
+smaller than their sum scales them down (see window_minimums), so a smaller
+budget buys fewer slots. The greedy baseline keeps the fixed minimums unless
+it is built with scale_minimums (SCALE_WINDOW_MINIMUMS). The day solvers
+return the selected slots; the scheduler sorts and logs them.
+"""
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+# (name, (start hour, minute), (end hour, minute), minimum slots) in local time.
+# The day solvers see one local day at a time, so a window must not cross
+# midnight: window_index never matches one whose end is before its start.
+SCHEDULE_WINDOWS = (
+    ("morning", (0, 0), (6, 0), 4),  # 2 Hours for Morning Ready
+    ("afternoon", (14, 0), (16, 0), 2),  # 1 Hour
+    ("evening", (19, 0), (23, 30), 2),  # 1 Hour for Evening Boost
+)
+
+# Every window keeps at least one slot, so no budget schedules fewer than this.
+MIN_BUDGET_SLOTS = len(SCHEDULE_WINDOWS)
+
+
+def window_minimums(total_slots_needed):
+    """
+    Return the minimum slots for each SCHEDULE_WINDOWS entry under a daily budget.
+
+    The configured minimums apply in full once the budget covers their sum. A
+    smaller budget is shared between the windows in proportion to them
+    (largest remainder, earlier windows first on ties), keeping at least one
+    slot per window.
+    """
+    minimums = [window[3] for window in SCHEDULE_WINDOWS]
+    total = sum(minimums)
+    if total_slots_needed >= total:
+        return minimums
+
+    budget = max(total_slots_needed, MIN_BUDGET_SLOTS)
+    shares = [minimum * budget / total for minimum in minimums]
+    scaled = [max(1, int(share)) for share in shares]
+    by_remainder = sorted(range(len(shares)), key=lambda index: -(shares[index] - int(shares[index])))
+    for index in by_remainder[:max(0, budget - sum(scaled))]:
+        scaled[index] += 1
+    return scaled
+
+
+def window_index(slot_time):
+    """Return the index of the SCHEDULE_WINDOWS entry containing a local slot start."""
+    start = (slot_time.hour, slot_time.minute)
+    for index, (_, window_start, window_end, _) in enumerate(SCHEDULE_WINDOWS):
+        if window_start <= start < window_end:
+            return index
+    return None
+
+
+class GreedyWindowSolver:
+    """
+    Baseline strategy: fill each fixed window greedily, then the cheapest rest.
+
+    With scale_minimums the window minimums come from window_minimums, so a
+    budget below their sum buys fewer slots; by default they stay fixed.
+    Learned minimums (see HeatDemandModel.window_slots) can only lower them.
+    """
+
+    name = "greedy"
+    MORNING_SLOTS_NEEDED = SCHEDULE_WINDOWS[0][3]
+    AFTERNOON_SLOTS_NEEDED = SCHEDULE_WINDOWS[1][3]
+    EVENING_SLOTS_NEEDED = SCHEDULE_WINDOWS[2][3]
+
+    def __init__(self, scale_minimums=False):
+        self.scale_minimums = scale_minimums
+
+    def select(self, eligible, local_time, total_slots_needed, strict_threshold, learned_minimums=None):
+        """
+        Select heating slots from one day's eligible slots.
+
+        Args:
+            eligible: Chronological rate slots under the hard limit and outside blocked hours
+            local_time: Callable returning a slot's local (date, hour, minute)
+            total_slots_needed: Daily budget in 30-minute slots
+            strict_threshold: Price cap for slots that are not needed by a window minimum
+            learned_minimums: Optional per-window slot caps, in SCHEDULE_WINDOWS order
+
+        Returns:
+            List of selected slots (unsorted)
+        """
+        if self.scale_minimums:
+            morning_needed, afternoon_needed, evening_needed = window_minimums(total_slots_needed)
+        else:
+            morning_needed = self.MORNING_SLOTS_NEEDED
+            afternoon_needed = self.AFTERNOON_SLOTS_NEEDED
+            evening_needed = self.EVENING_SLOTS_NEEDED
+        if learned_minimums is not None:
+            morning_needed, afternoon_needed, evening_needed = (
+                min(needed, learned)
+                for needed, learned in zip((morning_needed, afternoon_needed, evening_needed), learned_minimums)
+            )
+
+        # --- STEP 1: Morning Ready (00:00 - 06:00) ---
+        # Select cheapest overnight slots, with tiebreaker preferring
+        # slots CLOSER to morning (later hour wins) so the tank stays
+        # hot until wake-up.
+        morning_candidates = [s for s in eligible if 0 <= local_time(s).hour < 6]
+
+        # Sort by price first, then by hour DESCENDING (later = closer to morning)
+        # so that among equally-priced slots, later ones are preferred.
+        morning_candidates.sort(key=lambda s: (s['value_inc_vat'], -local_time(s).hour))
+        selected_morning = morning_candidates[:morning_needed]
+
+        if not selected_morning and morning_candidates:
+            logger.warning("No eligible morning slots found within price limits.")
+        elif not morning_candidates:
+            logger.info("No morning rate data available (00:00-06:00).")
+
+        # If not enough cheap morning slots were found, fill with the
+        # LATEST available morning slots regardless of strict threshold
+        # (still respecting hard limit) so the tank is heated before wake-up.
+        if len(selected_morning) < morning_needed:
+            shortfall = morning_needed - len(selected_morning)
+            selected_morning_ids = {s['valid_from'] for s in selected_morning}
+            # Fallback: pick latest available morning slots under hard limit
+            fallback_morning = [
+                s for s in eligible
+                if 0 <= local_time(s).hour < 6
+                and s['valid_from'] not in selected_morning_ids
+            ]
+            # Prefer latest slots (closest to wakeup)
+            fallback_morning.sort(key=lambda s: -local_time(s).hour)
+            selected_morning.extend(fallback_morning[:shortfall])
+            if fallback_morning[:shortfall]:
+                logger.info(f"Morning fallback: added {len(fallback_morning[:shortfall])} later slots to ensure hot water.")
+
+        # --- STEP 2: Secure Afternoon Boost (14:00 - 16:00) ---
+        selected_morning_ids = {s['valid_from'] for s in selected_morning}
+        afternoon_candidates = [
+            s for s in eligible
+            if 14 <= local_time(s).hour < 16 and s['valid_from'] not in selected_morning_ids
+        ]
+
+        afternoon_candidates.sort(key=lambda s: s['value_inc_vat'])
+        selected_afternoon = afternoon_candidates[:afternoon_needed]
+
+        # --- STEP 3: Secure Evening Boost (19:00 - 23:30) ---
+        already_selected_ids = {s['valid_from'] for s in selected_morning + selected_afternoon}
+        evening_candidates = []
+        for slot in eligible:
+            slot_time = local_time(slot)
+            h = slot_time.hour
+            m = slot_time.minute
+            if (19 <= h < 23 or (h == 23 and m < 30)) and slot['valid_from'] not in already_selected_ids:
+                evening_candidates.append(slot)
+
+        evening_candidates.sort(key=lambda s: s['value_inc_vat'])
+        selected_evening = evening_candidates[:evening_needed]
+
+        # --- STEP 4: Fill Logic (Rest of Day) ---
+        remaining_slots_count = total_slots_needed - len(selected_morning) - len(selected_afternoon) - len(selected_evening)
+        if remaining_slots_count < 0:
+            remaining_slots_count = 0
+
+        all_selected_ids = {s['valid_from'] for s in selected_morning + selected_afternoon + selected_evening}
+
+        remaining_candidates = [
+            s for s in eligible
+            if s['valid_from'] not in all_selected_ids
+            and s['value_inc_vat'] <= strict_threshold
+        ]
+
+        def effective_price(slot):
+            price = slot['value_inc_vat']
+            hour_index = local_time(slot).hour
+            return price - (0.01 * hour_index)
+
+        remaining_candidates.sort(key=effective_price)
+        selected_rest = remaining_candidates[:remaining_slots_count]
+
+        return selected_morning + selected_afternoon + selected_evening + selected_rest
+
+
+class OptimalScheduleSolver:
+    """
+    Minimum-cost schedule for one day via dynamic programming.
+
+    Slots are visited chronologically. The state is (slots selected, slots
+    selected in the current window, heater starts, previous slot on), so a day
+    of 48 slots has at most a few thousand live states and solves in
+    milliseconds. Window minimums come from window_minimums, so the budget caps
+    them, and are capped by any learned minimums and at the number of eligible
+    slots in that window, like the greedy fallback. Windows are matched within the day's slots only (see
+    SCHEDULE_WINDOWS); none may cross midnight. The day's target is therefore
+    max(budget, sum of window minimums) slots, which only exceeds the budget
+    when it is below MIN_BUDGET_SLOTS; fewer are chosen when not enough slots
+    are under the strict threshold, since a slot above it may only be chosen
+    towards an unmet window minimum.
+
+    Returns None when the constraints cannot all be met (for example a start
+    cap lower than the number of windows); the scheduler then falls back to the
+    greedy baseline.
+    """
+
+    name = "optimal"
+
+    def __init__(self, max_starts=None):
+        self.max_starts = max_starts if max_starts and max_starts > 0 else None
+
+    def select(self, eligible, local_time, total_slots_needed, strict_threshold, learned_minimums=None):
+        slots = sorted(eligible, key=lambda s: s['valid_from'])
+        windows = [window_index(local_time(s)) for s in slots]
+
+        required = [0] * len(SCHEDULE_WINDOWS)
+        for index in windows:
+            if index is not None:
+                required[index] += 1
+        minimums = window_minimums(total_slots_needed)
+        if learned_minimums is not None:
+            minimums = [min(minimum, learned) for minimum, learned in zip(minimums, learned_minimums)]
+        required = [min(count, minimum) for count, minimum in zip(required, minimums)]
+        target = max(total_slots_needed, sum(required))
+
+        # state -> (cost, chain); chain is a linked list of selected indices.
+        states = {(0, 0, 0, False): (0.0, None)}
+        previous_window = None
+
+        for i, slot in enumerate(slots):
+            window = windows[i]
+            contiguous = i > 0 and slots[i - 1]['valid_to'] == slot['valid_from']
+            price = slot['value_inc_vat']
+            next_states = {}
+
+            for (count, window_count, starts, previous_on), (cost, chain) in states.items():
+                if window != previous_window:
+                    # Leaving a window: drop paths that did not meet its minimum.
+                    if previous_window is not None and window_count < required[previous_window]:
+                        continue
+                    window_count = 0
+                previous_on = previous_on and contiguous
+
+                self._relax(next_states, (count, window_count, starts, False), cost, chain)
+
+                needed_by_window = window is not None and window_count < required[window]
+                if count >= target or not (price <= strict_threshold or needed_by_window):
+                    continue
+                new_starts = starts if previous_on else starts + 1
+                if self.max_starts is not None and new_starts > self.max_starts:
+                    continue
+                new_window_count = min(window_count + 1, required[window]) if window is not None else 0
+                self._relax(
+                    next_states,
+                    (count + 1, new_window_count, new_starts, True),
+                    cost + price,
+                    (i, chain),
+                )
+
+            states = next_states
+            previous_window = window
+
+        best = None
+        for (count, window_count, starts, _), (cost, chain) in states.items():
+            if previous_window is not None and window_count < required[previous_window]:
+                continue
+            key = (-count, round(cost, 6), starts)
+            if best is None or key < best[0]:
+                best = (key, chain)
+
+        if best is None:
+            return None
+
+        selected = []
+        chain = best[1]
+        while chain is not None:
+            index, chain = chain
+            selected.append(slots[index])
+        selected.reverse()
+        return selected
+
+    @staticmethod
+    def _relax(states, key, cost, chain):
+        current = states.get(key)
+        if current is None or cost < current[0]:
+            states[key] = (cost, chain)
+
+
+class RollingHorizonSolver:
+    """
+    Minimum-cost schedule across every known future rate, ignoring day boundaries.
+
+    Instead of per-day windows, the tank is kept warm by a cap on the time
+    between heats: at most ``max_gap_slots`` half-hours may pass after one
+    heated slot ends before the next starts. Tomorrow's cheap slots can
+    therefore replace today's expensive evening boost whenever the gap allows.
+
+    The state is (slots selected, half-hours since the last heat), so a 48 h
+    horizon has at most a few hundred live states per slot. Returns None when
+    no plan satisfies the gap cap (for example a long run of expensive slots).
+    """
+
+    name = "rolling"
+
+    def __init__(self, max_gap_slots):
+        self.max_gap_slots = max(1, int(max_gap_slots))
+
+    def select(self, horizon, eligible_ids, target_slots, initial_gap=0, forced_ids=()):
+        """
+        Select heating slots across a chronological horizon.
+
+        Args:
+            horizon: Every known rate slot in the horizon, sorted by valid_from
+            eligible_ids: valid_from of slots that may be heated
+            target_slots: Number of slots to heat within the horizon
+            initial_gap: Half-hours since the last heat ended, at the first slot
+            forced_ids: valid_from of slots that must stay selected (in progress)
+
+        Returns:
+            Chronological list of selected slots, or None when infeasible
+        """
+        if initial_gap > self.max_gap_slots:
+            initial_gap = self.max_gap_slots
+        # state (count, gap) -> (cost, chain)
+        states = {(0, initial_gap): (0.0, None)}
+        previous_end = horizon[0]['valid_from'] if horizon else None
+
+        for i, slot in enumerate(horizon):
+            missing = int((slot['valid_from'] - previous_end).total_seconds() // 1800)
+            previous_end = slot['valid_to']
+            eligible = slot['valid_from'] in eligible_ids
+            forced = slot['valid_from'] in forced_ids
+            price = slot['value_inc_vat']
+            next_states = {}
+
+            for (count, gap), (cost, chain) in states.items():
+                gap += missing
+                if gap > self.max_gap_slots:
+                    continue
+                if not forced:
+                    OptimalScheduleSolver._relax(next_states, (count, gap + 1), cost, chain)
+                if (eligible or forced) and (count < target_slots or forced):
+                    OptimalScheduleSolver._relax(next_states, (count + 1, 0), cost + price, (i, chain))
+
+            states = next_states
+
+        best = None
+        # The gap after the last slot is left to the next solve, once later
+        # rates are known.
+        for (count, _), (cost, chain) in states.items():
+            key = (-count, round(cost, 6))
+            if best is None or key < best[0]:
+                best = (key, chain)
+
+        if best is None:
+            return None
+
+        selected = []
+        chain = best[1]
+        while chain is not None:
+            index, chain = chain
+            selected.append(horizon[index])
+        selected.reverse()
+        return selected
+
+
+SOLVERS = {
+    GreedyWindowSolver.name: GreedyWindowSolver,
+    OptimalScheduleSolver.name: OptimalScheduleSolver,
+}
+
+
+def build_solver(name, max_starts=None, scale_minimums=False):
+    """Return the configured solver, defaulting to the greedy baseline."""
+    if name == OptimalScheduleSolver.name:
+        return OptimalScheduleSolver(max_starts=max_starts)
+    if name not in SOLVERS:
+        logger.warning(f"Unknown schedule solver '{name}'. Using greedy.")
+    return GreedyWindowSolver(scale_minimums=scale_minimums)
@@ -18,11 +18,18 @@ CREATE TABLE heating_schedule (
 -- Index for efficient queries
 CREATE INDEX idx_schedule_slot_start ON heating_schedule(slot_start);
 CREATE INDEX idx_schedule_heater_type ON heating_schedule(heater_type);
+
+replace_schedules() writes through the replace_heating_schedule RPC
+(supabase/migrations/20261019090000_atomic_heating_schedule_replace.sql),
+which replaces every heater type's window in a single transaction.
 """
 
 import os
+import time
+import bisect
 import logging
 import requests
+from services.timing import timed
 from datetime import datetime, timedelta, timezone
 
 logger = logging.getLogger(__name__)
@@ -32,6 +39,9 @@ class ScheduleStorage:
     """
     Stores and retrieves heating schedule from Supabase.
     """
+
+    SCHEDULE_CACHE_TTL_SECONDS = 300
+    QUERY_CACHE_SIZE = 32
 
     def __init__(self):
         self.supabase_url = os.getenv("SUPABASE_URL")
@@ -49,6 +59,31 @@ class ScheduleStorage:
                 "Prefer": "return=minimal"
             }
 
+        # Last persisted (window, fingerprint) per heater type. An identical
+        # recomputation is skipped without a network call.
+        self._persisted = {}
+        self.stats = {"writes": 0, "skipped": 0}
+
+        # Per heater type: the rows of the last window written or fetched,
+        # indexed by slot start. Remote results are kept by query for ETag
+        # revalidation.
+        self._schedule_cache = {}
+        self._query_cache = {}
+        self.cache_stats = {"hits": 0, "misses": 0, "revalidated": 0}
+
+    @staticmethod
+    def _fingerprint(slots):
+        """Order-independent identity of a schedule's rows."""
+        return frozenset((slot['valid_from'], slot['valid_to'], slot['value_inc_vat']) for slot in slots)
+
+    def _unchanged(self, heater_type, window, fingerprint):
+        return self._persisted.get(heater_type) == (window, fingerprint)
+
+    def _record_write(self, heater_type, window, fingerprint, slots):
+        if window:
+            self._persisted[heater_type] = (window, fingerprint)
+            self._remember_window(heater_type, window[0], window[1], slots)
+
     def save_schedule(self, slots, heater_type="off_peak", replace_from=None, replace_to=None):
         """
         Saves heating schedule to Supabase.
@@ -81,27 +116,55 @@ class ScheduleStorage:
                 logger.info(f"No slots or replacement window supplied for {heater_type}")
                 return True
 
+            window = None
+            if replace_from is not None and replace_to is not None:
+                window = (replace_from, replace_to)
+            fingerprint = self._fingerprint(slots)
+            if window and self._unchanged(heater_type, window, fingerprint):
+                self.stats["skipped"] += 1
+                self._remember_window(heater_type, replace_from, replace_to, slots)
+                logger.debug(f"Schedule for {heater_type} unchanged; skipping write")
+                return True
+
             delete_url = f"{self.supabase_url}/rest/v1/heating_schedule"
             delete_params = f"heater_type=eq.{heater_type}&slot_start=gte.{range_start}&slot_start=lt.{range_end}"
-
-            delete_response = requests.delete(
-                f"{delete_url}?{delete_params}",
-                headers=self.headers,
-                timeout=15,
-            )
-
-            if delete_response.status_code not in [200, 204]:
-                logger.error(f"Failed to clear old schedule: {delete_response.status_code} - {delete_response.text}")
-                return False
+            insert_slots = slots
+
+            # The stored state is unknown until this write succeeds.
+            previous = self._persisted.pop(heater_type, None)
+            if window and previous and previous[0] == window:
+                # Same window as the last write: only touch the rows that changed.
+                stale = previous[1] - fingerprint
+                insert_slots = [
+                    slot for slot in slots
+                    if (slot['valid_from'], slot['valid_to'], slot['value_inc_vat']) not in previous[1]
+                ]
+                delete_params = None
+                if stale:
+                    stale_starts = ",".join(sorted(format_boundary(start) for start, _, _ in stale))
+                    delete_params = f"heater_type=eq.{heater_type}&slot_start=in.({stale_starts})"
+
+            if delete_params:
+                delete_response = requests.delete(
+                    f"{delete_url}?{delete_params}",
+                    headers=self.headers,
+                    timeout=15,
+                )
 
-            if not slots:
+                if delete_response.status_code not in [200, 204]:
+                    logger.error(f"Failed to clear old schedule: {delete_response.status_code} - {delete_response.text}")
+                    return False
+
+            if not insert_slots:
                 logger.info(f"Cleared schedule for {heater_type}; no replacement slots selected")
+                self.stats["writes"] += 1
+                self._record_write(heater_type, window, fingerprint, slots)
                 return True
 
             # Insert new schedule
             rows = []
             computed_at = datetime.now(timezone.utc).isoformat()
-            for slot in slots:
+            for slot in insert_slots:
                 # Handle both datetime objects and ISO strings
                 slot_start = slot['valid_from']
                 slot_end = slot['valid_to']
@@ -129,6 +192,8 @@ class ScheduleStorage:
 
             if response.status_code in [200, 201]:
                 logger.info(f"Saved {len(rows)} schedule slots for {heater_type} to Supabase")
+                self.stats["writes"] += 1
+                self._record_write(heater_type, window, fingerprint, slots)
                 return True
             else:
                 logger.error(f"Failed to save schedule: {response.status_code} - {response.text}")
@@ -138,9 +203,158 @@ class ScheduleStorage:
             logger.error(f"Error saving schedule to Supabase: {e}")
             return False
 
+    @timed("supabase.schedule_write")
+    def replace_schedules(self, schedules, replace_from, replace_to, diff=True):
+        """
+        Atomically replaces the schedule window for several heater types in one call.
+
+        Args:
+            schedules: Dict of heater_type -> list of rate slot dicts
+            replace_from: Start of the window to replace (inclusive)
+            replace_to: End of the window to replace (exclusive)
+            diff: Only write rows whose slot_end or price changed
+
+        Heater types whose slots match the last successful write for the same
+        window are left out, and the call is skipped when none changed. Falls
+        back to save_schedule per heater type while the RPC has not been
+        deployed.
+        """
+        if not self.enabled:
+            logger.debug("Schedule storage disabled, skipping save.")
+            return False
+
+        window = (replace_from, replace_to)
+        fingerprints = {heater_type: self._fingerprint(slots) for heater_type, slots in schedules.items()}
+        changed = {
+            heater_type: slots for heater_type, slots in schedules.items()
+            if not self._unchanged(heater_type, window, fingerprints[heater_type])
+        }
+        for heater_type, slots in schedules.items():
+            if heater_type not in changed:
+                self._remember_window(heater_type, replace_from, replace_to, slots)
+        if not changed:
+            self.stats["skipped"] += 1
+            logger.debug("Schedule unchanged; skipping write")
+            return True
+
+        def format_timestamp(value):
+            return value.isoformat() if hasattr(value, 'isoformat') else value
+
+        payload = {
+            "p_replace_from": format_timestamp(replace_from),
+            "p_replace_to": format_timestamp(replace_to),
+            "p_schedules": {
+                heater_type: [
+                    {
+                        "slot_start": format_timestamp(slot['valid_from']),
+                        "slot_end": format_timestamp(slot['valid_to']),
+                        "price": slot['value_inc_vat'],
+                    }
+                    for slot in slots
+                ]
+                for heater_type, slots in changed.items()
+            },
+            "p_diff": diff,
+        }
+
+        # The stored state is unknown until this write succeeds.
+        for heater_type in changed:
+            self._persisted.pop(heater_type, None)
+
+        try:
+            response = requests.post(
+                f"{self.supabase_url}/rest/v1/rpc/replace_heating_schedule",
+                json=payload,
+                # The RPC returns its write counts, so do not ask for a minimal response.
+                headers={key: value for key, value in self.headers.items() if key != "Prefer"},
+                timeout=15,
+            )
+        except Exception as e:
+            logger.error(f"Error replacing schedule in Supabase: {e}")
+            return False
+
+        if response.status_code == 404:
+            logger.warning("replace_heating_schedule RPC not found; falling back to per-heater replacement.")
+            results = [
+                self.save_schedule(slots, heater_type=heater_type, replace_from=replace_from, replace_to=replace_to)
+                for heater_type, slots in changed.items()
+            ]
+            return all(results)
+
+        if response.status_code != 200:
+            logger.error(f"Failed to replace schedule: {response.status_code} - {response.text}")
+            return False
+
+        self.stats["writes"] += 1
+        for heater_type in changed:
+            self._record_write(heater_type, window, fingerprints[heater_type], changed[heater_type])
+        counts = response.json()
+        logger.info(
+            f"Replaced schedule for {', '.join(changed)}: {counts.get('written')} written, "
+            f"{counts.get('deleted')} deleted, {counts.get('unchanged')} unchanged"
+        )
+        return True
+
+    def _remember_window(self, heater_type, replace_from, replace_to, slots):
+        """Cache the rows a successful write left in its window; they are authoritative there."""
+        def format_timestamp(value):
+            # Slots may carry datetimes or ISO strings, as on the write path.
+            return value.isoformat() if hasattr(value, 'isoformat') else str(value)
+
+        rows = sorted(
+            (
+                {
+                    "slot_start": format_timestamp(slot['valid_from']),
+                    "slot_end": format_timestamp(slot['valid_to']),
+                    "price": slot['value_inc_vat'],
+                    "heater_type": heater_type,
+                }
+                for slot in slots
+            ),
+            key=lambda row: _parse_timestamp(row["slot_start"]),
+        )
+        self._cache_window(heater_type, _parse_timestamp(replace_from), _parse_timestamp(replace_to), rows)
+
+    def _cache_window(self, heater_type, window_from, window_to, rows):
+        self._schedule_cache[heater_type] = {
+            "from": window_from,
+            "to": window_to,
+            "rows": rows,
+            "starts": [_parse_timestamp(row["slot_start"]) for row in rows],
+            "expires": time.monotonic() + self.SCHEDULE_CACHE_TTL_SECONDS,
+        }
+
+    def _cached_schedule(self, heater_type, from_time, to_time):
+        """Answer a range query from memory, or return None when the cache does not cover it."""
+        entry = self._schedule_cache.get(heater_type)
+        if (
+            entry is None
+            or from_time is None
+            or to_time is None
+            or time.monotonic() >= entry["expires"]
+            or from_time < entry["from"]
+            or to_time > entry["to"]
+        ):
+            return None
+
+        rows = []
+        for index in range(bisect.bisect_left(entry["starts"], from_time), len(entry["starts"])):
+            if entry["starts"][index] >= to_time:
+                break
+            row = entry["rows"][index]
+            if _parse_timestamp(row["slot_end"]) <= to_time:
+                rows.append(row)
+        self.cache_stats["hits"] += 1
+        return rows
+
     def get_schedule(self, heater_type=None, from_time=None, to_time=None):
         """
         Retrieves heating schedule from Supabase.
+
+        Range queries for one heater type inside a window this process wrote
+        (or fetched) within SCHEDULE_CACHE_TTL_SECONDS are answered from
+        memory. Other queries revalidate with If-None-Match when Supabase
+        returned an ETag for the same query.
 
         Args:
             heater_type: Optional filter for 'off_peak' or 'peak'
@@ -148,43 +362,80 @@ class ScheduleStorage:
             to_time: Optional end time filter (datetime or ISO string)
 
         Returns:
-            List of schedule slots or empty list on error
+            List of schedule slots (slot_start, slot_end, price, heater_type)
+            or empty list on error
         """
         if not self.enabled:
             return []
 
         try:
+            from_time = _parse_timestamp(from_time) if from_time else None
+            to_time = _parse_timestamp(to_time) if to_time else None
+
+            if heater_type:
+                cached = self._cached_schedule(heater_type, from_time, to_time)
+                if cached is not None:
+                    return cached
+
             url = f"{self.supabase_url}/rest/v1/heating_schedule"
-            params = ["select=*"]
+            params = ["select=slot_start,slot_end,price,heater_type"]
 
             if heater_type:
                 params.append(f"heater_type=eq.{heater_type}")
 
             if from_time:
-                if hasattr(from_time, 'isoformat'):
-                    from_time = from_time.isoformat()
-                params.append(f"slot_start=gte.{from_time}")
+                params.append(f"slot_start=gte.{_format_query_timestamp(from_time)}")
 
             if to_time:
-                if hasattr(to_time, 'isoformat'):
-                    to_time = to_time.isoformat()
-                params.append(f"slot_end=lte.{to_time}")
+                params.append(f"slot_end=lte.{_format_query_timestamp(to_time)}")
 
             params.append("order=slot_start.asc")
 
             query_string = "&".join(params)
+            headers = self.headers
+            previous = self._query_cache.get(query_string)
+            if previous:
+                headers = {**self.headers, "If-None-Match": previous[0]}
+
             response = requests.get(
                 f"{url}?{query_string}",
-                headers=self.headers,
+                headers=headers,
                 timeout=15,
             )
 
-            if response.status_code == 200:
-                return response.json()
+            if response.status_code == 304 and previous:
+                self.cache_stats["revalidated"] += 1
+                rows = previous[1]
+            elif response.status_code == 200:
+                self.cache_stats["misses"] += 1
+                rows = response.json()
+                etag = (getattr(response, "headers", None) or {}).get("ETag")
+                self._query_cache.pop(query_string, None)
+                if etag:
+                    self._query_cache[query_string] = (etag, rows)
+                    while len(self._query_cache) > self.QUERY_CACHE_SIZE:
+                        self._query_cache.pop(next(iter(self._query_cache)))
             else:
                 logger.error(f"Failed to fetch schedule: {response.status_code}")
                 return []
 
+            if heater_type and from_time and to_time:
+                self._cache_window(heater_type, from_time, to_time, rows)
+            return rows
+
         except Exception as e:
             logger.error(f"Error fetching schedule from Supabase: {e}")
             return []
+
+
+def _parse_timestamp(value):
+    if not hasattr(value, 'isoformat'):
+        value = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def _format_query_timestamp(value):
+    # A literal '+' in a query string decodes as a space.
+    return value.astimezone(timezone.utc).isoformat().replace('+00:00', 'Z')
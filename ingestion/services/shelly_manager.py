@@ -3,6 +3,7 @@ import logging
 import threading
 import time
 from config import Config
+from services.timing import timed
 from services.shelly_rate_gate import (
     DEFAULT_MIN_REQUEST_INTERVAL_SECONDS,
     SharedShellyRequestGate,
@@ -52,6 +53,7 @@ class ShellyManager:
             self._request_gate.wait_for_turn()
             return self.session.post(url, **kwargs)
 
+    @timed("shelly.status")
     def _get_device(self, device_id):
         """Fetch one device through Shelly Cloud Control API v2."""
         if not all([self.server, self.auth_key, device_id]):
@@ -159,6 +161,7 @@ class ShellyManager:
             "raw": relay,
         }
 
+    @timed("shelly.set_relay")
     def set_relay(self, channel=0, turn_on=True, toggle_after=None):
         """Switch a Shelly relay through Cloud API v2.
 
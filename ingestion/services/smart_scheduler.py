@@ -7,21 +7,30 @@ time windows. The algorithm:
 2. Applies price threshold (below average AND/OR absolute cap)
 3. Excludes blocked hours (e.g., morning peak)
 4. Selects the cheapest N slots to meet the daily heating budget
+   using the configured solver (see services/schedule_solver.py)
 """
 
 import logging
+from collections import namedtuple
 from datetime import datetime, timedelta
 import pytz
+
+from services.schedule_solver import GreedyWindowSolver, RollingHorizonSolver, build_solver
 
 logger = logging.getLogger(__name__)
+
+# Household-local calendar fields of a rate slot's start.
+LocalSlotTime = namedtuple("LocalSlotTime", ["date", "hour", "minute"])
 
 
 class SmartScheduler:
     """
     Computes optimal heating slots based on electricity rates.
     """
+
+    LOCAL_TIME_CACHE_LIMIT = 4096
 
-    def __init__(self, config):
+    def __init__(self, config, local_time_cache_limit=None):
         self.config = config
         # pytz is already an application dependency and bundles the IANA zone
         # database on Windows as well as Linux.  This keeps local development
@@ -31,12 +40,50 @@ class SmartScheduler:
         self.last_rate_check = None
         self.tomorrow_scheduled = False
         self.current_schedule = []
+        # Rate starts are immutable, so each one only needs a single timezone
+        # conversion no matter how many filters and sort keys inspect it. A
+        # batch replay that revisits every rate can raise the limit.
+        self._local_time_cache = {}
+        self.local_time_cache_limit = local_time_cache_limit or self.LOCAL_TIME_CACHE_LIMIT
+        scale_minimums = getattr(config, 'SCALE_WINDOW_MINIMUMS', False)
+        self.solver = build_solver(
+            getattr(config, 'SCHEDULE_SOLVER', 'greedy'),
+            max_starts=getattr(config, 'MAX_DAILY_HEATER_STARTS', None),
+            scale_minimums=scale_minimums,
+        )
+        self.baseline_solver = GreedyWindowSolver(scale_minimums=scale_minimums)
+        # Last rolling-horizon plan, reused while the known rates are unchanged,
+        # and the slots already heated under earlier plans.
+        self.rolling_plan = None
+        self.rolling_history = {}
+        self.rolling_stats = {"solved": 0, "reused": 0}
 
     def _local_start(self, slot):
         """Return a rate slot's start in the configured household timezone."""
         return slot['valid_from'].astimezone(self.timezone)
-
-    def compute_schedule_for_date(self, target_date, rates, budget_hours, max_price, use_below_average, blocked_hours):
+
+    def local_time(self, slot):
+        """Return the slot's local date, hour and minute, memoised by valid_from."""
+        key = slot['valid_from']
+        parts = self._local_time_cache.get(key)
+        if parts is None:
+            if len(self._local_time_cache) >= self.local_time_cache_limit:
+                # The controller runs indefinitely; old days are never asked for again.
+                self._local_time_cache.clear()
+            local_start = self._local_start(slot)
+            parts = LocalSlotTime(local_start.date(), local_start.hour, local_start.minute)
+            self._local_time_cache[key] = parts
+        return parts
+
+    def rates_by_local_date(self, rates):
+        """Group rate slots by their household-local date, keeping their order."""
+        days = {}
+        for rate in rates:
+            days.setdefault(self.local_time(rate).date, []).append(rate)
+        return days
+
+    def compute_schedule_for_date(self, target_date, rates, budget_hours, max_price, use_below_average, blocked_hours,
+                                  learned_minimums=None):
         """
         Main algorithm to select optimal heating slots for a specific calendar date.
 
@@ -47,6 +94,8 @@ class SmartScheduler:
             max_price: Absolute maximum price in pence (e.g., 30.0)
             use_below_average: If True, also requires price to be below daily average
             blocked_hours: List of hours to never heat during (e.g., [7, 8] for 07:00-09:00)
+            learned_minimums: Optional learned slots per schedule window, which
+                can only lower its minimum (see HeatDemandModel.window_slots)
 
         Returns:
             List of selected rate slots for the target_date, sorted chronologically
@@ -56,7 +105,7 @@ class SmartScheduler:
             return []
 
         # Filter rates to only match the target_date
-        daily_rates = [r for r in rates if self._local_start(r).date() == target_date]
+        daily_rates = [r for r in rates if self.local_time(r).date == target_date]
 
         if not daily_rates:
             logger.warning(f"No rates found for target date: {target_date}")
@@ -77,7 +126,7 @@ class SmartScheduler:
         rejected_blocked = []
 
         for slot in daily_rates:
-            hour = self._local_start(slot).hour
+            hour = self.local_time(slot).hour
 
             # Check if hour is blocked
             if hour in blocked_hours:
@@ -93,132 +142,148 @@ class SmartScheduler:
 
         # Calculate how many slots we need
         total_slots_needed = int(budget_hours * 2)
-        morning_slots_needed = 4  # 2 Hours for Morning Ready
-        afternoon_slots_needed = 2  # 1 Hour
-        evening_slots_needed = 2  # 1 Hour for Evening Boost
-
-        # --- STEP 1: Morning Ready (00:00 - 06:00) ---
-        # Select cheapest overnight slots, with tiebreaker preferring
-        # slots CLOSER to morning (later hour wins) so the tank stays
-        # hot until wake-up.
-        morning_candidates = []
-        for slot in eligible:
-            h = self._local_start(slot).hour
-            if 0 <= h < 6:
-                morning_candidates.append(slot)
-
-        # Sort by price first, then by hour DESCENDING (later = closer to morning)
-        # so that among equally-priced slots, later ones are preferred.
-        morning_candidates.sort(key=lambda s: (s['value_inc_vat'], -self._local_start(s).hour))
-        selected_morning = morning_candidates[:morning_slots_needed]
-
-        if not selected_morning and morning_candidates:
-            logger.warning("No eligible morning slots found within price limits.")
-        elif not morning_candidates:
-            logger.info("No morning rate data available (00:00-06:00).")
-
-        # If not enough cheap morning slots were found, fill with the
-        # LATEST available morning slots regardless of strict threshold
-        # (still respecting hard limit) so the tank is heated before wake-up.
-        if len(selected_morning) < morning_slots_needed:
-            shortfall = morning_slots_needed - len(selected_morning)
-            selected_morning_ids = {f"{s['valid_from']}" for s in selected_morning}
-            # Fallback: pick latest available morning slots under hard limit
-            fallback_morning = [
-                s for s in eligible
-                if 0 <= self._local_start(s).hour < 6
-                and f"{s['valid_from']}" not in selected_morning_ids
-            ]
-            # Prefer latest slots (closest to wakeup)
-            fallback_morning.sort(key=lambda s: -self._local_start(s).hour)
-            selected_morning.extend(fallback_morning[:shortfall])
-            if fallback_morning[:shortfall]:
-                logger.info(f"Morning fallback: added {len(fallback_morning[:shortfall])} later slots to ensure hot water.")
-
-        # --- STEP 2: Secure Afternoon Boost (14:00 - 16:00) ---
-        selected_morning_ids = {f"{s['valid_from']}" for s in selected_morning}
-        afternoon_candidates = []
-        for slot in eligible:
-            h = self._local_start(slot).hour
-            if 14 <= h < 16 and f"{slot['valid_from']}" not in selected_morning_ids:
-                afternoon_candidates.append(slot)
-
-        afternoon_candidates.sort(key=lambda s: s['value_inc_vat'])
-        selected_afternoon = afternoon_candidates[:afternoon_slots_needed]
-
-        # --- STEP 3: Secure Evening Boost (19:00 - 23:30) ---
-        already_selected_ids = {f"{s['valid_from']}" for s in selected_morning + selected_afternoon}
-        evening_candidates = []
-        for slot in eligible:
-            local_start = self._local_start(slot)
-            h = local_start.hour
-            m = local_start.minute
-            if (19 <= h < 23 or (h == 23 and m < 30)) and f"{slot['valid_from']}" not in already_selected_ids:
-                evening_candidates.append(slot)
-
-        evening_candidates.sort(key=lambda s: s['value_inc_vat'])
-        selected_evening = evening_candidates[:evening_slots_needed]
-
-        # --- STEP 4: Fill Logic (Rest of Day) ---
-        remaining_slots_count = total_slots_needed - len(selected_morning) - len(selected_afternoon) - len(selected_evening)
-        if remaining_slots_count < 0:
-            remaining_slots_count = 0
-
-        all_selected_ids = {f"{s['valid_from']}" for s in selected_morning + selected_afternoon + selected_evening}
-
-        remaining_candidates = [
-            s for s in eligible
-            if f"{s['valid_from']}" not in all_selected_ids
-            and s['value_inc_vat'] <= strict_threshold
-        ]
-
-        def effective_price(slot):
-            price = slot['value_inc_vat']
-            hour_index = self._local_start(slot).hour
-            return price - (0.01 * hour_index)
-
-        remaining_candidates.sort(key=effective_price)
-        selected_rest = remaining_candidates[:remaining_slots_count]
 
-        # Combine
-        final_selection = selected_morning + selected_afternoon + selected_evening + selected_rest
+        final_selection = self.solver.select(
+            eligible, self.local_time, total_slots_needed, strict_threshold, learned_minimums=learned_minimums
+        )
+        if final_selection is None:
+            logger.warning(
+                f"{self.solver.name} solver found no schedule meeting every constraint for {target_date}; "
+                "using the greedy baseline."
+            )
+            final_selection = self.baseline_solver.select(
+                eligible, self.local_time, total_slots_needed, strict_threshold, learned_minimums=learned_minimums
+            )
         final_selection.sort(key=lambda s: s['valid_from'])
         
         self._log_schedule_summary(target_date, final_selection, rejected_expensive, rejected_blocked, strict_threshold, daily_avg)
         
         return final_selection
 
+    def compute_rolling_schedule(self, now, rates, horizon_end, budget_hours, max_price, blocked_hours, max_gap_hours):
+        """
+        Select heating slots across all known rates from now until horizon_end.
+
+        The daily budget applies to each local day in the horizon, less any
+        slots of that day already heated under earlier plans, and the gap
+        between heats is capped at max_gap_hours. When a refresh brings no
+        new or changed rates, the remainder of the previous plan is still
+        optimal for the remaining slots and is reused without re-solving. A
+        slot of the previous plan that is already in progress stays selected.
+
+        Returns:
+            Chronological list of selected future slots, or None when no plan
+            satisfies the gap cap (the caller should fall back to daily mode)
+        """
+        horizon = sorted(
+            (r for r in rates if r['valid_to'] > now and r['valid_from'] < horizon_end),
+            key=lambda r: r['valid_from'],
+        )
+        if not horizon:
+            logger.warning("No future rates available for the rolling horizon.")
+            return []
+
+        fingerprint = tuple((r['valid_from'], r['value_inc_vat']) for r in horizon)
+        previous = self.rolling_plan
+        if previous and previous["fingerprint"][-len(fingerprint):] == fingerprint:
+            self.rolling_stats["reused"] += 1
+            selected = [s for s in previous["slots"] if s['valid_to'] > now]
+            logger.info(f"Rolling schedule: rates unchanged, reusing previous plan ({len(selected)} future slots).")
+            return selected
+
+        eligible_ids = {
+            r['valid_from'] for r in horizon
+            if self.local_time(r).hour not in blocked_hours and r['value_inc_vat'] <= max_price
+        }
+
+        # Slots of earlier plans that have already started count against their
+        # own day's budget, and carry the time since the last heat into this solve.
+        first_start = horizon[0]['valid_from']
+        if previous:
+            for s in previous["slots"]:
+                if s['valid_from'] < first_start:
+                    self.rolling_history[s['valid_from']] = s
+        for start in [start for start in self.rolling_history if start < first_start - timedelta(days=2)]:
+            del self.rolling_history[start]
+
+        # The daily budget applies per local day in the horizon; a trailing
+        # partial day gets its share.
+        budget_slots = budget_hours * 2
+        last = self.local_time(horizon[-1])
+        target_slots = 0
+        for day in sorted({self.local_time(r).date for r in horizon}):
+            share = 1.0
+            if day == last.date:
+                share = min(1.0, (last.hour * 2 + last.minute // 30 + 1) / 48)
+            heated = sum(1 for s in self.rolling_history.values() if self.local_time(s).date == day)
+            target_slots += max(0, int(round(budget_slots * share)) - heated)
+
+        # Warm start from the previous plan: keep the slot in progress.
+        initial_gap = 0
+        heated_before = [s['valid_to'] for s in self.rolling_history.values() if s['valid_to'] <= first_start]
+        if heated_before:
+            initial_gap = int((first_start - max(heated_before)).total_seconds() // 1800)
+        forced_ids = set()
+        if previous:
+            forced_ids = {
+                s['valid_from'] for s in previous["slots"]
+                if s['valid_from'] <= now < s['valid_to']
+            }
+
+        solver = RollingHorizonSolver(max_gap_slots=int(max_gap_hours * 2))
+        selected = solver.select(horizon, eligible_ids, target_slots, initial_gap, forced_ids)
+        if selected is None:
+            logger.warning(
+                f"Rolling schedule: no plan keeps heats within {max_gap_hours}h of each other; "
+                "falling back to daily scheduling."
+            )
+            self.rolling_plan = None
+            return None
+
+        self.rolling_stats["solved"] += 1
+        self.rolling_plan = {"fingerprint": fingerprint, "slots": selected}
+
+        cost = sum(s['value_inc_vat'] for s in selected)
+        horizon_hours = (horizon[-1]['valid_to'] - first_start).total_seconds() / 3600
+        logger.info(
+            f"Rolling schedule: {len(selected)}/{target_slots} slots over {horizon_hours:.1f}h "
+            f"(sum {cost:.2f}p, max gap {max_gap_hours}h)"
+        )
+        return selected
+
     def _log_schedule_summary(self, target_date, selected, rejected_expensive, rejected_blocked, threshold, daily_avg):
-        """Logs a clear summary of the computed schedule."""
-        logger.info("=" * 60)
-        logger.info(f"SMART SCHEDULE COMPUTED FOR {target_date}")
-        logger.info("=" * 60)
-        logger.info(f"Daily Average: {daily_avg:.2f}p | Price Threshold: {threshold:.2f}p")
-        logger.info(f"Budget: {len(selected) * 0.5:.1f} hours ({len(selected)} x 30-min slots)")
-        logger.info("")
-
-        if selected:
-            logger.info("SELECTED HEATING SLOTS:")
-            total_cost = 0
-            for slot in selected:
-                time_str = slot['valid_from'].strftime('%Y-%m-%d %H:%M')
-                price = slot['value_inc_vat']
-                total_cost += price
-                logger.info(f"  [ON] {time_str} - {price:.2f}p")
-
-            avg_cost = total_cost / len(selected)
-            logger.info(f"\nAverage slot price: {avg_cost:.2f}p")
-            logger.info(f"Estimated heating cost: {(total_cost * 3 / 100):.2f} GBP (assuming 3kW heater)")
-        else:
-            logger.warning("NO SLOTS SELECTED - Check configuration!")
-
-        if rejected_expensive:
-            logger.info(f"\nRejected (above {threshold:.1f}p): {len(rejected_expensive)} slots")
-
-        if rejected_blocked:
-            logger.info(f"Rejected (blocked hours): {len(rejected_blocked)} slots")
-
-        logger.info("=" * 60)
+        """Logs the computed schedule as one record rather than a line per slot."""
+        if not selected:
+            logger.warning(
+                "NO SLOTS SELECTED for %s - Check configuration! (daily average %.2fp, threshold %.2fp, "
+                "%d above threshold, %d in blocked hours)",
+                target_date, daily_avg, threshold, len(rejected_expensive), len(rejected_blocked),
+            )
+            return
+
+        if not logger.isEnabledFor(logging.INFO):
+            return
+
+        def describe(slot):
+            local = self.local_time(slot)
+            return f"{local.date:%Y-%m-%d} {local.hour:02d}:{local.minute:02d} {slot['value_inc_vat']:.2f}p"
+
+        total_cost = sum(slot['value_inc_vat'] for slot in selected)
+        logger.info(
+            "SMART SCHEDULE FOR %s: %d x 30-min slots (%.1fh), average %.2fp, "
+            "est. %.2f GBP at 3kW | daily average %.2fp, threshold %.2fp | "
+            "rejected %d above threshold, %d in blocked hours | slots: %s",
+            target_date,
+            len(selected),
+            len(selected) * 0.5,
+            total_cost / len(selected),
+            total_cost * 3 / 100,
+            daily_avg,
+            threshold,
+            len(rejected_expensive),
+            len(rejected_blocked),
+            ", ".join(describe(slot) for slot in selected),
+        )
 
     def should_check_for_new_rates(self, current_time, publish_window_start, publish_window_end):
         """
@@ -254,7 +319,7 @@ class SmartScheduler:
         """Check if we have rates for tomorrow."""
         local_now = current_time.astimezone(self.timezone)
         tomorrow = (local_now + timedelta(days=1)).date()
-        return any(self._local_start(r).date() == tomorrow for r in rates)
+        return any(self.local_time(r).date == tomorrow for r in rates)
 
     def mark_rate_check(self, current_time):
         """Record that we just checked rates."""
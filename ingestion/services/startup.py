@@ -0,0 +1,158 @@
+"""
+Startup Orchestrator
+
+Runs the controller's startup steps concurrently. Each step names the steps it
+depends on and starts as soon as they have all succeeded, so independent
+network round-trips (NTP, Tuya Cloud login, device health, Octopus rates,
+Supabase writes) overlap instead of queueing.
+
+run() returns once every required step has settled. Optional steps that are
+still running carry on in the background and log their timing when they
+finish. A required step that overruns its deadline is reported as timed out
+and its dependants are skipped; Python threads cannot be cancelled, so the
+step itself keeps running and its late result is ignored.
+"""
+
+import logging
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+StepResult = namedtuple("StepResult", ["status", "seconds", "value", "error"])
+
+OK = "ok"
+FAILED = "failed"
+TIMED_OUT = "timed_out"
+SKIPPED = "skipped"
+
+
+class _Step:
+    def __init__(self, name, func, depends_on, deadline, required):
+        self.name = name
+        self.func = func
+        self.depends_on = tuple(depends_on)
+        self.deadline = deadline
+        self.required = required
+        self.started_at = None
+
+
+class StartupOrchestrator:
+    """Dependency-ordered, concurrent execution of named startup steps."""
+
+    def __init__(self, name="startup", max_workers=4, clock=None):
+        self.name = name
+        self.max_workers = max_workers
+        self._clock = clock or time.monotonic
+        self._steps = {}
+        self.results = {}
+        self._condition = threading.Condition()
+        self._executor = None
+        self._began = None
+
+    def add(self, name, func, depends_on=(), deadline=None, required=True):
+        """
+        Register a step.
+
+        Args:
+            name: Unique step name, used by other steps' depends_on
+            func: Callable taking no arguments; its return value is kept
+            depends_on: Names of steps that must succeed first
+            deadline: Seconds after the step starts before it counts as timed out
+            required: Whether run() waits for this step
+        """
+        if name in self._steps:
+            raise ValueError(f"Duplicate startup step: {name}")
+        unknown = [dependency for dependency in depends_on if dependency not in self._steps]
+        if unknown:
+            raise ValueError(f"Startup step {name} depends on unknown steps: {', '.join(unknown)}")
+        self._steps[name] = _Step(name, func, depends_on, deadline, required)
+
+    def value(self, name, default=None):
+        result = self.results.get(name)
+        return result.value if result and result.status == OK else default
+
+    def run(self):
+        """Start every step, wait for the required ones, and return the results so far."""
+        self._began = self._clock()
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=self.name)
+        with self._condition:
+            self._start_ready_steps()
+            while True:
+                pending = [step for step in self._steps.values() if step.required and step.name not in self.results]
+                if not pending:
+                    break
+                self._condition.wait(self._expire_overdue_steps())
+            self._shutdown_if_settled()
+
+        logger.info(
+            f"{self.name} ready in {self._clock() - self._began:.2f}s: "
+            + ", ".join(self._describe(name, result) for name, result in self.results.items())
+        )
+        return dict(self.results)
+
+    @staticmethod
+    def _describe(name, result):
+        if result.status == OK:
+            return f"{name} {result.seconds:.2f}s"
+        return f"{name} {result.status}"
+
+    def _start_ready_steps(self):
+        for step in self._steps.values():
+            if step.name in self.results or step.started_at is not None:
+                continue
+            statuses = [self.results[dependency].status if dependency in self.results else None for dependency in step.depends_on]
+            if any(status not in (None, OK) for status in statuses):
+                self._settle(step, StepResult(SKIPPED, 0.0, None, "dependency did not succeed"))
+            elif all(status == OK for status in statuses):
+                step.started_at = self._clock()
+                future = self._executor.submit(step.func)
+                future.add_done_callback(lambda done, step=step: self._on_done(step, done))
+
+    def _on_done(self, step, future):
+        seconds = self._clock() - step.started_at
+        error = future.exception()
+        with self._condition:
+            if step.name in self.results:
+                logger.warning(f"{self.name} step {step.name} finished {seconds:.2f}s after starting, past its deadline")
+                return
+            if error is not None:
+                logger.error(f"{self.name} step {step.name} failed after {seconds:.2f}s: {error}")
+                self._settle(step, StepResult(FAILED, seconds, None, error))
+            else:
+                if not step.required:
+                    logger.info(f"{self.name} step {step.name} finished in {seconds:.2f}s")
+                self._settle(step, StepResult(OK, seconds, future.result(), None))
+            self._start_ready_steps()
+            self._shutdown_if_settled()
+
+    def _settle(self, step, result):
+        self.results[step.name] = result
+        self._condition.notify_all()
+
+    def _expire_overdue_steps(self):
+        """Time out overdue steps and return seconds until the next deadline, or None."""
+        now = self._clock()
+        next_deadline = None
+        expired = False
+        for step in self._steps.values():
+            if step.started_at is None or step.deadline is None or step.name in self.results:
+                continue
+            remaining = step.started_at + step.deadline - now
+            if remaining <= 0:
+                logger.warning(f"{self.name} step {step.name} exceeded its {step.deadline:g}s deadline")
+                self._settle(step, StepResult(TIMED_OUT, now - step.started_at, None, None))
+                expired = True
+            elif next_deadline is None or remaining < next_deadline:
+                next_deadline = remaining
+        if expired:
+            self._start_ready_steps()
+            return 0
+        return next_deadline
+
+    def _shutdown_if_settled(self):
+        if self._executor and len(self.results) == len(self._steps):
+            self._executor.shutdown(wait=False)
+            self._executor = None
@@ -0,0 +1,204 @@
+"""
+Status Server
+
+Serves the controller's get_state() to a local UI without touching Supabase.
+The control loop publishes a snapshot after each pass; publishing serialises
+the state once, and the serialised body and its ETag are swapped in as a
+single immutable object, so request threads never see a half-updated state.
+
+Endpoints:
+
+- GET /state: the latest snapshot as JSON. Honours If-None-Match (304) and,
+  with ?wait=SECONDS, holds the request until the snapshot changes (long-poll).
+  The ETag is weak: it covers the controller state but not its stage timings.
+- GET /events: Server-Sent Events stream with one "state" event per change.
+- GET /healthz: liveness only.
+"""
+
+import json
+import hashlib
+import logging
+import threading
+from collections import namedtuple
+from datetime import date, datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+logger = logging.getLogger(__name__)
+
+Snapshot = namedtuple("Snapshot", ["version", "etag", "body"])
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+def _serialise(value):
+    return json.dumps(value, default=_json_default, sort_keys=True, separators=(",", ":")).encode("utf-8")
+
+
+class StatusSnapshot:
+    """Latest published state, shared between the control loop and HTTP threads."""
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._current = Snapshot(0, 'W/"0"', b"{}")
+        self._wakeups = 0
+
+    @property
+    def current(self):
+        return self._current
+
+    def publish(self, state, unversioned=None):
+        """
+        Serialise state and make it the current snapshot. Returns True if it changed.
+
+        The ETag covers state only. unversioned fields (such as stage timings,
+        which differ after every pass) are merged into the body, but a change
+        to them alone refreshes the body under the same weak ETag and version,
+        without waking long-polls or event streams.
+        """
+        etag = 'W/"' + hashlib.sha1(_serialise(state)).hexdigest() + '"'
+        body = _serialise({**state, **unversioned}) if unversioned else _serialise(state)
+        with self._condition:
+            if etag == self._current.etag:
+                if body != self._current.body:
+                    self._current = self._current._replace(body=body)
+                return False
+            self._current = Snapshot(self._current.version + 1, etag, body)
+            self._condition.notify_all()
+        return True
+
+    def wait_for_change(self, etag, timeout):
+        """Block until the snapshot's ETag differs from etag, or timeout/wake. Returns the current snapshot."""
+        with self._condition:
+            wakeups = self._wakeups
+            self._condition.wait_for(lambda: self._wakeups != wakeups or self._current.etag != etag, timeout=timeout)
+            return self._current
+
+    def wait_for_version(self, version, timeout):
+        with self._condition:
+            wakeups = self._wakeups
+            self._condition.wait_for(lambda: self._wakeups != wakeups or self._current.version > version, timeout=timeout)
+            return self._current
+
+    def wake(self):
+        """Release every waiting request without a new snapshot; the snapshot stays usable."""
+        with self._condition:
+            self._wakeups += 1
+            self._condition.notify_all()
+
+
+class _StatusRequestHandler(BaseHTTPRequestHandler):
+    server_version = "SmartWaterStatus/1.0"
+
+    def log_message(self, format, *args):
+        logger.debug("Status API %s - %s", self.address_string(), format % args)
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        if parts.path == "/state":
+            self._send_state(parse_qs(parts.query))
+        elif parts.path == "/events":
+            self._stream_events()
+        elif parts.path == "/healthz":
+            self._send(200, b'{"ok":true}')
+        else:
+            self._send(404, b'{"error":"not found"}')
+
+    def _send(self, status, body, etag=None):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Access-Control-Allow-Origin", "*")
+        if etag:
+            self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_state(self, query):
+        snapshots = self.server.snapshots
+        snapshot = snapshots.current
+        client_etag = self.headers.get("If-None-Match")
+
+        if client_etag == snapshot.etag and "wait" in query:
+            try:
+                wait = float(query["wait"][0])
+            except ValueError:
+                wait = 0.0
+            wait = max(0.0, min(self.server.max_wait_seconds, wait))
+            snapshot = snapshots.wait_for_change(client_etag, wait)
+
+        if client_etag == snapshot.etag:
+            self.send_response(304)
+            self.send_header("ETag", snapshot.etag)
+            self.send_header("Access-Control-Allow-Origin", "*")
+            self.end_headers()
+            return
+        self._send(200, snapshot.body, etag=snapshot.etag)
+
+    def _stream_events(self):
+        snapshots = self.server.snapshots
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.end_headers()
+        self.close_connection = True
+
+        version = -1
+        try:
+            while not self.server.stopping.is_set():
+                snapshot = snapshots.wait_for_version(version, self.server.keepalive_seconds)
+                if snapshot.version > version:
+                    version = snapshot.version
+                    self.wfile.write(
+                        b"event: state\nid: " + str(version).encode("ascii") + b"\ndata: " + snapshot.body + b"\n\n"
+                    )
+                else:
+                    self.wfile.write(b": keepalive\n\n")
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+class StatusServer:
+    """Embedded HTTP server for StatusSnapshot, running on a daemon thread."""
+
+    def __init__(self, snapshots, host="127.0.0.1", port=8765, max_wait_seconds=30, keepalive_seconds=15):
+        self.snapshots = snapshots
+        self.host = host
+        self.port = port
+        self.max_wait_seconds = max_wait_seconds
+        self.keepalive_seconds = keepalive_seconds
+        self._httpd = None
+        self._thread = None
+
+    @property
+    def address(self):
+        return self._httpd.server_address if self._httpd else None
+
+    def start(self):
+        self._httpd = ThreadingHTTPServer((self.host, self.port), _StatusRequestHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.snapshots = self.snapshots
+        self._httpd.max_wait_seconds = self.max_wait_seconds
+        self._httpd.keepalive_seconds = self.keepalive_seconds
+        self._httpd.stopping = threading.Event()
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="status-server", daemon=True)
+        self._thread.start()
+        logger.info(f"Status API listening on http://{self.address[0]}:{self.address[1]}")
+
+    def stop(self):
+        """Shut down the HTTP server; the snapshot stays open, so start() can serve it again."""
+        if not self._httpd:
+            return
+        self._httpd.stopping.set()
+        self.snapshots.wake()
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        self._thread.join(timeout=5)
+        self._httpd = None
@@ -1,4 +1,3 @@
-import ntplib
 import logging
 import os
 from datetime import datetime, timezone
@@ -31,6 +30,8 @@ class TimeService:
         Checks system clock against multiple NTP servers.
         Returns (offset, is_safe)
         """
+        import ntplib  # only the startup clock check needs it
+
         client = ntplib.NTPClient()
         
         for server in self.ntp_servers:
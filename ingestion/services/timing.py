@@ -0,0 +1,167 @@
+"""
+Stage Timing
+
+Records how long each controller stage takes (control loop, schedule update,
+health check, every Shelly/Tuya/Octopus/Supabase call) into per-stage rolling
+windows, so an overrunning 60 s loop can be attributed to a stage.
+
+    with timings.span("octopus.rates"):
+        ...
+
+    @timed("shelly.set_relay")
+    def set_relay(...):
+        ...
+
+summary() reports count and p50/p95/max over the last WINDOW samples per
+stage; the controller exposes it through get_state() and logs it
+periodically. Between open_trace() and close_trace() every span is also
+written as a Chrome trace event (load the file in chrome://tracing or
+Perfetto); the controller traces to Config.TIMING_TRACE_FILE while it runs.
+"""
+
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+
+class StageTimings:
+    """Thread-safe rolling duration samples per stage name."""
+
+    WINDOW = 500
+    TRACE_FLUSH_EVENTS = 200
+
+    def __init__(self, clock=None):
+        self._clock = clock or time.perf_counter
+        self._lock = threading.Lock()
+        self._samples = {}
+        self._counts = {}
+        # _trace_lock serialises the trace file's writes, open and close;
+        # record() only takes _lock to buffer an event.
+        self._trace_lock = threading.Lock()
+        self._trace = None
+        self._trace_events = []
+
+    @contextmanager
+    def span(self, stage):
+        started = self._clock()
+        try:
+            yield
+        finally:
+            self.record(stage, self._clock() - started, started)
+
+    def timed(self, stage):
+        """Decorator form of span()."""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.span(stage):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def record(self, stage, seconds, started=None):
+        with self._lock:
+            samples = self._samples.get(stage)
+            if samples is None:
+                samples = self._samples[stage] = deque(maxlen=self.WINDOW)
+            samples.append(seconds)
+            self._counts[stage] = self._counts.get(stage, 0) + 1
+            if self._trace is not None:
+                self._trace_events.append({
+                    "name": stage,
+                    "ph": "X",
+                    "ts": round((started if started is not None else self._clock() - seconds) * 1e6),
+                    "dur": round(seconds * 1e6),
+                    "pid": os.getpid(),
+                    "tid": threading.get_ident(),
+                })
+                flush = len(self._trace_events) >= self.TRACE_FLUSH_EVENTS
+            else:
+                flush = False
+        if flush:
+            self.flush_trace()
+
+    def summary(self):
+        """Returns {stage: {count, last_ms, p50_ms, p95_ms, max_ms}} over each stage's window."""
+        with self._lock:
+            snapshot = {stage: (list(samples), self._counts[stage]) for stage, samples in self._samples.items()}
+
+        result = {}
+        for stage, (samples, count) in sorted(snapshot.items()):
+            ordered = sorted(samples)
+            result[stage] = {
+                "count": count,
+                "last_ms": round(samples[-1] * 1000, 1),
+                "p50_ms": round(ordered[len(ordered) // 2] * 1000, 1),
+                "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 1),
+                "max_ms": round(ordered[-1] * 1000, 1),
+            }
+        return result
+
+    def log_summary(self):
+        summary = self.summary()
+        if summary:
+            logger.info(
+                "Stage timings (p50/p95/max ms): %s",
+                ", ".join(
+                    f"{stage} {stats['p50_ms']:g}/{stats['p95_ms']:g}/{stats['max_ms']:g} (n={stats['count']})"
+                    for stage, stats in summary.items()
+                ),
+            )
+        self.flush_trace()
+
+    def open_trace(self, path):
+        """Start appending every span to path. Returns False if the file cannot be opened."""
+        self.close_trace()
+        with self._trace_lock:
+            try:
+                trace = open(path, "a", encoding="utf-8")
+                # The trace-event format accepts an array with no closing bracket.
+                if trace.tell() == 0:
+                    trace.write("[\n")
+            except OSError as e:
+                logger.error(f"Failed to open timing trace {path}: {e}")
+                return False
+            with self._lock:
+                self._trace = trace
+        return True
+
+    def flush_trace(self):
+        """Append buffered spans to the trace file as a Chrome trace event array."""
+        with self._trace_lock:
+            with self._lock:
+                events, self._trace_events = self._trace_events, []
+                trace = self._trace
+            if trace is None or not events:
+                return
+            try:
+                trace.writelines(json.dumps(event) + ",\n" for event in events)
+                trace.flush()
+            except OSError as e:
+                logger.error(f"Failed to write timing trace {trace.name}: {e}")
+
+    def close_trace(self):
+        """Write any buffered spans and close the trace file."""
+        self.flush_trace()
+        with self._trace_lock:
+            with self._lock:
+                trace, self._trace = self._trace, None
+                self._trace_events = []
+            if trace is not None:
+                try:
+                    trace.close()
+                except OSError as e:
+                    logger.error(f"Failed to close timing trace {trace.name}: {e}")
+
+
+# Process-wide instance shared by the controller and its device clients.
+timings = StageTimings()
+span = timings.span
+timed = timings.timed
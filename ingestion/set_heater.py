@@ -1,4 +1,5 @@
 import argparse
+import logging
 
 from config import Config
 from services.shelly_manager import ShellyManager
@@ -77,4 +78,5 @@ def main():
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
     raise SystemExit(main())
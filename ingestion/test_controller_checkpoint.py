@@ -0,0 +1,176 @@
+import sqlite3
+import sys
+import tempfile
+import types
+import unittest
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+try:
+    import requests  # noqa: F401
+except ModuleNotFoundError:
+    sys.modules["requests"] = types.ModuleType("requests")
+
+from services.controller_checkpoint import ControllerCheckpoint
+from services.heat_demand import HeatDemandModel
+
+
+class ControllerCheckpointTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = Path(self.directory.name) / "checkpoint.sqlite3"
+        self.now = 1_800_000_000.0
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def make_checkpoint(self):
+        return ControllerCheckpoint(self.path, clock=lambda: self.now)
+
+    def test_state_round_trips_with_datetimes_and_dates(self):
+        start = datetime(2026, 8, 11, 1, tzinfo=timezone.utc)
+        state = {
+            "cooldown_until": start + timedelta(minutes=90),
+            "main_heater_slots": [{"valid_from": start, "valid_to": start + timedelta(minutes=30), "value_inc_vat": 4.2}],
+            "observed_days": {date(2026, 8, 10), date(2026, 8, 9)},
+        }
+
+        self.assertTrue(self.make_checkpoint().save(state))
+        self.now += 30
+        restored, age = self.make_checkpoint().load(max_age_seconds=60)
+
+        self.assertEqual(age, 30)
+        self.assertEqual(restored["cooldown_until"], state["cooldown_until"])
+        self.assertEqual(restored["main_heater_slots"], state["main_heater_slots"])
+        self.assertEqual(restored["observed_days"], [date(2026, 8, 9), date(2026, 8, 10)])
+
+    def test_later_save_replaces_the_checkpoint(self):
+        checkpoint = self.make_checkpoint()
+        checkpoint.save({"low_power_count": 1})
+        checkpoint.save({"low_power_count": 2})
+
+        self.assertEqual(checkpoint.load(max_age_seconds=60)[0], {"low_power_count": 2})
+        with sqlite3.connect(self.path) as connection:
+            self.assertEqual(connection.execute("select count(*) from controller_checkpoint").fetchone()[0], 1)
+
+    def test_stale_future_or_missing_checkpoints_are_ignored(self):
+        checkpoint = self.make_checkpoint()
+        self.assertIsNone(checkpoint.load(max_age_seconds=60))
+
+        checkpoint.save({"low_power_count": 1})
+        saved_at = self.now
+        for offset in (61, -3600):
+            with self.subTest(offset=offset):
+                self.now = saved_at + offset
+                self.assertIsNone(checkpoint.load(max_age_seconds=60))
+
+    def test_unwritable_location_disables_checkpointing(self):
+        blocker = Path(self.directory.name) / "file"
+        blocker.write_text("not a directory")
+        checkpoint = ControllerCheckpoint(blocker / "checkpoint.sqlite3")
+
+        self.assertFalse(checkpoint.enabled)
+        self.assertFalse(checkpoint.save({"low_power_count": 1}))
+        self.assertIsNone(checkpoint.load(max_age_seconds=60))
+
+
+class ControllerRestoreTests(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = Path(directory.name) / "checkpoint.sqlite3"
+        self.now = datetime(2026, 8, 11, 1, 15, tzinfo=timezone.utc)
+        self.slot = {
+            "valid_from": datetime(2026, 8, 11, 1, tzinfo=timezone.utc),
+            "valid_to": datetime(2026, 8, 11, 1, 30, tzinfo=timezone.utc),
+            "value_inc_vat": 4.2,
+        }
+
+    def make_controller(self):
+        import main
+
+        controller = main.SmartWaterController.__new__(main.SmartWaterController)
+        controller.checkpoint = ControllerCheckpoint(self.path, clock=lambda: self.now.timestamp())
+        controller.resumed_from_checkpoint = False
+        controller.time_service = types.SimpleNamespace(now=lambda: self.now, get_local_time=lambda: self.now)
+        controller.scheduler = types.SimpleNamespace(
+            current_schedule=[], rolling_history={}, last_rate_check=None, tomorrow_scheduled=False,
+        )
+        controller.heat_demand = HeatDemandModel(heater_kw=3.0, default_hours=5.0, min_hours=2.0, max_hours=8.0)
+        controller.system_state = {
+            "peak_heater": {"online": False, "state": "UNKNOWN", "last_error": None},
+            "off_peak_heater": {"online": False, "state": "UNKNOWN", "last_error": None},
+            "rates": [],
+        }
+        controller.main_heater_slots = []
+        controller.second_heater_slots = []
+        controller.cooldown_until = None
+        controller.low_power_count = 0
+        return controller
+
+    def save(self):
+        controller = self.make_controller()
+        controller.main_heater_slots = [self.slot]
+        controller.scheduler.rolling_history = {self.slot["valid_from"]: self.slot}
+        controller.scheduler.tomorrow_scheduled = True
+        controller.cooldown_until = self.now + timedelta(hours=1)
+        controller.low_power_count = 2
+        controller.system_state["off_peak_heater"].update(online=True, state="ON")
+        controller.heat_demand.estimate_hours = 3.5
+        controller.save_checkpoint()
+
+    def test_fresh_checkpoint_restores_schedule_cooldown_and_heater_state(self):
+        self.save()
+        self.now += timedelta(seconds=60)
+        controller = self.make_controller()
+
+        self.assertTrue(controller.restore_checkpoint())
+
+        self.assertTrue(controller.resumed_from_checkpoint)
+        self.assertEqual(controller.main_heater_slots, [self.slot])
+        self.assertEqual(controller.scheduler.current_schedule, [self.slot])
+        self.assertEqual(controller.scheduler.rolling_history, {self.slot["valid_from"]: self.slot})
+        self.assertTrue(controller.scheduler.tomorrow_scheduled)
+        self.assertEqual(controller.cooldown_until, datetime(2026, 8, 11, 2, 15, tzinfo=timezone.utc))
+        self.assertEqual(controller.low_power_count, 2)
+        self.assertEqual(controller.system_state["off_peak_heater"]["state"], "ON")
+        self.assertEqual(controller.heat_demand.estimate_hours, 3.5)
+
+    def test_stale_checkpoint_keeps_only_the_learned_demand(self):
+        import main
+
+        self.save()
+        self.now += timedelta(minutes=main.Config.CHECKPOINT_MAX_AGE_MINUTES + 1)
+        controller = self.make_controller()
+
+        with self.assertLogs("main", level="INFO"):
+            self.assertFalse(controller.restore_checkpoint())
+
+        self.assertFalse(controller.resumed_from_checkpoint)
+        self.assertEqual(controller.main_heater_slots, [])
+        self.assertIsNone(controller.cooldown_until)
+        self.assertEqual(controller.system_state["off_peak_heater"]["state"], "UNKNOWN")
+        self.assertEqual(controller.heat_demand.estimate_hours, 3.5)
+
+    def test_corrupt_checkpoint_is_ignored(self):
+        controller = self.make_controller()
+        untouched = vars(self.make_controller().heat_demand)
+        for payload in ('{"heat_demand": {"estimate_hours": 7.0}}', "{not json"):
+            with self.subTest(payload=payload):
+                with sqlite3.connect(self.path) as connection:
+                    connection.execute(
+                        "insert or replace into controller_checkpoint values (?, ?, ?, ?)",
+                        (controller.checkpoint.name, 1, self.now.timestamp(), payload),
+                    )
+                connection.close()
+
+                with self.assertLogs(level="ERROR"):
+                    self.assertFalse(controller.restore_checkpoint())
+
+                self.assertFalse(controller.resumed_from_checkpoint)
+                self.assertEqual(controller.main_heater_slots, [])
+                self.assertEqual(vars(controller.heat_demand), untouched)
+
+
+if __name__ == "__main__":
+    unittest.main()
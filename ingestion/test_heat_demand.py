@@ -0,0 +1,253 @@
+import os
+import sys
+import types
+import unittest
+from datetime import date, datetime, timedelta, timezone
+from unittest.mock import patch
+
+try:
+    import requests  # noqa: F401
+except ModuleNotFoundError:
+    sys.modules["requests"] = types.ModuleType("requests")
+
+from services import heat_demand
+from services.heat_demand import HeatDemandModel
+from services.schedule_solver import SCHEDULE_WINDOWS, GreedyWindowSolver, OptimalScheduleSolver, window_index
+from services.smart_scheduler import LocalSlotTime
+
+
+class HeatDemandModelTests(unittest.TestCase):
+    def make_model(self, **kwargs):
+        options = {"heater_kw": 3.0, "default_hours": 5.0, "min_hours": 2.0, "max_hours": 8.0}
+        options.update(kwargs)
+        return HeatDemandModel(**options)
+
+    def test_configured_budget_until_enough_days_are_observed(self):
+        model = self.make_model(min_days=3)
+
+        model.observe_day(date(2026, 8, 10), 6.0)
+        model.observe_day(date(2026, 8, 11), 6.0)
+
+        self.assertEqual(model.budget_hours(), 5.0)
+
+    def test_days_the_tank_filled_pull_the_budget_down(self):
+        model = self.make_model(min_days=1, headroom=0.0)
+
+        for offset in range(10):
+            day = date(2026, 8, 1) + timedelta(days=offset)
+            model.record_cooldown(day)
+            model.observe_day(day, 7.5)  # 2.5h at 3kW
+
+        self.assertEqual(model.budget_hours(), 2.5)
+
+    def test_low_draw_against_schedule_counts_as_a_full_tank(self):
+        model = self.make_model(min_days=1, headroom=0.0)
+
+        # Five hours scheduled but only three drawn: the thermostat opened.
+        model.observe_day(date(2026, 8, 11), 9.0, scheduled_hours=5.0)
+
+        self.assertEqual(model.estimate_hours, 3.0)
+
+    def test_days_that_used_every_slot_probe_upwards(self):
+        model = self.make_model(min_days=1, headroom=0.0)
+
+        model.observe_day(date(2026, 8, 11), 15.0, scheduled_hours=5.0)
+
+        self.assertEqual(model.estimate_hours, 5.0 + HeatDemandModel.PROBE_HOURS)
+
+    def test_budget_is_whole_slots_within_limits(self):
+        model = self.make_model(min_days=1, headroom=0.15)
+
+        model.record_cooldown(date(2026, 8, 11))
+        model.observe_day(date(2026, 8, 11), 9.3)  # 3.1h
+        self.assertEqual(model.budget_hours(), 4.0)
+
+        model.estimate_hours = 20.0
+        self.assertEqual(model.budget_hours(), 8.0)
+
+    def test_each_day_is_observed_once(self):
+        model = self.make_model()
+
+        model.observe_day(date(2026, 8, 11), 6.0)
+        model.observe_day(date(2026, 8, 11), 24.0)
+
+        self.assertEqual(model.days_observed, 1)
+        self.assertEqual(model.estimate_hours, 2.0 + HeatDemandModel.PROBE_HOURS)
+
+    def test_unmeasurable_day_is_retried_only_after_the_retry_interval(self):
+        model = self.make_model()
+        day = date(2026, 8, 11)
+        now = datetime(2026, 8, 12, 16, tzinfo=timezone.utc)
+
+        self.assertTrue(model.should_measure(day, now))
+        model.record_measure_failure(day, now)
+
+        self.assertFalse(model.should_measure(day, now + timedelta(minutes=15)))
+        self.assertTrue(model.should_measure(day, now + HeatDemandModel.MEASURE_RETRY))
+        self.assertTrue(model.should_measure(day + timedelta(days=1), now + timedelta(minutes=15)))
+
+        model.observe_day(day, 6.0)
+        self.assertFalse(model.should_measure(day, now + HeatDemandModel.MEASURE_RETRY))
+
+    def test_learned_two_hour_budget_buys_fewer_slots_than_four_hours(self):
+        model = self.make_model(min_days=1, headroom=0.0)
+        for offset in range(10):
+            day = date(2026, 8, 1) + timedelta(days=offset)
+            model.record_cooldown(day)
+            model.observe_day(day, 6.0)  # 2h at 3kW
+        self.assertEqual(model.budget_hours(), 2.0)
+
+        start = datetime(2026, 8, 11, tzinfo=timezone.utc)
+        rates = [
+            {
+                "valid_from": start + timedelta(minutes=30 * index),
+                "valid_to": start + timedelta(minutes=30 * (index + 1)),
+                "value_inc_vat": 10.0,
+            }
+            for index in range(48)
+        ]
+
+        def local_time(slot):
+            return LocalSlotTime(slot["valid_from"].date(), slot["valid_from"].hour, slot["valid_from"].minute)
+
+        for solver in (GreedyWindowSolver(scale_minimums=True), OptimalScheduleSolver()):
+            with self.subTest(solver=solver.name):
+                learned = solver.select(rates, local_time, int(model.budget_hours() * 2), 30.0)
+                configured = solver.select(rates, local_time, int(4.0 * 2), 30.0)
+
+                self.assertEqual(len(learned), 4)
+                self.assertLess(len(learned), len(configured))
+
+    def test_windows_are_learned_from_their_own_energy(self):
+        model = self.make_model(min_days=2, headroom=0.0)
+        for offset in range(10):
+            model.observe_windows(date(2026, 8, 1) + timedelta(days=offset), {
+                # 2h scheduled, 1h drawn: the thermostat opened.
+                "morning": (3.0, 2.0),
+                # Every scheduled slot drew power: probe upwards.
+                "afternoon": (3.0, 1.0),
+                # Nothing scheduled says nothing about demand.
+                "evening": (0.0, 0.0),
+            })
+
+        self.assertEqual(model.window_days_observed, 10)
+        self.assertEqual(model.window_estimates["morning"], 1.0)
+        self.assertNotIn("evening", model.window_estimates)
+        # Morning drops to 2 slots; afternoon stays at its configured 2
+        # (1.5h learned); evening keeps its configured minimum.
+        self.assertEqual(model.window_slots(SCHEDULE_WINDOWS), [2, 2, 2])
+
+    def test_window_slots_wait_for_enough_days(self):
+        model = self.make_model(min_days=3)
+
+        model.observe_windows(date(2026, 8, 1), {"morning": (0.3, 2.0)})
+        model.observe_windows(date(2026, 8, 2), {"morning": (None, 2.0)})
+
+        self.assertEqual(model.window_days_observed, 1)
+        self.assertIsNone(model.window_slots(SCHEDULE_WINDOWS))
+
+    def test_learned_window_slots_lower_the_solvers_window_minimums(self):
+        start = datetime(2026, 8, 11, tzinfo=timezone.utc)
+        rates = [
+            {
+                "valid_from": start + timedelta(minutes=30 * index),
+                "valid_to": start + timedelta(minutes=30 * (index + 1)),
+                # Windows are dearer than the rest of the day.
+                "value_inc_vat": 20.0 if window_index(LocalSlotTime(None, index // 2, index % 2 * 30)) is not None else 10.0,
+            }
+            for index in range(48)
+        ]
+
+        def local_time(slot):
+            return LocalSlotTime(slot["valid_from"].date(), slot["valid_from"].hour, slot["valid_from"].minute)
+
+        def window_counts(selected):
+            counts = [0] * len(SCHEDULE_WINDOWS)
+            for slot in selected:
+                index = window_index(local_time(slot))
+                if index is not None:
+                    counts[index] += 1
+            return counts
+
+        for solver in (GreedyWindowSolver(), OptimalScheduleSolver()):
+            with self.subTest(solver=solver.name):
+                selected = solver.select(rates, local_time, 8, 30.0, learned_minimums=[2, 1, 2])
+
+                self.assertEqual(len(selected), 8)
+                self.assertEqual(window_counts(selected), [2, 1, 2])
+                self.assertEqual(window_counts(solver.select(rates, local_time, 8, 30.0)), [4, 2, 2])
+
+
+class ControllerWindowEnergyTests(unittest.TestCase):
+    def test_each_scheduled_window_is_metered_over_its_local_bounds(self):
+        import pytz
+
+        import main
+
+        controller = main.SmartWaterController.__new__(main.SmartWaterController)
+        controller.time_service = types.SimpleNamespace(timezone=pytz.timezone("Europe/London"))
+        calls = []
+        controller.energy_reader = types.SimpleNamespace(
+            energy_kwh=lambda start, end: calls.append((start, end)) or 1.5,
+        )
+        day = date(2026, 8, 11)  # BST: local = UTC + 1
+        slot_start = datetime(2026, 8, 11, 3, tzinfo=timezone.utc)  # 04:00 local
+        slots = [
+            {"valid_from": slot_start, "valid_to": slot_start + timedelta(minutes=30)},
+            {"valid_from": slot_start + timedelta(minutes=30), "valid_to": slot_start + timedelta(hours=1)},
+            {"valid_from": slot_start + timedelta(hours=15), "valid_to": slot_start + timedelta(hours=15, minutes=30)},
+        ]
+
+        windows = controller._window_energy(day, slots)
+
+        self.assertEqual(windows, {"morning": (1.5, 1.0), "evening": (1.5, 0.5)})
+        self.assertEqual(calls, [
+            (datetime(2026, 8, 10, 23, tzinfo=timezone.utc), datetime(2026, 8, 11, 5, tzinfo=timezone.utc)),
+            (datetime(2026, 8, 11, 18, tzinfo=timezone.utc), datetime(2026, 8, 11, 22, 30, tzinfo=timezone.utc)),
+        ])
+
+
+class EnergyCounterReaderTests(unittest.TestCase):
+    def make_reader(self):
+        with patch.dict(
+            os.environ,
+            {"SUPABASE_URL": "https://example.supabase.co", "SUPABASE_KEY": "secret"},
+        ):
+            return heat_demand.EnergyCounterReader("meter-1", 1)
+
+    def energy_between(self, first_wh, last_wh):
+        reader = self.make_reader()
+        responses = [
+            types.SimpleNamespace(status_code=200, text="", json=lambda rows=rows: rows)
+            for rows in (first_wh, last_wh)
+        ]
+        start = datetime(2026, 8, 10, 23, tzinfo=timezone.utc)
+        with patch.object(heat_demand.requests, "get", side_effect=responses, create=True) as get_mock:
+            result = reader.energy_kwh(start, start + timedelta(days=1))
+        return result, get_mock
+
+    def test_energy_is_the_counter_delta_between_first_and_last_reading(self):
+        result, get_mock = self.energy_between(
+            [{"energy_total_wh": 120000.0}],
+            [{"energy_total_wh": 129500.0}],
+        )
+
+        self.assertEqual(result, 9.5)
+        self.assertEqual(get_mock.call_count, 2)
+        url = get_mock.call_args_list[0].args[0]
+        self.assertIn("device_id=eq.meter-1", url)
+        self.assertIn("channel=eq.1", url)
+        self.assertIn("limit=1", url)
+
+    def test_counter_reset_or_missing_readings_are_unmeasurable(self):
+        for first, last in (
+            ([{"energy_total_wh": 5000.0}], [{"energy_total_wh": 100.0}]),
+            ([], []),
+        ):
+            with self.subTest(first=first, last=last):
+                result, _ = self.energy_between(first, last)
+                self.assertIsNone(result)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+INGESTION_DIR = Path(__file__).resolve().parent
+ENTRY_POINTS = ("main", "set_heater")
+
+# Backends and controller-only services that must only be imported when they
+# are used.
+DEFERRED_MODULES = {
+    "tinytuya",
+    "ntplib",
+    "schedule",
+    "services.controller_checkpoint",
+    "services.startup",
+    "services.status_server",
+}
+
+# Optional cumulative import time budget for each entry point, in
+# milliseconds (main takes about 115 ms here). Wall-clock time varies too much
+# between runners to check by default; set IMPORT_TIME_BUDGET_MS to enable it.
+IMPORT_TIME_BUDGET_MS = os.getenv("IMPORT_TIME_BUDGET_MS")
+
+IMPORTED_MODULES = "import json, sys; import {module}; print(json.dumps(sorted(sys.modules)))"
+
+
+class ImportTimeTests(unittest.TestCase):
+    def run_python(self, *args):
+        """Run Python in a fresh interpreter; fails the test with stderr's tail if it exits non-zero."""
+        # Run outside the package so main's log file lands in a scratch directory.
+        with tempfile.TemporaryDirectory() as scratch:
+            completed = subprocess.run(
+                [sys.executable, *args],
+                cwd=scratch,
+                env={**os.environ, "PYTHONPATH": str(INGESTION_DIR)},
+                capture_output=True,
+                text=True,
+                timeout=60,
+            )
+        if completed.returncode != 0:
+            self.fail(f"python {' '.join(args)} exited {completed.returncode}:\n"
+                      + "\n".join(completed.stderr.strip().splitlines()[-10:]))
+        return completed
+
+    def test_entry_points_do_not_import_deferred_modules(self):
+        for module in ENTRY_POINTS:
+            with self.subTest(module=module):
+                completed = self.run_python("-c", IMPORTED_MODULES.format(module=module))
+                imported = set(json.loads(completed.stdout.strip().splitlines()[-1]))
+
+                self.assertIn(module, imported)
+                self.assertEqual(DEFERRED_MODULES & imported, set())
+
+    @unittest.skipUnless(IMPORT_TIME_BUDGET_MS, "set IMPORT_TIME_BUDGET_MS to check import time")
+    def test_entry_points_import_within_budget(self):
+        for module in ENTRY_POINTS:
+            with self.subTest(module=module):
+                self.run_python("-c", f"import {module}")  # warm the bytecode cache
+                completed = self.run_python("-X", "importtime", "-c", f"import {module}")
+
+                timings = {}
+                for line in completed.stderr.splitlines():
+                    if not line.startswith("import time:") or "|" not in line:
+                        continue
+                    _, cumulative, name = line.split("|")
+                    if cumulative.strip().isdigit():
+                        timings[name.strip()] = int(cumulative)
+                self.assertLess(timings[module] / 1000, float(IMPORT_TIME_BUDGET_MS))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import io
+import json
+import logging
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from services.log_setup import configure_logging
+
+
+class ConfigureLoggingTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.log_file = Path(self.directory.name) / "controller.log"
+        root = logging.getLogger()
+        self.saved = (list(root.handlers), root.level)
+        # The console handler writes to sys.stderr as it was when configured.
+        stderr = patch("sys.stderr", new_callable=io.StringIO)
+        self.console = stderr.start()
+        self.addCleanup(stderr.stop)
+
+    def tearDown(self):
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        handlers, level = self.saved
+        for handler in handlers:
+            root.addHandler(handler)
+        root.setLevel(level)
+        self.directory.cleanup()
+
+    def test_json_records_carry_structured_fields(self):
+        listener = configure_logging(self.log_file, log_format="json")
+        logger = logging.getLogger("controller-test")
+
+        logger.info("Logged %s channel rows", 2, extra={"poll_id": "abc", "channel": 1})
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            logger.exception("Poll failed")
+        listener.stop()
+
+        records = [json.loads(line) for line in self.log_file.read_text(encoding="utf-8").splitlines()]
+        self.assertEqual(records[0]["msg"], "Logged 2 channel rows")
+        self.assertEqual(records[0]["poll_id"], "abc")
+        self.assertEqual(records[0]["channel"], 1)
+        self.assertEqual(records[0]["logger"], "controller-test")
+        self.assertNotIn("slot", records[0])
+        self.assertIn("ValueError: boom", records[1]["exc"])
+        self.assertEqual(json.loads(self.console.getvalue().splitlines()[0])["msg"], "Logged 2 channel rows")
+
+    def test_log_file_rotates_by_size(self):
+        listener = configure_logging(self.log_file, max_bytes=200, backup_count=2)
+        logger = logging.getLogger("controller-test")
+
+        for index in range(20):
+            logger.info("control loop pass %s", index)
+        listener.stop()
+
+        self.assertTrue(self.log_file.with_name("controller.log.1").exists())
+        self.assertFalse(self.log_file.with_name("controller.log.3").exists())
+        self.assertLess(self.log_file.stat().st_size, 200)
+
+
+if __name__ == "__main__":
+    unittest.main()
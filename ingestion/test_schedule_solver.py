@@ -0,0 +1,212 @@
+import itertools
+import unittest
+from datetime import datetime, timedelta, timezone
+
+from services.schedule_solver import (
+    MIN_BUDGET_SLOTS,
+    SCHEDULE_WINDOWS,
+    GreedyWindowSolver,
+    OptimalScheduleSolver,
+    RollingHorizonSolver,
+    build_solver,
+    window_index,
+    window_minimums,
+)
+from services.smart_scheduler import LocalSlotTime
+
+
+DAY_START = datetime(2026, 8, 11, tzinfo=timezone.utc)
+
+
+def day_rates(prices):
+    """Half-hourly rates whose UTC clock doubles as the local clock."""
+    rates = []
+    for index, price in enumerate(prices):
+        start = DAY_START + timedelta(minutes=30 * index)
+        rates.append({
+            "valid_from": start,
+            "valid_to": start + timedelta(minutes=30),
+            "value_inc_vat": price,
+        })
+    return rates
+
+
+def local_time(slot):
+    start = slot["valid_from"]
+    return LocalSlotTime(start.date(), start.hour, start.minute)
+
+
+def starts(selected):
+    runs = 0
+    previous_end = None
+    for slot in sorted(selected, key=lambda s: s["valid_from"]):
+        if slot["valid_from"] != previous_end:
+            runs += 1
+        previous_end = slot["valid_to"]
+    return runs
+
+
+def window_counts(selected):
+    counts = [0, 0, 0]
+    for slot in selected:
+        index = window_index(local_time(slot))
+        if index is not None:
+            counts[index] += 1
+    return counts
+
+
+def cost(selected):
+    return sum(slot["value_inc_vat"] for slot in selected)
+
+
+class OptimalScheduleSolverTests(unittest.TestCase):
+    def test_meets_window_minimums_and_budget_at_lowest_cost(self):
+        prices = [20.0 - (index % 12) for index in range(48)]
+        rates = day_rates(prices)
+
+        selected = OptimalScheduleSolver().select(rates, local_time, 12, 30.0)
+
+        self.assertEqual(len(selected), 12)
+        self.assertEqual(window_counts(selected), [4, 2, 2])
+        greedy = GreedyWindowSolver().select(rates, local_time, 12, 30.0)
+        self.assertLessEqual(cost(selected), cost(greedy))
+
+    def test_start_cap_trades_price_for_contiguity(self):
+        # Cheap slots alternate with slightly dearer ones through the night.
+        prices = [5.0 if index % 2 else 6.0 for index in range(12)] + [25.0] * 36
+        rates = day_rates(prices)
+
+        uncapped = OptimalScheduleSolver().select(rates, local_time, 8, 30.0)
+        capped = OptimalScheduleSolver(max_starts=3).select(rates, local_time, 8, 30.0)
+
+        self.assertGreater(starts(uncapped), 3)
+        self.assertLessEqual(starts(capped), 3)
+        self.assertEqual(window_counts(capped), [4, 2, 2])
+        self.assertGreaterEqual(cost(capped), cost(uncapped))
+
+    def test_fill_slots_respect_strict_threshold(self):
+        rates = day_rates([10.0] * 48)
+
+        selected = OptimalScheduleSolver().select(rates, local_time, 20, 9.0)
+
+        # Only the window minimums may exceed the strict threshold.
+        self.assertEqual(len(selected), 8)
+        self.assertEqual(window_counts(selected), [4, 2, 2])
+
+    def test_matches_brute_force_on_small_days(self):
+        # Six overnight slots, all inside the morning window.
+        rates = day_rates([7.0, 3.0, 9.0, 1.0, 4.0, 8.0])
+
+        for budget, max_starts in itertools.product(range(1, 7), (None, 1, 2)):
+            with self.subTest(budget=budget, max_starts=max_starts):
+                selected = OptimalScheduleSolver(max_starts=max_starts).select(rates, local_time, budget, 30.0)
+
+                size = max(budget, window_minimums(budget)[0])
+                best = min(
+                    cost(combo)
+                    for combo in itertools.combinations(rates, size)
+                    if max_starts is None or starts(combo) <= max_starts
+                )
+                self.assertEqual(len(selected), size)
+                self.assertEqual(cost(selected), best)
+
+    def test_budget_below_window_minimums_scales_them_down(self):
+        rates = day_rates([10.0] * 48)
+
+        for solver in (GreedyWindowSolver(scale_minimums=True), OptimalScheduleSolver()):
+            with self.subTest(solver=solver.name):
+                selected = solver.select(rates, local_time, 4, 30.0)
+
+                self.assertEqual(len(selected), 4)
+                self.assertEqual(window_counts(selected), [2, 1, 1])
+
+    def test_greedy_keeps_fixed_window_minimums_by_default(self):
+        rates = day_rates([10.0] * 48)
+
+        selected = GreedyWindowSolver().select(rates, local_time, 4, 30.0)
+
+        self.assertEqual(window_counts(selected), [4, 2, 2])
+
+    def test_infeasible_start_cap_returns_none(self):
+        rates = day_rates([10.0] * 48)
+
+        self.assertIsNone(OptimalScheduleSolver(max_starts=2).select(rates, local_time, 8, 30.0))
+
+    def test_build_solver_defaults_to_greedy(self):
+        self.assertIsInstance(build_solver("greedy"), GreedyWindowSolver)
+        self.assertIsInstance(build_solver("unknown"), GreedyWindowSolver)
+        self.assertFalse(build_solver("greedy").scale_minimums)
+        self.assertTrue(build_solver("greedy", scale_minimums=True).scale_minimums)
+        solver = build_solver("optimal", max_starts=3)
+        self.assertIsInstance(solver, OptimalScheduleSolver)
+        self.assertEqual(solver.max_starts, 3)
+
+
+class WindowMinimumsTests(unittest.TestCase):
+    def test_full_minimums_once_the_budget_covers_them(self):
+        self.assertEqual(window_minimums(8), [4, 2, 2])
+        self.assertEqual(window_minimums(12), [4, 2, 2])
+
+    def test_smaller_budgets_share_the_minimums(self):
+        for budget in range(3, 8):
+            with self.subTest(budget=budget):
+                minimums = window_minimums(budget)
+                self.assertEqual(sum(minimums), budget)
+                self.assertTrue(all(1 <= minimum <= window[3] for minimum, window in zip(minimums, SCHEDULE_WINDOWS)))
+        self.assertEqual(window_minimums(4), [2, 1, 1])
+
+    def test_every_window_keeps_one_slot(self):
+        self.assertEqual(window_minimums(1), [1] * MIN_BUDGET_SLOTS)
+
+
+class RollingHorizonSolverTests(unittest.TestCase):
+    def select(self, prices, target, max_gap_slots, eligible=None, **kwargs):
+        horizon = day_rates(prices)
+        eligible_ids = {
+            slot["valid_from"] for index, slot in enumerate(horizon)
+            if eligible is None or index in eligible
+        }
+        return horizon, RollingHorizonSolver(max_gap_slots).select(horizon, eligible_ids, target, **kwargs)
+
+    def test_picks_cheapest_slots_when_gap_allows(self):
+        horizon, selected = self.select([9.0, 1.0, 9.0, 9.0, 2.0, 9.0], 2, 6)
+
+        self.assertEqual(selected, [horizon[1], horizon[4]])
+
+    def test_gap_cap_forces_heat_between_cheap_slots(self):
+        prices = [1.0] + [10.0] * 8 + [1.0]
+
+        horizon, selected = self.select(prices, 2, 4)
+
+        gaps = []
+        previous_end = horizon[0]["valid_from"]
+        for slot in selected:
+            gaps.append((slot["valid_from"] - previous_end) / timedelta(minutes=30))
+            previous_end = slot["valid_to"]
+        gaps.append((horizon[-1]["valid_to"] - previous_end) / timedelta(minutes=30))
+        self.assertLessEqual(max(gaps), 4)
+
+    def test_initial_gap_carries_over_from_previous_plan(self):
+        horizon, selected = self.select([5.0, 5.0, 1.0, 1.0], 1, 2, initial_gap=2)
+
+        self.assertEqual(selected[0], horizon[0])
+
+    def test_forced_slot_stays_selected(self):
+        horizon = day_rates([9.0, 1.0, 1.0])
+        selected = RollingHorizonSolver(6).select(
+            horizon,
+            {slot["valid_from"] for slot in horizon},
+            1,
+            forced_ids={horizon[0]["valid_from"]},
+        )
+
+        self.assertIn(horizon[0], selected)
+
+    def test_unreachable_gap_returns_none(self):
+        _, selected = self.select([1.0] * 6, 1, 2, eligible={0})
+
+        self.assertIsNone(selected)
+
+
+if __name__ == "__main__":
+    unittest.main()
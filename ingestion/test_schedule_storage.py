@@ -1,5 +1,6 @@
 import os
 import sys
+import time
 import types
 import unittest
 from datetime import datetime, timedelta, timezone
@@ -13,21 +14,27 @@ except ModuleNotFoundError:
 from services import schedule_storage
 
 
-class ScheduleStorageReplacementTests(unittest.TestCase):
-    def make_storage(self):
-        with patch.dict(
-            os.environ,
-            {"SUPABASE_URL": "https://example.supabase.co", "SUPABASE_KEY": "secret"},
-        ):
-            return schedule_storage.ScheduleStorage()
+def make_storage():
+    with patch.dict(
+        os.environ,
+        {"SUPABASE_URL": "https://example.supabase.co", "SUPABASE_KEY": "secret"},
+    ):
+        return schedule_storage.ScheduleStorage()
+
+
+def slot(hour, price=4.2):
+    start = datetime(2026, 8, 11, hour, tzinfo=timezone.utc)
+    return {"valid_from": start, "valid_to": start + timedelta(minutes=30), "value_inc_vat": price}
 
+
+class ScheduleStorageReplacementTests(unittest.TestCase):
     def test_zero_slot_replacement_succeeds_only_after_successful_delete(self):
         replace_from = datetime(2026, 8, 11, tzinfo=timezone.utc)
         replace_to = replace_from + timedelta(days=1)
 
         for status_code, expected in ((204, True), (500, False)):
             with self.subTest(status_code=status_code):
-                storage = self.make_storage()
+                storage = make_storage()
                 response = types.SimpleNamespace(status_code=status_code, text="delete result")
                 with (
                     patch.object(schedule_storage.requests, "delete", return_value=response, create=True) as delete_mock,
@@ -45,13 +52,8 @@ class ScheduleStorageReplacementTests(unittest.TestCase):
                 post_mock.assert_not_called()
 
     def test_failed_delete_returns_false_without_posting_replacement_slots(self):
-        storage = self.make_storage()
-        slot_start = datetime(2026, 8, 11, 1, tzinfo=timezone.utc)
-        slots = [{
-            "valid_from": slot_start,
-            "valid_to": slot_start + timedelta(minutes=30),
-            "value_inc_vat": 4.2,
-        }]
+        storage = make_storage()
+        slots = [slot(1)]
         response = types.SimpleNamespace(status_code=503, text="unavailable")
 
         with (
@@ -64,5 +66,202 @@ class ScheduleStorageReplacementTests(unittest.TestCase):
         post_mock.assert_not_called()
 
 
+class ScheduleStorageAtomicReplaceTests(unittest.TestCase):
+    def schedules(self):
+        return {"off_peak": [slot(1)], "peak": []}
+
+    def test_both_heater_types_are_replaced_in_one_rpc_call(self):
+        storage = make_storage()
+        replace_from = datetime(2026, 8, 10, 23, tzinfo=timezone.utc)
+        replace_to = replace_from + timedelta(days=2)
+        response = types.SimpleNamespace(
+            status_code=200,
+            text="",
+            json=lambda: {"deleted": 1, "written": 1, "unchanged": 0},
+        )
+
+        with (
+            patch.object(schedule_storage.requests, "post", return_value=response, create=True) as post_mock,
+            patch.object(schedule_storage.requests, "delete", create=True) as delete_mock,
+        ):
+            result = storage.replace_schedules(self.schedules(), replace_from, replace_to)
+
+        self.assertTrue(result)
+        delete_mock.assert_not_called()
+        post_mock.assert_called_once()
+        self.assertTrue(post_mock.call_args.args[0].endswith("/rest/v1/rpc/replace_heating_schedule"))
+        payload = post_mock.call_args.kwargs["json"]
+        self.assertEqual(payload["p_replace_from"], "2026-08-10T23:00:00+00:00")
+        self.assertEqual(payload["p_replace_to"], "2026-08-12T23:00:00+00:00")
+        self.assertTrue(payload["p_diff"])
+        self.assertEqual(payload["p_schedules"]["peak"], [])
+        self.assertEqual(payload["p_schedules"]["off_peak"], [{
+            "slot_start": "2026-08-11T01:00:00+00:00",
+            "slot_end": "2026-08-11T01:30:00+00:00",
+            "price": 4.2,
+        }])
+
+    def test_missing_rpc_falls_back_to_per_heater_replacement(self):
+        storage = make_storage()
+        replace_from = datetime(2026, 8, 10, 23, tzinfo=timezone.utc)
+        response = types.SimpleNamespace(status_code=404, text="PGRST202")
+
+        with (
+            patch.object(schedule_storage.requests, "post", return_value=response, create=True),
+            patch.object(storage, "save_schedule", return_value=True) as save_mock,
+        ):
+            result = storage.replace_schedules(self.schedules(), replace_from, replace_from + timedelta(days=2))
+
+        self.assertTrue(result)
+        self.assertEqual(
+            [call.kwargs["heater_type"] for call in save_mock.call_args_list],
+            ["off_peak", "peak"],
+        )
+
+    def test_rejected_replacement_reports_failure(self):
+        storage = make_storage()
+        replace_from = datetime(2026, 8, 10, 23, tzinfo=timezone.utc)
+        response = types.SimpleNamespace(status_code=400, text="slot lies outside the replace window")
+
+        with patch.object(schedule_storage.requests, "post", return_value=response, create=True):
+            result = storage.replace_schedules(self.schedules(), replace_from, replace_from + timedelta(days=2))
+
+        self.assertFalse(result)
+
+
+class ScheduleStorageWriteSuppressionTests(unittest.TestCase):
+    def test_identical_replacement_skips_the_network(self):
+        storage = make_storage()
+        replace_from = datetime(2026, 8, 10, 23, tzinfo=timezone.utc)
+        replace_to = replace_from + timedelta(days=2)
+        response = types.SimpleNamespace(status_code=200, text="", json=lambda: {})
+
+        with patch.object(schedule_storage.requests, "post", return_value=response, create=True) as post_mock:
+            storage.replace_schedules({"off_peak": [slot(1)], "peak": []}, replace_from, replace_to)
+            # Recomputed with fresh dicts, in a different order.
+            storage.replace_schedules({"peak": [], "off_peak": [dict(slot(1))]}, replace_from, replace_to)
+            storage.replace_schedules({"off_peak": [slot(1)], "peak": [slot(2, -1.0)]}, replace_from, replace_to)
+
+        self.assertEqual(post_mock.call_count, 2)
+        self.assertEqual(list(post_mock.call_args.kwargs["json"]["p_schedules"]), ["peak"])
+        self.assertEqual(storage.stats, {"writes": 2, "skipped": 1})
+
+    def test_failed_write_is_not_remembered(self):
+        storage = make_storage()
+        replace_from = datetime(2026, 8, 10, 23, tzinfo=timezone.utc)
+        replace_to = replace_from + timedelta(days=2)
+        responses = [
+            types.SimpleNamespace(status_code=503, text="unavailable"),
+            types.SimpleNamespace(status_code=200, text="", json=lambda: {}),
+        ]
+
+        with patch.object(schedule_storage.requests, "post", side_effect=responses, create=True) as post_mock:
+            self.assertFalse(storage.replace_schedules({"off_peak": [slot(1)]}, replace_from, replace_to))
+            self.assertTrue(storage.replace_schedules({"off_peak": [slot(1)]}, replace_from, replace_to))
+
+        self.assertEqual(post_mock.call_count, 2)
+
+    def test_legacy_save_only_touches_changed_rows(self):
+        storage = make_storage()
+        replace_from = datetime(2026, 8, 10, 23, tzinfo=timezone.utc)
+        replace_to = replace_from + timedelta(days=2)
+        ok_delete = types.SimpleNamespace(status_code=204, text="")
+        ok_insert = types.SimpleNamespace(status_code=201, text="")
+
+        with (
+            patch.object(schedule_storage.requests, "delete", return_value=ok_delete, create=True) as delete_mock,
+            patch.object(schedule_storage.requests, "post", return_value=ok_insert, create=True) as post_mock,
+        ):
+            storage.save_schedule([slot(1), slot(2)], "off_peak", replace_from, replace_to)
+            storage.save_schedule([slot(1), slot(3)], "off_peak", replace_from, replace_to)
+
+        self.assertIn("slot_start=gte.", delete_mock.call_args_list[0].args[0])
+        self.assertIn("slot_start=in.(2026-08-11T02:00:00Z)", delete_mock.call_args_list[1].args[0])
+        inserted = post_mock.call_args_list[1].kwargs["json"]
+        self.assertEqual([row["slot_start"] for row in inserted], ["2026-08-11T03:00:00+00:00"])
+
+
+class ScheduleStorageReadCacheTests(unittest.TestCase):
+    def write_window(self, storage):
+        replace_from = datetime(2026, 8, 10, 23, tzinfo=timezone.utc)
+        replace_to = replace_from + timedelta(days=2)
+        response = types.SimpleNamespace(status_code=200, text="", json=lambda: {})
+        with patch.object(schedule_storage.requests, "post", return_value=response, create=True):
+            storage.replace_schedules(
+                {"off_peak": [slot(3), slot(1), slot(5)], "peak": []},
+                replace_from,
+                replace_to,
+            )
+        return replace_from, replace_to
+
+    def test_reads_inside_a_written_window_skip_the_network(self):
+        storage = make_storage()
+        self.write_window(storage)
+
+        with patch.object(schedule_storage.requests, "get", create=True) as get_mock:
+            rows = storage.get_schedule(
+                "off_peak",
+                datetime(2026, 8, 11, 1, tzinfo=timezone.utc),
+                "2026-08-11T05:00:00Z",
+            )
+            peak = storage.get_schedule("peak", "2026-08-11T00:00:00Z", "2026-08-12T00:00:00Z")
+
+        get_mock.assert_not_called()
+        self.assertEqual([row["slot_start"] for row in rows], ["2026-08-11T01:00:00+00:00", "2026-08-11T03:00:00+00:00"])
+        self.assertEqual(peak, [])
+        self.assertEqual(storage.cache_stats["hits"], 2)
+
+    def test_uncovered_or_expired_reads_query_supabase(self):
+        storage = make_storage()
+        _, replace_to = self.write_window(storage)
+        response = types.SimpleNamespace(status_code=200, text="", json=lambda: [])
+
+        with patch.object(schedule_storage.requests, "get", return_value=response, create=True) as get_mock:
+            storage.get_schedule("off_peak", "2026-08-11T00:00:00Z", replace_to + timedelta(hours=1))
+            with patch.object(schedule_storage.time, "monotonic", return_value=time.monotonic() + 3600):
+                storage.get_schedule("peak", "2026-08-11T00:00:00Z", "2026-08-11T06:00:00Z")
+
+        self.assertEqual(get_mock.call_count, 2)
+        url = get_mock.call_args_list[0].args[0]
+        self.assertIn("select=slot_start,slot_end,price,heater_type", url)
+        self.assertIn("slot_start=gte.2026-08-11T00:00:00Z", url)
+        self.assertNotIn("+", url)
+
+    def test_written_iso_string_slots_are_cached(self):
+        storage = make_storage()
+        slots = [
+            {"valid_from": "2026-08-11T03:00:00Z", "valid_to": "2026-08-11T03:30:00Z", "value_inc_vat": 4.2},
+            {"valid_from": "2026-08-11T01:00:00+00:00", "valid_to": "2026-08-11T01:30:00+00:00", "value_inc_vat": 4.2},
+        ]
+        deleted = types.SimpleNamespace(status_code=204, text="")
+        created = types.SimpleNamespace(status_code=201, text="")
+        with (
+            patch.object(schedule_storage.requests, "delete", return_value=deleted, create=True),
+            patch.object(schedule_storage.requests, "post", return_value=created, create=True),
+        ):
+            self.assertTrue(storage.save_schedule(slots, "off_peak", "2026-08-10T23:00:00Z", "2026-08-12T23:00:00Z"))
+
+        with patch.object(schedule_storage.requests, "get", create=True) as get_mock:
+            rows = storage.get_schedule("off_peak", "2026-08-11T00:00:00Z", "2026-08-11T04:00:00Z")
+
+        get_mock.assert_not_called()
+        self.assertEqual([row["slot_start"] for row in rows], ["2026-08-11T01:00:00+00:00", "2026-08-11T03:00:00Z"])
+
+    def test_unmodified_results_are_revalidated_with_etag(self):
+        storage = make_storage()
+        rows = [{"slot_start": "2026-08-11T01:00:00+00:00", "slot_end": "2026-08-11T01:30:00+00:00", "price": 4.2, "heater_type": "off_peak"}]
+        responses = [
+            types.SimpleNamespace(status_code=200, text="", headers={"ETag": 'W/"abc"'}, json=lambda: rows),
+            types.SimpleNamespace(status_code=304, text="", headers={}),
+        ]
+
+        with patch.object(schedule_storage.requests, "get", side_effect=responses, create=True) as get_mock:
+            self.assertEqual(storage.get_schedule("off_peak"), rows)
+            self.assertEqual(storage.get_schedule("off_peak"), rows)
+
+        self.assertEqual(get_mock.call_args_list[1].kwargs["headers"]["If-None-Match"], 'W/"abc"')
+        self.assertEqual(storage.cache_stats, {"hits": 0, "misses": 1, "revalidated": 1})
+
+
 if __name__ == "__main__":
     unittest.main()
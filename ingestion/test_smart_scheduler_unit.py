@@ -13,6 +13,8 @@ except ModuleNotFoundError:
     pytz_stub.timezone = lambda _name: timezone(timedelta(hours=1))
     sys.modules["pytz"] = pytz_stub
 
+from unittest.mock import patch
+
 from services.smart_scheduler import SmartScheduler
 
 
@@ -62,6 +64,22 @@ class SmartSchedulerTimezoneTests(unittest.TestCase):
 
         self.assertIn(after_midnight_local, selected)
 
+    def test_schedule_summary_lists_local_slot_dates_and_times(self):
+        scheduler = SmartScheduler(SchedulerConfig)
+
+        with self.assertLogs("services.smart_scheduler", level="INFO") as logs:
+            scheduler.compute_schedule_for_date(
+                target_date=date(2026, 8, 11),
+                rates=[rate("2026-08-10T23:30:00", price=4.2)],
+                budget_hours=0.5,
+                max_price=30.0,
+                use_below_average=True,
+                blocked_hours=[],
+            )
+
+        summary = next(line for line in logs.output if "SMART SCHEDULE" in line)
+        self.assertTrue(summary.endswith("slots: 2026-08-11 00:30 4.20p"), summary)
+
 
 class SmartSchedulerBudgetSemanticsTests(unittest.TestCase):
     def setUp(self):
@@ -79,8 +97,8 @@ class SmartSchedulerBudgetSemanticsTests(unittest.TestCase):
             rate("2026-08-11T18:30:00"),  # 19:30 local
         ]
 
-    def compute_with_half_hour_budget(self):
-        return self.scheduler.compute_schedule_for_date(
+    def compute_with_half_hour_budget(self, scheduler=None):
+        return (scheduler or self.scheduler).compute_schedule_for_date(
             target_date=date(2026, 8, 11),
             rates=self.fixed_window_rates,
             budget_hours=0.5,
@@ -103,6 +121,166 @@ class SmartSchedulerBudgetSemanticsTests(unittest.TestCase):
 
         self.assertLessEqual(len(selected) * 0.5, 0.5)
 
+    def test_scaled_window_minimums_keep_one_slot_per_window(self):
+        class ScaledConfig(SchedulerConfig):
+            SCALE_WINDOW_MINIMUMS = True
+
+        selected = self.compute_with_half_hour_budget(SmartScheduler(ScaledConfig))
+
+        self.assertEqual(
+            [slot["valid_from"].hour for slot in selected],
+            [0, 13, 18],  # 01:00 (latest equal-price morning slot), 14:00 and 19:00 local
+        )
+        self.assertEqual(len(selected) * 0.5, 1.5)
+
+
+class SmartSchedulerLocalTimeCacheTests(unittest.TestCase):
+    def test_each_rate_is_converted_to_local_time_once(self):
+        scheduler = SmartScheduler(SchedulerConfig)
+        start = datetime(2026, 8, 10, 23, tzinfo=timezone.utc)  # 00:00 BST Aug 11
+        rates = [
+            rate((start + timedelta(minutes=30 * index)).replace(tzinfo=None).isoformat(), price=index % 7)
+            for index in range(96)
+        ]
+
+        with patch.object(scheduler, "_local_start", wraps=scheduler._local_start) as local_start:
+            for target_date in (date(2026, 8, 11), date(2026, 8, 12)):
+                scheduler.compute_schedule_for_date(
+                    target_date=target_date,
+                    rates=rates,
+                    budget_hours=4.0,
+                    max_price=30.0,
+                    use_below_average=True,
+                    blocked_hours=[7, 8, 16, 17, 18],
+                )
+            scheduler.has_tomorrow_rates(rates, start)
+
+        self.assertEqual(local_start.call_count, len(rates))
+
+    def test_cached_fields_match_direct_conversion(self):
+        scheduler = SmartScheduler(SchedulerConfig)
+        slot = rate("2026-08-11T22:30:00")  # 23:30 BST
+
+        local_time = scheduler.local_time(slot)
+        local_start = scheduler._local_start(slot)
+
+        self.assertEqual(local_time, (local_start.date(), local_start.hour, local_start.minute))
+        self.assertIs(scheduler.local_time(slot), local_time)
+
+    def test_cache_limit_can_be_raised_for_batch_replays(self):
+        start = datetime(2026, 8, 10, 23, tzinfo=timezone.utc)  # 00:00 BST Aug 11
+        rates = [
+            rate((start + timedelta(minutes=30 * index)).replace(tzinfo=None).isoformat())
+            for index in range(96)
+        ]
+        scheduler = SmartScheduler(SchedulerConfig, local_time_cache_limit=len(rates) + 1)
+
+        with patch.object(scheduler, "_local_start", wraps=scheduler._local_start) as local_start:
+            days = scheduler.rates_by_local_date(rates)
+            for slot in rates:
+                scheduler.local_time(slot)
+
+        self.assertEqual(local_start.call_count, len(rates))
+        self.assertEqual(list(days), [date(2026, 8, 11), date(2026, 8, 12)])
+        self.assertEqual(days[date(2026, 8, 11)], rates[:48])
+        self.assertEqual(SmartScheduler(SchedulerConfig).local_time_cache_limit, SmartScheduler.LOCAL_TIME_CACHE_LIMIT)
+
+
+class SmartSchedulerSolverSelectionTests(unittest.TestCase):
+    def test_optimal_solver_falls_back_to_greedy_when_constraints_conflict(self):
+        class OptimalConfig(SchedulerConfig):
+            SCHEDULE_SOLVER = "optimal"
+            MAX_DAILY_HEATER_STARTS = 1
+
+        scheduler = SmartScheduler(OptimalConfig)
+        rates = [
+            rate("2026-08-11T00:00:00"),  # 01:00 local
+            rate("2026-08-11T13:00:00"),  # 14:00 local
+            rate("2026-08-11T18:00:00"),  # 19:00 local
+        ]
+
+        selected = scheduler.compute_schedule_for_date(
+            target_date=date(2026, 8, 11),
+            rates=rates,
+            budget_hours=0.5,
+            max_price=30.0,
+            use_below_average=True,
+            blocked_hours=[],
+        )
+
+        # Three separate windows cannot be heated in one run.
+        self.assertEqual(selected, rates)
+
+
+class SmartSchedulerRollingHorizonTests(unittest.TestCase):
+    def setUp(self):
+        self.scheduler = SmartScheduler(SchedulerConfig)
+        self.start = datetime(2026, 8, 11, 12, tzinfo=timezone.utc)  # 13:00 BST
+        # 13:00-16:00 20p, 16:00-19:00 blocked, 19:00-00:00 25p,
+        # 00:00-02:00 2p, then 20p until 07:00.
+        prices = [20.0] * 6 + [20.0] * 6 + [25.0] * 10 + [2.0] * 4 + [20.0] * 10
+        self.rates = [
+            rate((self.start + timedelta(minutes=30 * index)).replace(tzinfo=None).isoformat(), price)
+            for index, price in enumerate(prices)
+        ]
+        self.horizon_end = self.start + timedelta(hours=18)
+
+    def compute(self, now, rates=None):
+        return self.scheduler.compute_rolling_schedule(
+            now=now,
+            rates=rates or self.rates,
+            horizon_end=self.horizon_end,
+            budget_hours=4.0,
+            max_price=30.0,
+            blocked_hours=[16, 17, 18],
+            max_gap_hours=12.0,
+        )
+
+    def test_cheap_overnight_slots_replace_the_evening_boost(self):
+        selected = self.compute(self.start)
+        prices = [slot["value_inc_vat"] for slot in selected]
+
+        # Eight slots for today plus 4h/day pro rata over 7h of tomorrow.
+        self.assertEqual(len(selected), 10)
+        self.assertEqual(prices.count(2.0), 4)
+        self.assertNotIn(25.0, prices)
+
+    def test_unchanged_rates_reuse_previous_plan(self):
+        first = self.compute(self.start)
+        later = self.start + timedelta(minutes=45)
+
+        second = self.compute(later)
+
+        self.assertEqual(second, [slot for slot in first if slot["valid_to"] > later])
+        self.assertEqual(self.scheduler.rolling_stats, {"solved": 1, "reused": 1})
+
+    def test_new_rates_trigger_a_fresh_solve(self):
+        self.compute(self.start)
+        extended = self.rates + [
+            rate((self.rates[-1]["valid_to"]).replace(tzinfo=None).isoformat(), 1.0)
+        ]
+        self.horizon_end += timedelta(minutes=30)
+
+        selected = self.compute(self.start, rates=extended)
+
+        self.assertIn(extended[-1], selected)
+        self.assertEqual(self.scheduler.rolling_stats, {"solved": 2, "reused": 0})
+
+    def test_heated_slots_count_against_their_day(self):
+        first = self.compute(self.start)
+        later = self.start + timedelta(hours=12)  # 01:00 BST, after two cheap slots
+        repriced = [dict(r, value_inc_vat=r["value_inc_vat"] + 0.5) for r in self.rates]
+
+        second = self.compute(later, rates=repriced)
+        fresh = SmartScheduler(SchedulerConfig)
+        self.scheduler = fresh
+        unheated = self.compute(later, rates=repriced)
+
+        self.assertEqual([slot["value_inc_vat"] for slot in first if slot["valid_to"] <= later], [2.0, 2.0])
+        self.assertEqual(len(unheated), 2)
+        # Today's budget is spent; only the slot already in progress is kept.
+        self.assertEqual([slot["valid_from"] for slot in second], [later])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,211 @@
+import json
+import sys
+import tempfile
+import threading
+import time
+import types
+import unittest
+from datetime import datetime, timezone
+from pathlib import Path
+from unittest.mock import patch
+
+try:
+    import requests  # noqa: F401
+except ModuleNotFoundError:
+    sys.modules["requests"] = types.ModuleType("requests")
+
+from services import startup
+from services.startup import StartupOrchestrator
+
+
+class StartupOrchestratorTests(unittest.TestCase):
+    def test_independent_steps_overlap_and_dependants_wait(self):
+        orchestrator = StartupOrchestrator("test")
+        barrier = threading.Barrier(2, timeout=2)
+        order = []
+
+        def independent(name):
+            def step():
+                # Deadlocks (and times out) unless both steps run at once.
+                barrier.wait()
+                order.append(name)
+                return name
+            return step
+
+        orchestrator.add("clock", independent("clock"))
+        orchestrator.add("rates", independent("rates"))
+        orchestrator.add("schedule", lambda: order.append("schedule") or len(order), depends_on=("clock", "rates"))
+        results = orchestrator.run()
+
+        self.assertEqual({name: result.status for name, result in results.items()}, {
+            "clock": startup.OK, "rates": startup.OK, "schedule": startup.OK,
+        })
+        self.assertEqual(order[-1], "schedule")
+        self.assertEqual(orchestrator.value("schedule"), 3)
+
+    def test_failure_skips_dependants(self):
+        orchestrator = StartupOrchestrator("test")
+
+        def fail():
+            raise RuntimeError("octopus unavailable")
+
+        orchestrator.add("rates", fail)
+        orchestrator.add("schedule", lambda: "never", depends_on=("rates",))
+        results = orchestrator.run()
+
+        self.assertEqual(results["rates"].status, startup.FAILED)
+        self.assertIsInstance(results["rates"].error, RuntimeError)
+        self.assertEqual(results["schedule"].status, startup.SKIPPED)
+        self.assertIsNone(orchestrator.value("schedule", None))
+
+    def test_deadline_releases_run_without_waiting_for_the_step(self):
+        orchestrator = StartupOrchestrator("test")
+        release = threading.Event()
+        orchestrator.add("clock", lambda: release.wait(5), deadline=0.05)
+
+        started = time.monotonic()
+        results = orchestrator.run()
+        elapsed = time.monotonic() - started
+        release.set()
+
+        self.assertEqual(results["clock"].status, startup.TIMED_OUT)
+        self.assertLess(elapsed, 1.0)
+
+    def test_optional_steps_finish_in_the_background(self):
+        orchestrator = StartupOrchestrator("test")
+        release = threading.Event()
+        finished = threading.Event()
+        orchestrator.add("health_check", lambda: release.wait(5) and finished.set(), required=False)
+        orchestrator.add("schedule", lambda: "slots")
+
+        results = orchestrator.run()
+        self.assertNotIn("health_check", results)
+        release.set()
+
+        self.assertTrue(finished.wait(2))
+        self.assertEqual(results["schedule"].value, "slots")
+
+    def test_unknown_dependency_is_rejected(self):
+        with self.assertRaises(ValueError):
+            StartupOrchestrator("test").add("schedule", lambda: None, depends_on=("rates",))
+
+
+class ControllerStartupTests(unittest.TestCase):
+    """Drives SmartWaterController's startup with stand-in clock, device and rate clients."""
+
+    def setUp(self):
+        import pytz
+        import schedule
+
+        import main
+
+        self.main = main
+        self.events = []
+        self.clock_released = threading.Event()
+        self.addCleanup(self.clock_released.set)
+        self.addCleanup(schedule.clear)
+        self.clock_result = (0.0, True)
+        self.strict_time_check = False
+        now = datetime(2026, 8, 11, 10, tzinfo=timezone.utc)
+        london = pytz.timezone("Europe/London")
+
+        def time_service(timezone_name):
+            def check_system_clock():
+                if self.clock_result is None:
+                    self.clock_released.wait(5)
+                return self.clock_result
+
+            return types.SimpleNamespace(
+                timezone=london,
+                strict_time_check=self.strict_time_check,
+                check_system_clock=check_system_clock,
+                now=lambda: now,
+                get_local_time=lambda: now.astimezone(london),
+            )
+
+        def get_status(device_id):
+            # Slower than the rate fetch, so a loop that did not wait would control first.
+            threading.Event().wait(0.2)
+            self.events.append(f"health:{device_id}")
+            return {"success": True, "online": True, "is_on": False}
+
+        def get_rates():
+            self.events.append("rates")
+            return []
+
+        stand_ins = {
+            "TimeService": time_service,
+            "TuyaManager": lambda: types.SimpleNamespace(enabled=True, get_status=get_status),
+            "ShellyManager": lambda: types.SimpleNamespace(enabled=True),
+            "OctopusClient": lambda product, region: types.SimpleNamespace(get_rates=get_rates),
+            "ScheduleStorage": lambda: types.SimpleNamespace(enabled=False, stats={}),
+        }
+        for name, stand_in in stand_ins.items():
+            patcher = patch.object(main, name, stand_in)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        config = patch.multiple(
+            main.Config,
+            MAIN_HEATER_CONTROL="tuya",
+            SECOND_HEATER_CONTROL="tuya",
+            STORAGE_HEATER_ENABLED=True,
+            TUYA_DEVICE_ID_MAIN="main",
+            TUYA_DEVICE_ID_SECOND="second",
+            HEAT_DEMAND_LEARNING=False,
+            CONTROLLER_CHECKPOINT_ENABLED=False,
+            STATUS_API_ENABLED=False,
+        )
+        config.start()
+        self.addCleanup(config.stop)
+
+    def make_controller(self):
+        with patch.object(self.main.SmartWaterController, "CLOCK_CHECK_DEADLINE_SECONDS", 0.05):
+            return self.main.SmartWaterController(dry_run=True)
+
+    def run_controller(self, controller):
+        controller.control_loop = lambda: self.events.append("control")
+        controller.should_update_schedule = lambda: True
+        # The first sleep after the first loop pass stops run() as Ctrl+C would.
+        with patch.object(self.main.time, "sleep", side_effect=KeyboardInterrupt):
+            controller.run()
+
+    def test_clock_check_past_its_deadline_depends_on_strict_time_check(self):
+        self.clock_result = None
+
+        self.assertIsNotNone(self.make_controller())
+
+        self.strict_time_check = True
+        with self.assertRaises(SystemExit):
+            self.make_controller()
+
+    def test_fresh_start_controls_after_the_health_check_and_schedule(self):
+        self.run_controller(self.make_controller())
+
+        self.assertEqual(sorted(self.events[:3]), ["health:main", "health:second", "rates"])
+        self.assertEqual(self.events[3:], ["rates", "control"])
+
+    def test_resumed_start_controls_first_and_refreshes_before_the_loop(self):
+        controller = self.make_controller()
+        controller.resumed_from_checkpoint = True
+
+        self.run_controller(controller)
+
+        self.assertEqual(self.events[0], "control")
+        self.assertEqual(sorted(self.events[1:4]), ["health:main", "health:second", "rates"])
+        self.assertEqual(self.events[4:], ["rates", "control"])
+
+    def test_run_traces_to_the_configured_file_and_closes_it(self):
+        with tempfile.TemporaryDirectory() as directory:
+            trace_file = Path(directory) / "trace.json"
+            with patch.object(self.main.Config, "TIMING_TRACE_FILE", str(trace_file)):
+                self.run_controller(self.make_controller())
+
+            text = trace_file.read_text(encoding="utf-8")
+            events = json.loads(text.rstrip().rstrip(",") + "]")
+
+        self.assertTrue({"health_check", "update_schedule"} <= {event["name"] for event in events})
+        self.assertIsNone(self.main.timings._trace)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,172 @@
+import json
+import sys
+import threading
+import types
+import unittest
+import urllib.error
+import urllib.request
+from datetime import datetime, timezone
+
+try:
+    import requests  # noqa: F401
+except ModuleNotFoundError:
+    sys.modules["requests"] = types.ModuleType("requests")
+
+from services.status_server import StatusServer, StatusSnapshot
+
+
+class StatusSnapshotTests(unittest.TestCase):
+    def test_identical_state_keeps_version_and_etag(self):
+        snapshots = StatusSnapshot()
+        slot = {"valid_from": datetime(2026, 8, 11, 1, tzinfo=timezone.utc), "value_inc_vat": 4.2}
+
+        self.assertTrue(snapshots.publish({"schedule": [slot]}))
+        first = snapshots.current
+        self.assertFalse(snapshots.publish({"schedule": [dict(slot)]}))
+
+        self.assertIs(snapshots.current, first)
+        self.assertEqual(json.loads(first.body)["schedule"][0]["valid_from"], "2026-08-11T01:00:00+00:00")
+
+    def test_unversioned_fields_refresh_the_body_without_a_new_etag(self):
+        snapshots = StatusSnapshot()
+        state = {"status": {"cooldown_mode": False}}
+
+        self.assertTrue(snapshots.publish(state, unversioned={"timings": {"control_loop": {"count": 1}}}))
+        first = snapshots.current
+        self.assertFalse(snapshots.publish(dict(state), unversioned={"timings": {"control_loop": {"count": 2}}}))
+
+        self.assertEqual((snapshots.current.version, snapshots.current.etag), (first.version, first.etag))
+        self.assertEqual(json.loads(snapshots.current.body)["timings"], {"control_loop": {"count": 2}})
+        self.assertIs(snapshots.wait_for_change(first.etag, 0.05).etag, first.etag)
+        self.assertTrue(snapshots.publish({"status": {"cooldown_mode": True}}, unversioned={"timings": {}}))
+        self.assertNotEqual(snapshots.current.etag, first.etag)
+
+    def test_wake_releases_waiters_and_leaves_the_snapshot_usable(self):
+        snapshots = StatusSnapshot()
+        snapshots.publish({"status": {"cooldown_mode": False}})
+        etag = snapshots.current.etag
+        timer = threading.Timer(0.1, snapshots.wake)
+        timer.start()
+        try:
+            self.assertEqual(snapshots.wait_for_change(etag, 5).etag, etag)
+        finally:
+            timer.cancel()
+
+        self.assertTrue(snapshots.publish({"status": {"cooldown_mode": True}}))
+        self.assertEqual(snapshots.wait_for_version(1, 5).version, 2)
+
+
+class StatusServerTests(unittest.TestCase):
+    def setUp(self):
+        self.snapshots = StatusSnapshot()
+        self.snapshots.publish({"status": {"cooldown_mode": False}})
+        self.server = StatusServer(self.snapshots, port=0, keepalive_seconds=1)
+        self.server.start()
+        host, port = self.server.address
+        self.base_url = f"http://{host}:{port}"
+
+    def tearDown(self):
+        self.server.stop()
+
+    def get(self, path, etag=None):
+        request = urllib.request.Request(self.base_url + path)
+        if etag:
+            request.add_header("If-None-Match", etag)
+        try:
+            with urllib.request.urlopen(request, timeout=5) as response:
+                return response.status, response.headers.get("ETag"), response.read()
+        except urllib.error.HTTPError as error:
+            return error.code, error.headers.get("ETag"), b""
+
+    def test_state_is_served_with_etag_and_revalidates(self):
+        status, etag, body = self.get("/state")
+
+        self.assertEqual(status, 200)
+        self.assertEqual(json.loads(body), {"status": {"cooldown_mode": False}})
+        self.assertEqual(self.get("/state", etag)[0], 304)
+
+    def test_long_poll_returns_when_a_new_snapshot_is_published(self):
+        _, etag, _ = self.get("/state")
+        timer = threading.Timer(0.2, self.snapshots.publish, args=({"status": {"cooldown_mode": True}},))
+        timer.start()
+        try:
+            status, new_etag, body = self.get("/state?wait=5", etag)
+        finally:
+            timer.cancel()
+
+        self.assertEqual(status, 200)
+        self.assertNotEqual(new_etag, etag)
+        self.assertEqual(json.loads(body), {"status": {"cooldown_mode": True}})
+
+    def test_event_stream_starts_with_the_current_snapshot(self):
+        with urllib.request.urlopen(self.base_url + "/events", timeout=5) as response:
+            self.assertEqual(response.headers.get("Content-Type"), "text/event-stream")
+            lines = [response.readline() for _ in range(3)]
+
+        self.assertEqual(lines[0], b"event: state\n")
+        self.assertEqual(lines[1], b"id: 1\n")
+        self.assertEqual(json.loads(lines[2][len(b"data: "):]), {"status": {"cooldown_mode": False}})
+
+    def test_server_can_be_started_again_after_stop(self):
+        _, etag, _ = self.get("/state")
+        self.server.stop()
+        self.snapshots.publish({"status": {"cooldown_mode": True}})
+
+        self.server.start()
+        host, port = self.server.address
+        self.base_url = f"http://{host}:{port}"
+        timer = threading.Timer(0.2, self.snapshots.publish, args=({"status": {"cooldown_mode": False}},))
+        timer.start()
+        try:
+            status, new_etag, body = self.get("/state?wait=5", self.snapshots.current.etag)
+        finally:
+            timer.cancel()
+
+        self.assertEqual(status, 200)
+        self.assertEqual(new_etag, etag)
+        self.assertEqual(json.loads(body), {"status": {"cooldown_mode": False}})
+
+
+class PublishStateTests(unittest.TestCase):
+    def make_controller(self, schedule):
+        import main
+
+        controller = main.SmartWaterController.__new__(main.SmartWaterController)
+        controller.system_state = {"cooldown_mode": False}
+        controller.main_heater_slots = schedule
+        controller.second_heater_slots = []
+        controller.status_snapshot = StatusSnapshot()
+        return controller
+
+    def test_state_is_published_with_timings_outside_the_etag(self):
+        slot = {"valid_from": datetime(2026, 8, 11, 1, tzinfo=timezone.utc), "value_inc_vat": 4.2}
+        controller = self.make_controller([slot])
+
+        controller.publish_state()
+        first = controller.status_snapshot.current
+        body = json.loads(first.body)
+
+        self.assertEqual(first.version, 1)
+        self.assertEqual(body["schedule"], {
+            "main": [{"valid_from": "2026-08-11T01:00:00+00:00", "value_inc_vat": 4.2}],
+            "second": [],
+        })
+        self.assertEqual(body["status"], {"cooldown_mode": False})
+        self.assertIn("timings", body)
+
+        controller.publish_state()
+        self.assertEqual(controller.status_snapshot.current.etag, first.etag)
+
+    def test_a_failing_state_is_logged_not_raised(self):
+        controller = self.make_controller([])
+        del controller.system_state
+
+        with self.assertLogs("main", level="ERROR") as logs:
+            controller.publish_state()
+
+        self.assertEqual(controller.status_snapshot.current.version, 0)
+        self.assertIn("Failed to publish status snapshot", logs.output[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
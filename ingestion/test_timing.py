@@ -0,0 +1,110 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from services.timing import StageTimings
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class StageTimingsTests(unittest.TestCase):
+    def test_spans_and_decorators_feed_per_stage_percentiles(self):
+        clock = FakeClock()
+        timings = StageTimings(clock=clock)
+
+        @timings.timed("shelly.status")
+        def poll(seconds):
+            clock.now += seconds
+            return "ok"
+
+        for seconds in (0.1, 0.2, 0.3, 0.4, 2.0):
+            self.assertEqual(poll(seconds), "ok")
+        with timings.span("control_loop"):
+            clock.now += 1.5
+
+        summary = timings.summary()
+        self.assertEqual(list(summary), ["control_loop", "shelly.status"])
+        self.assertEqual(summary["shelly.status"], {
+            "count": 5, "last_ms": 2000.0, "p50_ms": 300.0, "p95_ms": 2000.0, "max_ms": 2000.0,
+        })
+        self.assertEqual(summary["control_loop"]["last_ms"], 1500.0)
+
+    def test_failed_calls_are_still_timed(self):
+        timings = StageTimings()
+
+        with self.assertRaises(RuntimeError):
+            with timings.span("octopus.rates"):
+                raise RuntimeError("timeout")
+
+        self.assertEqual(timings.summary()["octopus.rates"]["count"], 1)
+
+    def test_window_keeps_only_recent_samples(self):
+        timings = StageTimings()
+        timings.WINDOW = 3
+        for seconds in (9.0, 1.0, 1.0, 1.0):
+            timings.record("control_loop", seconds)
+
+        stats = timings.summary()["control_loop"]
+        self.assertEqual(stats["count"], 4)
+        self.assertEqual(stats["max_ms"], 1000.0)
+
+    def test_trace_file_holds_complete_events(self):
+        with tempfile.TemporaryDirectory() as directory:
+            trace_file = Path(directory) / "trace.json"
+            clock = FakeClock()
+            timings = StageTimings(clock=clock)
+            with timings.span("before_open"):
+                clock.now += 0.1
+            self.assertTrue(timings.open_trace(trace_file))
+            with timings.span("update_schedule"):
+                clock.now += 0.25
+            timings.flush_trace()
+            timings.flush_trace()
+            with timings.span("control_loop"):
+                clock.now += 0.5
+            timings.close_trace()
+            with timings.span("after_close"):
+                clock.now += 0.1
+            timings.flush_trace()
+
+            text = trace_file.read_text(encoding="utf-8")
+            events = json.loads(text.rstrip().rstrip(",") + "]")
+
+        self.assertEqual([event["name"] for event in events], ["update_schedule", "control_loop"])
+        self.assertEqual(events[0]["ph"], "X")
+        self.assertEqual(events[0]["dur"], 250000)
+
+    def test_reopened_trace_appends_to_the_same_array(self):
+        with tempfile.TemporaryDirectory() as directory:
+            trace_file = Path(directory) / "trace.json"
+            timings = StageTimings()
+            for stage in ("first_run", "second_run"):
+                timings.open_trace(trace_file)
+                timings.record(stage, 0.1)
+                timings.close_trace()
+
+            text = trace_file.read_text(encoding="utf-8")
+
+        self.assertEqual(text.count("["), 1)
+        self.assertEqual([event["name"] for event in json.loads(text.rstrip().rstrip(",") + "]")], ["first_run", "second_run"])
+
+    def test_unwritable_trace_path_is_reported(self):
+        with tempfile.TemporaryDirectory() as directory:
+            timings = StageTimings()
+
+            with self.assertLogs("services.timing", level="ERROR"):
+                self.assertFalse(timings.open_trace(Path(directory) / "missing" / "trace.json"))
+            timings.record("control_loop", 0.1)
+
+        self.assertEqual(timings.summary()["control_loop"]["count"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,13 +1,23 @@
 import logging
 from config import Config
+from services.timing import timed
 
-try:
-    import tinytuya
-except ImportError:
-    tinytuya = None
+# TinyTuya pulls in requests and the cryptography stack; it is imported when a
+# TuyaManager is first created, so Shelly-only runs never load it.
+tinytuya = None
+
+
+def _load_tinytuya():
+    global tinytuya
+    if tinytuya is None:
+        try:
+            import tinytuya as module
+        except ImportError:
+            return None
+        tinytuya = module
+    return tinytuya
 
 
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 
@@ -38,7 +48,7 @@ class TuyaManager:
             logger.warning(f"Unknown TUYA_CONTROL_MODE={self.control_mode}. Falling back to cloud.")
             self.control_mode = 'cloud'
 
-        if tinytuya is None:
+        if _load_tinytuya() is None:
             logger.error("TinyTuya is not installed. Tuya control logic will be DISABLED.")
             return
 
@@ -67,6 +77,7 @@ class TuyaManager:
 
         self.enabled = self.cloud_enabled or self.local_enabled
 
+    @timed("tuya.status")
     def get_status(self, device_id):
         """
         Gets full device status including online/offline state.
@@ -120,6 +131,7 @@ class TuyaManager:
     def turn_off(self, device_id):
         return self._send_command(device_id, False)
 
+    @timed("tuya.command")
     def _send_command(self, device_id, switch_state):
         if self.control_mode in {'local', 'local_then_cloud'} and self.has_local_config(device_id):
             local_result = self._send_local_command(device_id, switch_state)
@@ -0,0 +1,172 @@
+-- Replace the controller's heating schedule in one transaction.
+--
+-- The controller previously cleared each heater type's window with DELETE and
+-- then inserted the new slots with a separate POST: four round-trips per
+-- schedule update, and a crash between them left the dashboard with an empty
+-- schedule. replace_heating_schedule takes every heater type and the replace
+-- window in one call, so readers only ever see the old or the new schedule.
+
+begin;
+
+-- Keep a fresh local Supabase project usable; existing production tables are
+-- left unchanged apart from the conflict target below.
+create table if not exists public.heating_schedule (
+    id bigint generated by default as identity primary key,
+    slot_start timestamptz not null,
+    slot_end timestamptz not null,
+    price numeric(10, 4) not null,
+    heater_type varchar(20) not null,
+    computed_at timestamptz default now()
+);
+
+-- ON CONFLICT needs a unique index on the slot identity. Production tables
+-- already declare UNIQUE(slot_start, heater_type); this is a no-op there apart
+-- from the index build.
+create unique index if not exists heating_schedule_slot_start_heater_type_uidx
+    on public.heating_schedule (slot_start, heater_type);
+
+create index if not exists heating_schedule_heater_type_slot_start_idx
+    on public.heating_schedule (heater_type, slot_start);
+
+drop function if exists public.replace_heating_schedule(timestamptz, timestamptz, jsonb, boolean);
+create function public.replace_heating_schedule(
+    p_replace_from timestamptz,
+    p_replace_to timestamptz,
+    p_schedules jsonb,
+    p_diff boolean default true
+)
+returns jsonb
+language plpgsql
+volatile
+security invoker
+set search_path = ''
+as $function$
+declare
+    v_heater_type text;
+    v_slots jsonb;
+    v_slot jsonb;
+    v_computed_at timestamptz := pg_catalog.now();
+    v_count integer;
+    v_deleted integer := 0;
+    v_written integer := 0;
+    v_unchanged integer := 0;
+begin
+    if p_replace_from is null or p_replace_to is null or p_replace_to <= p_replace_from then
+        raise exception 'replace window must be a non-empty time range' using errcode = '22023';
+    end if;
+    if pg_catalog.jsonb_typeof(p_schedules) is distinct from 'object' then
+        raise exception 'p_schedules must be a JSON object keyed by heater type' using errcode = '22023';
+    end if;
+
+    for v_heater_type, v_slots in
+        select schedule.key, schedule.value
+        from pg_catalog.jsonb_each(p_schedules) as schedule(key, value)
+    loop
+        if v_heater_type not in ('off_peak', 'peak') then
+            raise exception 'heater type % is unsupported', v_heater_type using errcode = '22023';
+        end if;
+        if pg_catalog.jsonb_typeof(v_slots) is distinct from 'array' then
+            raise exception 'p_schedules.% must be a JSON array', v_heater_type using errcode = '22023';
+        end if;
+        for v_slot in select value from pg_catalog.jsonb_array_elements(v_slots) loop
+            if pg_catalog.jsonb_typeof(v_slot) is distinct from 'object'
+               or pg_catalog.jsonb_typeof(v_slot -> 'slot_start') is distinct from 'string'
+               or pg_catalog.jsonb_typeof(v_slot -> 'slot_end') is distinct from 'string'
+               or pg_catalog.jsonb_typeof(v_slot -> 'price') is distinct from 'number' then
+                raise exception 'p_schedules.% slots need slot_start, slot_end and a numeric price', v_heater_type
+                    using errcode = '22023';
+            end if;
+            if (v_slot ->> 'slot_start') !~ '(Z|[+-][0-9]{2}:[0-9]{2})$'
+               or (v_slot ->> 'slot_end') !~ '(Z|[+-][0-9]{2}:[0-9]{2})$' then
+                raise exception 'slot timestamps must include a UTC offset' using errcode = '22023';
+            end if;
+            if (v_slot ->> 'slot_start')::timestamptz < p_replace_from
+               or (v_slot ->> 'slot_start')::timestamptz >= p_replace_to
+               or (v_slot ->> 'slot_end')::timestamptz <= (v_slot ->> 'slot_start')::timestamptz then
+                raise exception 'slot % lies outside the replace window', v_slot ->> 'slot_start'
+                    using errcode = '22023';
+            end if;
+        end loop;
+        if (
+            select pg_catalog.count(*) <> pg_catalog.count(distinct (slot.value ->> 'slot_start')::timestamptz)
+            from pg_catalog.jsonb_array_elements(v_slots) as slot(value)
+        ) then
+            raise exception 'p_schedules.% contains duplicate slots', v_heater_type using errcode = '22023';
+        end if;
+    end loop;
+
+    -- Concurrent replacements of the same heater type would otherwise interleave
+    -- their deletes and upserts.
+    for v_heater_type in
+        select schedule.key
+        from pg_catalog.jsonb_object_keys(p_schedules) as schedule(key)
+        order by schedule.key
+    loop
+        perform pg_catalog.pg_advisory_xact_lock(
+            pg_catalog.hashtextextended('heating_schedule:' || v_heater_type, 0)
+        );
+    end loop;
+
+    for v_heater_type, v_slots in
+        select schedule.key, schedule.value
+        from pg_catalog.jsonb_each(p_schedules) as schedule(key, value)
+    loop
+        if p_diff then
+            delete from public.heating_schedule as existing
+            where existing.heater_type = v_heater_type
+              and existing.slot_start >= p_replace_from
+              and existing.slot_start < p_replace_to
+              and not exists (
+                  select 1
+                  from pg_catalog.jsonb_array_elements(v_slots) as slot(value)
+                  where (slot.value ->> 'slot_start')::timestamptz = existing.slot_start
+              );
+        else
+            delete from public.heating_schedule as existing
+            where existing.heater_type = v_heater_type
+              and existing.slot_start >= p_replace_from
+              and existing.slot_start < p_replace_to;
+        end if;
+        get diagnostics v_count = row_count;
+        v_deleted := v_deleted + v_count;
+
+        -- Unchanged rows keep their computed_at, so a recomputation that picks
+        -- the same slots does not rewrite them.
+        insert into public.heating_schedule as existing (
+            slot_start, slot_end, price, heater_type, computed_at
+        )
+        select
+            (slot.value ->> 'slot_start')::timestamptz,
+            (slot.value ->> 'slot_end')::timestamptz,
+            (slot.value ->> 'price')::numeric,
+            v_heater_type,
+            v_computed_at
+        from pg_catalog.jsonb_array_elements(v_slots) as slot(value)
+        on conflict (slot_start, heater_type) do update
+            set slot_end = excluded.slot_end,
+                price = excluded.price,
+                computed_at = excluded.computed_at
+            where existing.slot_end is distinct from excluded.slot_end
+               or existing.price is distinct from excluded.price;
+        get diagnostics v_count = row_count;
+        v_written := v_written + v_count;
+        v_unchanged := v_unchanged + pg_catalog.jsonb_array_length(v_slots) - v_count;
+    end loop;
+
+    return pg_catalog.jsonb_build_object(
+        'deleted', v_deleted,
+        'written', v_written,
+        'unchanged', v_unchanged
+    );
+end
+$function$;
+
+revoke all on function public.replace_heating_schedule(timestamptz, timestamptz, jsonb, boolean)
+    from public, anon, authenticated;
+grant execute on function public.replace_heating_schedule(timestamptz, timestamptz, jsonb, boolean)
+    to service_role;
+
+comment on function public.replace_heating_schedule(timestamptz, timestamptz, jsonb, boolean) is
+    'Controller RPC. Atomically replaces every supplied heater type''s slots in [p_replace_from, p_replace_to); with p_diff only changed rows are written.';
+
+commit;
@@ -0,0 +1,174 @@
+-- Aggregate counter-delta energy into UK half-hours on the server.
+--
+-- analysis/flex_savings.py downloaded every one-minute reading (1,440 rows per
+-- channel per day) only to difference the cumulative counter and spread each
+-- segment over half-hour slots. get_half_hour_energy applies the same rules in
+-- the database and returns at most 48 rows per channel per day. UK local time
+-- is always a whole-hour offset from UTC, so UK half-hours are UTC half-hours.
+
+begin;
+
+drop function if exists public.get_half_hour_energy(
+    timestamptz,
+    timestamptz,
+    integer[],
+    double precision,
+    double precision
+);
+create function public.get_half_hour_energy(
+    p_start timestamptz,
+    p_end timestamptz,
+    p_channels integer[],
+    p_max_power_w double precision default 20000,
+    p_on_threshold_w double precision default 100
+)
+returns table (
+    slot_start timestamptz,
+    channel integer,
+    kwh double precision,
+    starts integer
+)
+language plpgsql
+stable
+security invoker
+set search_path = ''
+as $function$
+begin
+    if p_start is null or p_end is null or p_start >= p_end then
+        raise exception 'p_start must be earlier than p_end'
+            using errcode = '22023';
+    end if;
+    if p_channels is null or pg_catalog.cardinality(p_channels) = 0 then
+        raise exception 'p_channels must not be empty'
+            using errcode = '22023';
+    end if;
+    if p_max_power_w is null or p_max_power_w <= 0 then
+        raise exception 'p_max_power_w must be positive'
+            using errcode = '22023';
+    end if;
+
+    return query
+    with bounded as (
+        -- The last reading before p_start opens each channel's first segment.
+        select
+            previous.sample_channel,
+            previous.sample_created_at,
+            previous.sample_id,
+            previous.sample_power_w,
+            previous.sample_energy_total_wh
+        from pg_catalog.unnest(p_channels) as requested(requested_channel)
+        cross join lateral (
+            select
+                reading.channel::integer as sample_channel,
+                reading.created_at as sample_created_at,
+                reading.id as sample_id,
+                coalesce(reading.power_w, 0)::double precision as sample_power_w,
+                coalesce(reading.energy_total_wh, 0)::double precision as sample_energy_total_wh
+            from public.energy_readings as reading
+            where reading.channel = requested.requested_channel
+              and reading.created_at < p_start
+            order by reading.created_at desc, reading.id desc
+            limit 1
+        ) as previous
+        union all
+        -- Missing measurements count as zero, as in flex_savings: the segments
+        -- on either side of them are then dropped rather than bridged.
+        select
+            reading.channel::integer,
+            reading.created_at,
+            reading.id,
+            coalesce(reading.power_w, 0)::double precision,
+            coalesce(reading.energy_total_wh, 0)::double precision
+        from public.energy_readings as reading
+        where reading.channel = any(p_channels)
+          and reading.created_at >= p_start
+          and reading.created_at <= p_end
+    ),
+    segments as (
+        select
+            sample.sample_channel as segment_channel,
+            pg_catalog.lag(sample.sample_created_at) over ordered as segment_start,
+            sample.sample_created_at as segment_end,
+            sample.sample_energy_total_wh
+                - pg_catalog.lag(sample.sample_energy_total_wh) over ordered as segment_wh,
+            pg_catalog.lag(sample.sample_power_w) over ordered > p_on_threshold_w as was_on,
+            sample.sample_power_w > p_on_threshold_w as is_on
+        from bounded as sample
+        window ordered as (
+            partition by sample.sample_channel
+            order by sample.sample_created_at, sample.sample_id
+        )
+    ),
+    plausible as (
+        -- A segment whose implied power exceeds p_max_power_w is a counter
+        -- reset or glitch and contributes nothing.
+        select
+            segment.segment_channel,
+            greatest(segment.segment_start, p_start) as clipped_start,
+            least(segment.segment_end, p_end) as clipped_end,
+            segment.segment_wh / 1000.0
+                / extract(epoch from segment.segment_end - segment.segment_start) as kwh_per_second
+        from segments as segment
+        where segment.segment_start is not null
+          and segment.segment_end > segment.segment_start
+          and segment.segment_end > p_start
+          and segment.segment_start < p_end
+          and segment.segment_wh > 0
+          and segment.segment_wh
+              / (extract(epoch from segment.segment_end - segment.segment_start) / 3600.0)
+              <= p_max_power_w
+    ),
+    energy as (
+        select
+            slot.bucket as energy_slot_start,
+            segment.segment_channel as energy_channel,
+            pg_catalog.sum(
+                segment.kwh_per_second * extract(epoch from
+                    least(segment.clipped_end, slot.bucket + interval '30 minutes')
+                    - greatest(segment.clipped_start, slot.bucket)
+                )
+            ) as energy_kwh
+        from plausible as segment
+        cross join lateral pg_catalog.generate_series(
+            pg_catalog.to_timestamp(pg_catalog.floor(extract(epoch from segment.clipped_start) / 1800) * 1800),
+            segment.clipped_end - interval '1 microsecond',
+            interval '30 minutes'
+        ) as slot(bucket)
+        group by slot.bucket, segment.segment_channel
+    ),
+    heater_starts as (
+        select
+            pg_catalog.to_timestamp(
+                pg_catalog.floor(extract(epoch from segment.segment_end) / 1800) * 1800
+            ) as starts_slot_start,
+            segment.segment_channel as starts_channel,
+            pg_catalog.count(*)::integer as starts_count
+        from segments as segment
+        where segment.is_on
+          and not segment.was_on
+          and segment.segment_end >= p_start
+          and segment.segment_end < p_end
+        group by 1, 2
+    )
+    select
+        coalesce(energy.energy_slot_start, heater_starts.starts_slot_start),
+        coalesce(energy.energy_channel, heater_starts.starts_channel),
+        coalesce(energy.energy_kwh, 0)::double precision,
+        coalesce(heater_starts.starts_count, 0)
+    from energy
+    full join heater_starts
+        on heater_starts.starts_slot_start = energy.energy_slot_start
+       and heater_starts.starts_channel = energy.energy_channel
+    order by 1, 2;
+end
+$function$;
+
+revoke all on function public.get_half_hour_energy(timestamptz, timestamptz, integer[], double precision, double precision)
+    from public, anon, authenticated;
+grant execute on function public.get_half_hour_energy(timestamptz, timestamptz, integer[], double precision, double precision)
+    to service_role;
+
+comment on function public.get_half_hour_energy(timestamptz, timestamptz, integer[], double precision, double precision) is
+    'Analysis RPC. Per-channel counter-delta kWh and off-to-on starts for each half-hour in [p_start, p_end); segments implying more than p_max_power_w are dropped.';
+
+commit;
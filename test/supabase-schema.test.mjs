@@ -10,6 +10,14 @@ const numericPrecisionMigration = readFileSync(
     new URL("../supabase/migrations/20260813182500_fix_telemetry_numeric_precision.sql", import.meta.url),
     "utf8",
 )
+const heatingScheduleMigration = readFileSync(
+    new URL("../supabase/migrations/20261019090000_atomic_heating_schedule_replace.sql", import.meta.url),
+    "utf8",
+)
+const halfHourEnergyMigration = readFileSync(
+    new URL("../supabase/migrations/20261019120000_half_hour_energy_rpc.sql", import.meta.url),
+    "utf8",
+)
 
 test("telemetry ingestion is atomic, validated, and service-only", () => {
     assert.match(
@@ -64,3 +72,44 @@ test("legacy float4 telemetry columns are upgraded to double precision", () => {
         )
     }
 })
+
+test("heating schedule replacement is a single service-only transaction", () => {
+    assert.match(
+        heatingScheduleMigration,
+        /create function public\.replace_heating_schedule\(\s*p_replace_from timestamptz,\s*p_replace_to timestamptz,\s*p_schedules jsonb,\s*p_diff boolean default true\s*\)/s,
+    )
+    assert.match(heatingScheduleMigration, /set search_path = ''/)
+    assert.match(heatingScheduleMigration, /pg_advisory_xact_lock/)
+    assert.match(heatingScheduleMigration, /on conflict \(slot_start, heater_type\) do update/)
+    assert.match(heatingScheduleMigration, /where existing\.slot_end is distinct from excluded\.slot_end/)
+    assert.match(
+        heatingScheduleMigration,
+        /revoke all on function public\.replace_heating_schedule\(timestamptz, timestamptz, jsonb, boolean\)\s+from public, anon, authenticated;/s,
+    )
+    assert.match(
+        heatingScheduleMigration,
+        /grant execute on function public\.replace_heating_schedule\(timestamptz, timestamptz, jsonb, boolean\)\s+to service_role;/s,
+    )
+})
+
+test("half-hour energy RPC differences counters server-side with the plausibility clip", () => {
+    assert.match(
+        halfHourEnergyMigration,
+        /create function public\.get_half_hour_energy\(\s*p_start timestamptz,\s*p_end timestamptz,\s*p_channels integer\[\],\s*p_max_power_w double precision default 20000,\s*p_on_threshold_w double precision default 100\s*\)/s,
+    )
+    assert.match(halfHourEnergyMigration, /set search_path = ''/)
+    assert.match(halfHourEnergyMigration, /reading\.created_at < p_start\s+order by reading\.created_at desc, reading\.id desc\s+limit 1/s)
+    assert.match(halfHourEnergyMigration, /pg_catalog\.lag\(sample\.sample_energy_total_wh\) over ordered/)
+    assert.match(halfHourEnergyMigration, /order by sample\.sample_created_at, sample\.sample_id/)
+    assert.match(halfHourEnergyMigration, /<= p_max_power_w/)
+    assert.match(halfHourEnergyMigration, /\/ 1800\) \* 1800/)
+    assert.doesNotMatch(halfHourEnergyMigration, /avg\(/i)
+    assert.match(
+        halfHourEnergyMigration,
+        /revoke all on function public\.get_half_hour_energy\(timestamptz, timestamptz, integer\[\], double precision, double precision\)\s+from public, anon, authenticated;/s,
+    )
+    assert.match(
+        halfHourEnergyMigration,
+        /grant execute on function public\.get_half_hour_energy\(timestamptz, timestamptz, integer\[\], double precision, double precision\)\s+to service_role;/s,
+    )
+})